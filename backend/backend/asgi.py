@@ -6,7 +6,7 @@ import django
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
-from backend.game import routing
+from backend.game import room_router, routing
 
 print(routing.websocket_urlpatterns)
 
@@ -24,4 +24,5 @@ application = ProtocolTypeRouter({
             routing.websocket_urlpatterns
         )
     ),
+    "lifespan": room_router.lifespan,  # Servers other than daphne announce their start this way
 })
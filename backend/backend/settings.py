@@ -62,6 +62,35 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Where live games are kept between messages (see game/game_store.py): 'local' keeps them in the ASGI
+# process, 'redis' shares them between workers through the same Redis server as the channel layer
+GAME_STATE_STORE = os.getenv('GAME_STATE_STORE', 'local')
+GAME_STATE_REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379')
+
+# Room affinity (see game/room_router.py): with GAME_WORKERS > 1 every room is served by one worker process,
+# numbered GAME_WORKER_INDEX, and the other workers forward its messages there
+GAME_WORKERS = int(os.getenv('GAME_WORKERS', '1'))
+GAME_WORKER_INDEX = int(os.getenv('GAME_WORKER_INDEX', '0'))
+
+# Where each game's seating, seed and moves are logged so it can be replayed (see game/event_log.py):
+# 'redis' in the Redis server above, so a restarted worker can rebuild its rooms' games; 'local' in the ASGI
+# process, so they die with it; 'none' keeps no log. Deployments with shared state or several workers get
+# 'redis', a single worker keeping its games in memory has nothing to recover them into and gets 'none'
+GAME_EVENT_LOG = os.getenv('GAME_EVENT_LOG', 'redis' if GAME_STATE_STORE == 'redis' or GAME_WORKERS > 1 else 'none')
+
+# Cache for the room and user records the game consumer reads on every lobby event (see game/lookup_cache.py):
+# 'local' keeps them in the ASGI process, 'redis' shares them (and their invalidation) between workers, which
+# any setup with several workers needs as rooms are also written by workers not owning them (joins, disconnects)
+GAME_LOOKUP_CACHE = os.getenv('GAME_LOOKUP_CACHE', 'redis' if GAME_STATE_STORE == 'redis' or GAME_WORKERS > 1 else 'local')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379'),
+    } if GAME_LOOKUP_CACHE == 'redis' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -32,4 +32,5 @@ urlpatterns = [
     path('api/room/<str:room_id>/', game_views.join_room, name='join_room'),
     path('api/auth/', include('backend.authentication.urls')),
     path('api/rooms', game_views.fetch_rooms, name='fetch_rooms'),
+    path('api/cards/', game_views.card_catalog, name='card_catalog'),
 ]
@@ -5,3 +5,8 @@ class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.game'
     label = 'game'
+
+    def ready(self):
+        from backend.game import lookup_cache, room_router
+        lookup_cache.connect_signals()
+        room_router.start_when_server_runs()
@@ -0,0 +1,147 @@
+"""
+JSON encoding for websocket messages and API responses.
+
+Uses orjson when it is installed, then msgspec, then the standard library json module. All three read and
+write the same JSON for the plain dicts, lists, strings and numbers the game sends, so clients cannot tell
+which one a server runs; the output of orjson and msgspec is just more compact (no spaces after separators).
+
+    text = codec.dumps(message)      # str, for websocket text frames
+    body = codec.dumps_bytes(data)   # bytes, for HTTP responses
+    data = codec.loads(text_or_bytes)
+
+Clients may instead ask for MessagePack frames by offering the BINARY_SUBPROTOCOL websocket subprotocol
+(when msgpack is installed). Those frames send each card as a reference into the card catalog, which the
+client fetches once from /api/cards/, instead of the card's full dict (see pack).
+
+Compare the available backends (and the binary protocol) on typical game messages with:
+
+    python -m backend.game.codec
+"""
+import functools
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from backend.game_core.deck import CARD_CATALOG
+
+def _stdlib_backend():
+    return (lambda obj: json.dumps(obj).encode()), json.loads
+
+def _orjson_backend():
+    import orjson
+    # Non-str keys (ints) are written as strings, like json.dumps does
+    return (lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)), orjson.loads
+
+def _msgspec_backend():
+    import msgspec
+    return msgspec.json.Encoder().encode, msgspec.json.Decoder().decode
+
+BACKENDS = {'orjson': _orjson_backend, 'msgspec': _msgspec_backend, 'json': _stdlib_backend}
+
+def available_backends():
+    """name -> (dumps_bytes, loads) for every backend importable here, fastest first."""
+    backends = {}
+    for name, load in BACKENDS.items():
+        try:
+            backends[name] = load()
+        except ImportError:
+            pass
+    return backends
+
+BACKEND, (dumps_bytes, loads) = next(iter(available_backends().items()))
+
+def dumps(obj):
+    return dumps_bytes(obj).decode()
+
+########## BINARY PROTOCOL ##########
+
+BINARY_SUBPROTOCOL = 'mdeal.msgpack.v1'
+# MessagePack extension types standing in for cards. Data: the card id (2 bytes, big endian), then for a
+# wild card the UTF-8 name of its current color.
+CARD_EXT = 1
+WILD_CARD_EXT = 2
+
+@functools.lru_cache(maxsize=None)
+def card_catalog():
+    """card id -> the card's dict as sent to clients, before any wild card is assigned a color."""
+    return {card_id: card.to_dict() for card_id, card in CARD_CATALOG.items()}
+
+def choose_subprotocol(offered):
+    """The subprotocol to accept from those a client offered, or None for JSON text frames."""
+    return BINARY_SUBPROTOCOL if msgpack and BINARY_SUBPROTOCOL in offered else None
+
+def compact_cards(obj):
+    """Replace the card dicts in `obj` that match their catalog entry (up to a wild card's color) by references."""
+    if isinstance(obj, dict):
+        card = card_catalog().get(obj.get('id')) if 'type' in obj else None
+        if card is not None and obj.keys() == card.keys():
+            if obj == card:
+                return msgpack.ExtType(CARD_EXT, obj['id'].to_bytes(2, 'big'))
+            if all(obj[key] == card[key] for key in card if key != 'currentColor'):
+                return msgpack.ExtType(WILD_CARD_EXT, obj['id'].to_bytes(2, 'big') + obj['currentColor'].encode())
+        return {key: compact_cards(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [compact_cards(value) for value in obj]
+    return obj
+
+def pack(obj):
+    return msgpack.packb(compact_cards(obj))
+
+def unpack(data):
+    return msgpack.unpackb(data)
+
+@functools.lru_cache(maxsize=32)
+def binary_frame(text):
+    """
+    A JSON frame re-encoded for the binary protocol. Sockets in the same process receive the same frames,
+    so each is converted once.
+    """
+    return pack(loads(text))
+
+########## BENCHMARK ##########
+
+def sample_messages():
+    """A full game state for four players, a typical card-move update as sent to one player, and a played card."""
+    from backend.game_core.game import Game, view_for
+    from backend.game_core.simulation import GreedyPolicy
+
+    game = Game([{'id': f'p{seat}', 'name': f'Player {seat}'} for seat in range(4)], seed=1, verbose=False)
+    game.current_player.draw_cards(game.deck, 2)
+    policy = GreedyPolicy()
+    for _ in range(40):
+        game.apply_move(policy.choose_move(game, game.acting_player, game.rng))
+    game.track_changes()
+    full_state = {'type': 'game_update', 'state': game.to_dict('p0'), 'isFullState': True, 'version': 1}
+    game.apply_move(policy.choose_move(game, game.acting_player, game.rng))
+    update = {'type': 'game_update', 'state': view_for(game.changes(), 'p0'), 'isFullState': False, 'version': 2}
+    card = game.discard_pile[-1] if game.discard_pile else game.players[0].bank[-1]
+    card_played = {'type': 'card_played', 'player_id': 'p0', 'action': 'to_bank', 'action_type': 'to_bank', 'card': card.to_dict()}
+    return {'full state': full_state, 'update': update, 'card played': card_played}
+
+def benchmark(repeat=20000):
+    import timeit
+
+    for label, message in sample_messages().items():
+        print(f"{label} ({len(json.dumps(message))} bytes as stdlib JSON):")
+        baseline = None
+        for name, (encode, decode) in reversed(list(available_backends().items())):
+            data = encode(message)
+            encode_time = min(timeit.repeat(lambda: encode(message).decode(), number=repeat, repeat=3)) / repeat
+            decode_time = min(timeit.repeat(lambda: decode(data), number=repeat, repeat=3)) / repeat
+            baseline = baseline or (encode_time, decode_time)
+            print(f"  {name:8} encode {encode_time * 1e6:7.2f} us ({baseline[0] / encode_time:4.1f}x)"
+                  f"  decode {decode_time * 1e6:7.2f} us ({baseline[1] / decode_time:4.1f}x)  {len(data)} bytes")
+        if msgpack:
+            data = pack(message)
+            encode_time = min(timeit.repeat(lambda: pack(message), number=repeat, repeat=3)) / repeat
+            decode_time = min(timeit.repeat(lambda: unpack(data), number=repeat, repeat=3)) / repeat
+            print(f"  {'msgpack':8} encode {encode_time * 1e6:7.2f} us ({baseline[0] / encode_time:4.1f}x)"
+                  f"  decode {decode_time * 1e6:7.2f} us ({baseline[1] / decode_time:4.1f}x)  {len(data)} bytes"
+                  f" ({len(data) / len(json.dumps(message)):.0%} of JSON; binary protocol, cards by reference)")
+
+if __name__ == "__main__":
+    print(f"Selected backend: {BACKEND}")
+    benchmark()
@@ -1,13 +1,53 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
-import json
-from backend.game_core.game import Game
+from backend.game_core.game import view_for
+from backend.game_core.replay import new_game, move_to_event, replay, snapshot_game
+from backend.game_core import moves
+from backend.game_core.moves import PendingAction
+from backend.game_core.mcts import MCTSPolicy
+from backend.game_core.actions import common_functions
+from backend.game.game_store import get_game_store
+from backend.game.event_log import get_event_log
+from backend.game import room_router
+from backend.game import codec
+from backend.game import lookup_cache
 from channels.db import database_sync_to_async
+from django.db import transaction
+from django.db.models import F, Max
+from channels.layers import get_channel_layer
+from concurrent.futures import ProcessPoolExecutor
 import asyncio
+import logging
+import multiprocessing
 import random
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Action cards whose effect is a payment; a Just Say No against them skips the player owing
+PAYMENT_CARD_NAMES = {"it's your birthday", 'rent', 'double the rent', 'multicolor rent', 'debt collector'}
+
+BOT_ID_PREFIX = 'bot-'
+BOT_TIME_LIMIT = 1.0  # Seconds a bot searches before each move
+BOT_MOVE_DELAY = 1.0  # Pause before each bot move so the table can follow the animations
+BOT_SEARCH_PROCESSES = None  # Processes the bot searches run in (None for one per CPU)
+ROOM_WORKER_IDLE_TIMEOUT = 300  # Seconds a room's worker waits for a message before shutting down
+# Messages handled before a game exists; any other message for a room without a game recovers it from its event log
+LOBBY_ACTIONS = {'establish_connection', 'player_ready', 'add_bot', 'start_game', 'player_disconnected'}
+SNAPSHOT_EVERY = 20  # Logged events after which a room's game is snapshotted, if no turn ended meanwhile
+LEAVE_CLOSE_CODE = 1000  # Close code of a client leaving its room (see WebSocketContext.js); other closes keep a game's seat
+
+def original_action(data):
+    """The action message a Just Say No message is about; older clients send it JSON-encoded as a string."""
+    original = data.get('data')
+    return codec.loads(original) if isinstance(original, str) else original
 
 class GameConsumer(AsyncWebsocketConsumer):
     
-    game_instances = {}
+    bot = MCTSPolicy(time_limit=BOT_TIME_LIMIT)  # Plays every bot seat; bot players are told apart by their id
+    bot_executor = None  # Process pool the bot searches run in, started by the first search (see choose_bot_move)
+    room_queues = {}  # room id -> asyncio.Queue of (consumer, message) waiting for the room's worker
+    room_workers = {}  # room id -> task handling that room's messages one at a time
+    room_games = {}  # room id -> (game, version) kept by the room's worker when no other process writes it
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -15,12 +55,20 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.room_id = None
         self.game_group_name = None
         self.connection_rejected = False
+        self.binary = False  # Whether this socket gets MessagePack frames (see codec)
+        # The room's game while a message is being handled (see handle_room_message)
+        self.game_state = None
+        self.game_version = 0
+        # Messages held back while a room message is handled, as (group, encoded message) (see flush_outbox)
+        self.outbox = None
+        self.game_start = None  # (players, seed) of a game started by the message being handled, for the event log
         
     ########## CONNECTION HANDLING ##########
     
     async def add_player_to_room(self, room_id, game_group_name, player_id):
         """
-        Check if the player can join the room.
+        Check if the player can join the room. A player already seated in it (coming back on a new socket
+        after a dropped connection or a worker restart) is attached to their seat again, and sent the game.
         """
         self.player_id = player_id
         room = await self.db_get_room_by_id(room_id)
@@ -31,24 +79,31 @@ class GameConsumer(AsyncWebsocketConsumer):
         if not user:
             await self.reject_connection("User not found")
             return
-        if room.has_started:
-            await self.reject_connection("The game has already begun")
-            return
-        
+
         # Check if player is already in the room
         player_exists = any(player['id'] == str(user.unique_id) for player in room.players)
         if player_exists:
-            await self.reject_connection("You are already in this room! Player:" + user.username)
+            await self.channel_layer.group_add(game_group_name, self.channel_name)
+            await self.channel_layer.group_add(self.player_group_name(player_id), self.channel_name)
+            if self.game_state:
+                await self.send_player_state(player_id, self.game_state.to_dict(player_id))
+            return
+        if room.has_started:
+            await self.reject_connection("The game has already begun")
             return
         if room.player_count >= room.max_players:
             await self.reject_connection("Room is full.")
             return
         
-        # Add player to room
-        await self.db_add_player_to_room(room, user)
+        # Add player to room; the checks above are repeated on the locked row, as others may be joining too
+        reason = await self.db_add_player_to_room(room, user)
+        if reason:
+            await self.reject_connection(reason)
+            return
 
-        # Add player to game group
+        # Add player to game group, and to their own group for the game state only they may see
         await self.channel_layer.group_add(game_group_name, self.channel_name)
+        await self.channel_layer.group_add(self.player_group_name(player_id), self.channel_name)
 
     async def connect(self):
         """
@@ -58,7 +113,15 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.room_id = self.scope['url_route']['kwargs']['room_id']
         self.game_group_name = f'game_{self.room_id}'
         self.player_id = None
-        await self.accept()
+        # Serve the rooms this worker owns for sockets held by other workers, in case no startup hook did (see room_router)
+        room_router.start_listener(self.channel_layer, GameConsumer.handle_forwarded_message)
+        # JSON text frames unless the client asked for the binary protocol
+        subprotocol = codec.choose_subprotocol(self.scope.get('subprotocols', []))
+        self.binary = subprotocol is not None
+        await self.accept(subprotocol)
+        # After a restart, rebuild the room's game from its event log before its first message needs it
+        if not room_router.is_local(self.room_id) or self.room_id not in GameConsumer.room_queues:
+            await self.route_message({'action': 'rehydrate'})
 
     async def disconnect(self, close_code):
         """
@@ -69,99 +132,206 @@ class GameConsumer(AsyncWebsocketConsumer):
             
         # Check if this was a rejected connection
         if getattr(self, 'connection_rejected', False):
-            print("Rejected connection, skipping disconnect handling.")
+            logger.info("Rejected connection, skipping disconnect handling.")
             return
             
-        if self.player_id:
-            # Get room and check if game has started
-            room = await self.db_get_room_by_id(self.room_id)
-            
-            # If game is in progress, notify other players about the disconnection
-            if room and room.has_started:
-                # Get the disconnected player's username for the notification
-                user = await self.db_get_user_by_unique_id(self.player_id)
-                username = user.username if user else "Unknown player"
-                
-                # Broadcast player disconnection to all players in the room
-                await self.channel_layer.group_send(
-                    self.game_group_name,
-                    {
-                        'type': 'broadcast_player_disconnected',
-                        'player_id': str(self.player_id),
-                        'username': username
-                    }
-                )
-
-            # Remove player from room
-            await self.db_remove_player_from_room(self.player_id)
-        
         # Remove from game group
         await self.channel_layer.group_discard(self.game_group_name, self.channel_name)
+        if self.player_id:
+            await self.channel_layer.group_discard(self.player_group_name(self.player_id), self.channel_name)
+            # Freeing the seat and telling the others is done by the room's worker (see remove_player_from_room)
+            await self.route_message({'action': 'player_disconnected', 'left': close_code == LEAVE_CLOSE_CODE})
+
+    async def remove_player_from_room(self, left=True):
+        """
+        Free the seat of a player whose socket closed, telling the others if their game is in progress. A
+        player whose connection dropped (or whose worker shut down) without leaving keeps their seat in a
+        game in progress, to come back to on a new socket (see add_player_to_room).
+        """
+        # Get room and check if game has started
+        room = await self.db_get_room_by_id(self.room_id)
         
-        # Broadcast updated state to remaining players
-        await self.send_room_update()
+        # If game is in progress, notify other players about the disconnection
+        if room and room.has_started:
+            # Get the disconnected player's username for the notification
+            user = await self.db_get_user_by_unique_id(self.player_id)
+            username = user.username if user else "Unknown player"
+            
+            # Broadcast player disconnection to all players in the room
+            await self.group_send(
+                self.game_group_name,
+                {
+                    'type': 'broadcast_player_disconnected',
+                    'player_id': str(self.player_id),
+                    'username': username
+                }
+            )
+            if not left:
+                return
+
+        # Remove player from room
+        if await self.db_remove_player_from_room(self.player_id):
+            await self.discard_game()
 
     async def reject_connection(self, reason):
         """
-        Reject a WebSocket connection with a specified reason.
+        Reject a WebSocket connection with a specified reason. The joining socket may be held by another
+        worker process, so it is told through the channel layer (see reject_socket).
         """
         self.connection_rejected = True
-        print(f"Room {self.room_id}: {reason}, rejecting connection")
-        await self.send(text_data=json.dumps({
+        logger.info(f"Room {self.room_id}: {reason}, rejecting connection")
+        await self.channel_layer.send(self.channel_name, {'type': 'reject_socket', 'text': codec.dumps({
             'type': 'rejection',
             'data': reason
-        }))
+        })})
+
+    async def reject_socket(self, event):
+        """Channel layer handler: send this socket its rejection and close it."""
+        self.connection_rejected = True
+        await self.send_frame(event)
         await self.close()
 
-    def calculate_state_diff(self, previous_state, current_state):
+    async def receive(self, text_data=None, bytes_data=None):
         """
-        Calculate the difference between previous and current game states.
-        Returns a dictionary containing only the changed values.
+        Handle incoming WebSocket messages.
+        Messages are queued for the room's worker, which handles them one at a time in arrival order, so two
+        players' actions never interleave across the awaits inside a handler (see route_message).
         """
-        diff = {}
-        
-        # Handle simple fields
-        for key in ['deck_count', 'current_turn', 'actions_remaining', 'winner']:
-            if previous_state.get(key) != current_state.get(key):
-                diff[key] = current_state.get(key)
-        
-        # Handle discard pile changes
-        if previous_state.get('discard_pile') != current_state.get('discard_pile'):
-            diff['discard_pile'] = current_state.get('discard_pile')
-        
-        # Handle player changes
-        if 'players' in current_state:
-            player_diffs = []
-            current_players = {p['id']: p for p in current_state['players']}
-            previous_players = {p['id']: p for p in previous_state.get('players', [])}
-            
-            for player_id, current_player in current_players.items():
-                player_diff = {}
-                if player_id in previous_players:
-                    prev_player = previous_players[player_id]
-                    # Check each player attribute for changes
-                    for attr in ['hand', 'bank', 'properties']:
-                        if current_player.get(attr) != prev_player.get(attr):
-                            player_diff[attr] = current_player.get(attr)
-                else:
-                    # New player, include all data
-                    player_diff = current_player
-                
-                if player_diff:
-                    player_diff['id'] = player_id  # Always include ID for reference
-                    player_diffs.append(player_diff)
-            
-            if player_diffs:
-                diff['players'] = player_diffs
-        
-        return diff
-    
-    async def receive(self, text_data):
+        data = codec.loads(text_data) if text_data is not None else codec.unpack(bytes_data)
+        if data.get('action') == 'establish_connection':
+            # Known here too, for this socket's disconnect and the messages it forwards
+            self.player_id = str(data.get('player_id'))
+        await self.route_message(data)
+
+    async def route_message(self, data):
         """
-        Handle incoming WebSocket messages.
+        Queue a message for the room's worker, forwarding it to the worker process owning the room if that is
+        not this one. The worker reaches this socket through its channel name (joining adds it to the groups).
+        """
+        if room_router.is_local(self.room_id):
+            self.enqueue_message(data)
+        else:
+            await room_router.forward(self.channel_layer, self.room_id, self.player_id, data, self.channel_name)
+
+    async def handle_room_message(self, data):
+        """
+        Handle one message against the room's stored game: load it, handle the message, and save it back
+        unless another worker saved a newer version meanwhile. That message is then dropped and everyone
+        is resynced to the stored game.
+        When no other process writes the room's game (see owns_game), the worker keeps it between messages
+        instead of loading it each time, and saves it once the messages queued for the room are handled.
+        Everything the message sends goes out together once it is handled (or before a bot's move), and the
+        moves it applied are appended to the room's event log once the game is saved. A game that is over is
+        dropped once its final state is sent (see discard_game). A 'rehydrate' message (queued when a socket
+        connects) only recovers a missing game.
+        """
+        store = get_game_store()
+        owned = self.owns_game()
+        self.outbox = []
+        self.game_start = None
+        try:
+            if owned and self.room_id in GameConsumer.room_games:
+                self.game_state, self.game_version = GameConsumer.room_games[self.room_id]
+            else:
+                self.game_state, self.game_version = await store.load(self.room_id)
+            if self.game_state is None and data.get('action') not in LOBBY_ACTIONS:
+                await self.recover_game()
+            # Clients last saw the stored game, so state diffs start from it
+            if self.game_state:
+                self.game_state.track_changes()
+                self.game_state.move_log = []
+            await self.handle_message(data)
+            if self.game_state is None:
+                return
+            if self.game_state.winner:
+                await self.discard_game()  # Everyone has been sent the final state
+                return
+            if owned:
+                GameConsumer.room_games[self.room_id] = (self.game_state, self.game_version)
+                await self.record_events()
+                if self.room_drained():
+                    await self.save_game(data.get('action'))  # Else after the room's last queued message
+            elif await self.save_game(data.get('action')):
+                await self.record_events()
+        finally:
+            await self.flush_outbox()
+            self.outbox = None
+
+    async def save_game(self, action):
+        """
+        Save the room's game. If another worker saved a newer version meanwhile, `action` (the message
+        handled last) is dropped and everyone is resynced to the stored game. Returns whether it was saved.
+        """
+        store = get_game_store()
+        version = await store.save(self.room_id, self.game_state, self.game_version)
+        if version is None:
+            logger.info(f"Room {self.room_id}: {action} conflicted with a newer game state, resyncing")
+            GameConsumer.room_games.pop(self.room_id, None)
+            self.game_state, self.game_version = await store.load(self.room_id)
+            await self.send_game_state(full_state=True)
+            return False
+        self.game_version = version
+        if self.room_id in GameConsumer.room_games:
+            GameConsumer.room_games[self.room_id] = (self.game_state, version)
+        return True
+
+    async def discard_game(self):
+        """Forget the room's game everywhere it is kept, its event log included, once it is over or the room is gone."""
+        GameConsumer.room_games.pop(self.room_id, None)
+        await get_game_store().delete(self.room_id)
+        await get_event_log().delete(self.room_id)
+
+    def owns_game(self):
+        """
+        Whether no other process writes this room's game: the store is this process's own, or the room is
+        pinned to this worker (see room_router).
         """
-        data = json.loads(text_data)
+        return not get_game_store().shared or room_router.num_workers() > 1 and room_router.is_local(self.room_id)
+
+    def room_drained(self):
+        """Whether no more messages wait in the room's queue (always, for a message not handled by a worker)."""
+        queue = GameConsumer.room_queues.get(self.room_id)
+        return queue is None or queue.empty()
+
+    async def record_events(self):
+        """
+        Append what the handled message did to the room's event log: the game's start, then its moves. The
+        game is snapshotted when a turn has just ended, or every SNAPSHOT_EVERY events within a long turn.
+        """
+        event_log = get_event_log()
+        if self.game_start:
+            await event_log.start(self.room_id, *self.game_start)
+        game_state = self.game_state
+        if game_state.move_log:
+            pending = await event_log.append(self.room_id, [move_to_event(move) for move in game_state.move_log])
+            turn_ended = game_state.actions_remaining == 3 and not game_state.pending_action
+            if turn_ended or pending >= SNAPSHOT_EVERY:
+                await event_log.save_snapshot(self.room_id, snapshot_game(game_state))
+
+    async def recover_game(self):
+        """
+        Rebuild the room's game from its latest snapshot and the events logged since, when the game store has
+        none (e.g. the worker holding it restarted), and send everyone the recovered game. Rooms whose game
+        has not started (or reuse the code of an old game's room) have nothing to recover.
+        """
+        room = await self.db_get_room_by_id(self.room_id)
+        if not room or not room.has_started:
+            return
+        log = await get_event_log().load(self.room_id)
+        if log is None:
+            return
+        self.game_state = replay(*log)
+        source = "a snapshot and " if log[3] else ""
+        logger.info(f"Room {self.room_id}: recovered the game from {source}{len(log[2])} logged moves")
+        await self.send_game_state(full_state=True)
+
+    async def handle_message(self, data):
         action = data.get('action')
+        # A socket only acts as its own player; a rent_request's player is the payee, not the sender
+        claimed_id = data.get('playerId') if action in ('just_say_no_choice', 'just_say_no_response') else data.get('player')
+        if action != 'rent_request' and claimed_id is not None and str(claimed_id) != str(self.player_id):
+            logger.warning(f"Room {self.room_id}: rejected {action} from {self.player_id} made as {claimed_id}")
+            return
 
         ##### ROOM MANAGEMENT #####
         if action == 'establish_connection':
@@ -172,24 +342,30 @@ class GameConsumer(AsyncWebsocketConsumer):
             readiness = data.get('isReady')
             await self.db_set_player_ready(readiness)
             await self.send_room_update()
+        elif action == 'add_bot':
+            await self.db_add_bot_to_room()
+            await self.send_room_update()
+        elif action == 'player_disconnected':
+            if self.player_id:
+                await self.remove_player_from_room(data.get('left', True))
+            await self.send_room_update()
 
         ##### GAME MANAGEMENT #####
         elif action == 'start_game':
-            # Create a new game instance for this room
+            # Create a new game instance for this room, seating the players stored when it was marked started
             room = await self.db_get_room_by_id(self.room_id)
-            await self.db_mark_game_start(room)
+            players = await self.db_mark_game_start(room)
             
             # Shuffle players to randomize turn order
-            shuffled_players = list(room.players)
+            shuffled_players = list(players)
             random.shuffle(shuffled_players)
             
-            # Create game with shuffled players
-            GameConsumer.game_instances[self.room_id] = Game(shuffled_players)
-            # Draw 2 cards for the first player
-            game_state = GameConsumer.game_instances[self.room_id]
-            first_player = game_state.players[game_state.turn_index]
-            first_player.draw_cards(game_state.deck, 2)
-            await self.channel_layer.group_send(
+            # Create game with shuffled players (the first player draws 2 cards), from a seed the event log keeps
+            seed = random.getrandbits(64)
+            self.game_state = new_game(shuffled_players, seed)
+            self.game_state.move_log = []
+            self.game_start = ([{'id': player['id'], 'name': player['name']} for player in shuffled_players], seed)
+            await self.group_send(
                 self.game_group_name,
                 {
                     'type': 'broadcast_game_started',
@@ -199,27 +375,33 @@ class GameConsumer(AsyncWebsocketConsumer):
         elif action == 'initial_game_state':
             # For initial game state, always send the full state
             await self.send_game_state(full_state=True)
+            await self.play_bot_turns()
+        elif action == 'resync':
+            # The client missed an update (a gap in the state versions); send it the whole game again
+            if self.game_state:
+                await self.send_player_state(self.player_id, self.game_state.to_dict(self.player_id))
         elif action == 'skip_turn':
-            game_state = GameConsumer.game_instances[self.room_id]
-            player_id = data.get('player')
-            if player_id == str(game_state.players[game_state.turn_index].id):
-                game_state.actions_remaining = 1  # This will trigger the turn switch in manage_turns
-                self.manage_turns(game_state)  # This will switch turns
+            game_state = self.game_state
+            if game_state.apply_move(moves.EndTurn(self.player_id)):
                 await self.send_game_state()
+                await self.play_bot_turns()
+        elif action == 'rehydrate':
+            return  # Recovering a missing game is all it does (see handle_room_message)
         
         ###### GAME ACTIONS ######
         no_turn_actions = {'just_say_no_choice', 'just_say_no_response', 'rent_request', 'rent_payment', 'rent_paid'}
         card = data.get('card')
-        if not card:
+        if not card and action != 'rent_paid':
             # No card was provided (e.g., player dragged a card already played due to really quick dragging)
             return
         if action in no_turn_actions:
             await self.handle_action_without_notification(data)
+        elif await self.offer_just_say_no(data):
+            pass  # Carried on once the target's just_say_no_response arrives
         else:
-            game_state = GameConsumer.game_instances[self.room_id]
-            await self.handle_action_with_notification(data)
-            self.manage_turns(game_state)
+            await self.handle_action_with_notification(data, self.player_id)
             await self.send_game_state()
+        await self.play_bot_turns()
     
     async def handle_action_without_notification(self, data):
         action = data.get('action')
@@ -230,562 +412,124 @@ class GameConsumer(AsyncWebsocketConsumer):
         elif action == 'rent_request': 
             await self.play_rent_request(data)
         elif action == 'rent_payment':
-            await self.play_rent_payment(data)
+            await self.play_rent_payment(data, self.player_id)
         elif action == 'rent_paid':
             await self.play_rent_paid(data)
 
-    async def handle_action_with_notification(self, data):
-        card = data.get('card')
-        player_id = data.get('player')
+    def build_move(self, data, player_id):
+        """
+        Translate a websocket action message into a game_core Move made by player_id (None for unknown actions).
+        The message's own 'player' is never trusted: the caller knows who is acting.
+        """
         action = data.get('action')
-        game_state = GameConsumer.game_instances[self.room_id]
-        player = next((p for p in game_state.players if p.id == player_id), None)
-        
-        # Send card played notification before handling the action
-        if card:  # Only send if there's a card being played
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_card_played',
-                    'player_id': player_id,
-                    'action': action,
-                    'action_type': 'to_bank' if action == 'to_bank' else 'to_properties' if action == 'to_properties' else 'action',
-                    'card': card
-                }
-            )
-        
+        card = data.get('card')
         if action == 'to_bank':
-            self.play_to_bank(player, card['id'])
-            
+            return moves.BankCard(player_id, card['id'])
         elif action == 'to_properties':
-            self.play_to_properties(player, card['id'], card['currentColor'])  
-            
+            # Houses and hotels are dropped on the property area too; the client sets the chosen set's color
+            if card.get('type') == 'action':
+                return moves.PlaceBuilding(player_id, card['id'], card.get('currentColor'))
+            return moves.PlayProperty(player_id, card['id'], card.get('currentColor'))
         elif action == 'pass_go':
-            self.play_pass_go(game_state, player, card['id'])
-            
+            return moves.PlayPassGo(player_id, card['id'])
         elif action == "it's_your_birthday":
-            await self.play_its_your_birthday(game_state, player, card['id'])
-            
+            return moves.PlayBirthday(player_id, card['id'])
         elif action == 'debt_collector':
-            await self.play_debt_collector(game_state, player, data['targetPlayer'], card['id'])
-            
+            return moves.PlayDebtCollector(player_id, card['id'], data.get('targetPlayer'))
+        # The game works out the rent from the chosen color; the client's rentAmount is only for display
         elif action == 'multicolor rent':
-            await self.play_multicolor_rent(game_state, player, card['id'], data.get('rentAmount'), data.get('targetPlayer'))
-            
+            return moves.PlayRent(player_id, card['id'], data.get('rentColor'), target_id=data.get('targetPlayer'))
         elif action == 'rent':
-            await self.play_initial_rent(game_state, player, card, data.get('rentAmount'))
-            
+            return moves.PlayRent(player_id, card['id'], data.get('rentColor'))
+        elif action == 'double_the_rent':
+            return moves.PlayRent(player_id, card['id'], data.get('rentColor'), target_id=data.get('targetPlayer') or None,
+                                  double_the_rent_id=data.get('double_the_rent_card')['id'])
         elif action == 'sly_deal':
-            await self.play_sly_deal(game_state, player, card['id'], data.get('target_property')['id'])
-            
+            return moves.PlaySlyDeal(player_id, card['id'], data.get('target_property')['id'])
         elif action == 'forced_deal':
-            await self.play_forced_deal(game_state, player, card['id'], data.get('target_property')['id'], data.get('user_property')['id'])
-            
+            return moves.PlayForcedDeal(player_id, card['id'], data.get('target_property')['id'], data.get('user_property')['id'])
         elif action == 'deal_breaker':
-            await self.play_deal_breaker(game_state, player, card['id'], data.get('target_set'), data.get('target_color'))
-            
-        elif action == 'double_the_rent':
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_card_played',
-                    'player_id': player_id,
-                    'action': action,
-                    'action_type': 'to_bank' if action == 'to_bank' else 'to_properties' if action == 'to_properties' else 'action',
-                    'card': data.get('double_the_rent_card')
-                }
-            )
-            await self.play_double_the_rent(game_state, player, card['id'], data.get('double_the_rent_card')['id'], data.get('rentAmount'), data.get('targetPlayer') or None)
-            self.manage_turns(game_state)  # The additional turn is handled here
-
-    def play_to_bank(self, player, card_id):
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if card_to_play:
-            player.hand.remove(card_to_play)
-            player.bank.append(card_to_play)
-
-    def play_to_properties(self, player, card_id, color):
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if card_to_play:
-            card_to_play.current_color = color
-            player.hand.remove(card_to_play)
-            if not player.properties.get(card_to_play.current_color):
-                player.properties[card_to_play.current_color] = []
-            player.properties[card_to_play.current_color].append(card_to_play) 
-
-    def play_pass_go(self, game_state, player, card_id):
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if card_to_play:
-            player.hand.remove(card_to_play)
-            player.draw_cards(game_state.deck, 2)
-            game_state.discard_pile.append(card_to_play)
-    
-    async def play_its_your_birthday(self, game_state, player, card_id):
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-        player.hand.remove(card_to_play)
-        # Send rent request
-        game_state.player_ids_to_pay = [p.id for p in game_state.players if p.id != player.id]
-        game_state.num_players_owing = len(game_state.player_ids_to_pay)
-        game_state.total_paying_players = len(game_state.player_ids_to_pay)
-        game_state.rent_amount = 2  # It's Your Birthday cards request 2M
-        game_state.rent_type = "it's your birthday"
-        game_state.rent_card = card_to_play
-        game_state.rent_recipient_id = str(player.id)
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_pre_request',
-                'amount': game_state.rent_amount,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing,
-                'card': game_state.rent_card.to_dict()  # Convert card object to dictionary
-            }
-        )
-        game_state.discard_pile.append(card_to_play)
-
-    async def play_debt_collector(self, game_state, player, target_player_id, card_id):
-        print("Target player id:", target_player_id)
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-        player.hand.remove(card_to_play)
-        game_state.player_ids_to_pay = [target_player_id]
-        game_state.num_players_owing = 1
-        game_state.total_paying_players = 1
-        game_state.rent_amount = 5  # Debt Collector cards request 5M
-        game_state.rent_type = "debt collector"
-        game_state.rent_card = card_to_play
-        game_state.rent_recipient_id = str(player.id)
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_pre_request',
-                'amount': game_state.rent_amount,
-                'rent_type': game_state.rent_type,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing,
-                'card': game_state.rent_card.to_dict()
-            }
-        )
-        game_state.discard_pile.append(card_to_play)
-
-    async def play_double_the_rent(self, game_state, player, rent_card_id, double_the_rent_card_id, rent_amount, target_player_id=None):
-        """Handle double the rent card play"""
-        rent_card_to_play = next((c for c in player.hand if c.id == rent_card_id), None)
-        double_the_rent_card_to_play = next((c for c in player.hand if c.id == double_the_rent_card_id), None)
-        if not rent_card_to_play or not double_the_rent_card_to_play:
-            return
-        player.hand.remove(rent_card_to_play)
-        player.hand.remove(double_the_rent_card_to_play)
-        if target_player_id:
-            game_state.player_ids_to_pay = [target_player_id]
-        else:
-            game_state.player_ids_to_pay = [p.id for p in game_state.players if p.id != player.id]
-        game_state.num_players_owing = len(game_state.player_ids_to_pay)
-        game_state.total_paying_players = len(game_state.player_ids_to_pay)
-        game_state.rent_amount = rent_amount
-        game_state.rent_type = "double_the_rent"
-        game_state.rent_card = double_the_rent_card_to_play
-        # game_state.double_the_rent_card = double_the_rent_card_to_play
-        game_state.rent_recipient_id = str(player.id)
-        # Send rent request
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_pre_request',
-                'amount': game_state.rent_amount,
-                'rent_type': game_state.rent_type,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing,
-                'card': game_state.rent_card.to_dict()
-            }
-        )
-        game_state.discard_pile.append(double_the_rent_card_to_play)
-        
-    async def play_multicolor_rent(self, game_state, player, card_id, rent_amount, target_player_id):
-        """Handle multicolor rent card play"""
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-        player.hand.remove(card_to_play)
-        game_state.player_ids_to_pay = [target_player_id]
-        game_state.num_players_owing = 1
-        game_state.total_paying_players = 1
-        game_state.rent_amount = rent_amount
-        game_state.rent_type = "multicolor rent"
-        game_state.rent_card = card_to_play
-        game_state.rent_recipient_id = str(player.id)
-        # Send rent request
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_pre_request',
-                'amount': game_state.rent_amount,
-                'rent_type': game_state.rent_type,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing,
-                'card': game_state.rent_card.to_dict()
-            }
-        )
-        game_state.discard_pile.append(card_to_play)
+            # The client sends the set it picked, not its owner; whoever holds those cards is the target
+            card_ids = [c['id'] for c in data.get('target_set')]
+            zone = self.game_state.find_card(card_ids[0])[1] if card_ids else None
+            return moves.PlayDealBreaker(player_id, card['id'], data.get('target_color'),
+                                         target_id=zone.owner_id if zone is not None else None, card_ids=card_ids)
+        return None
 
-    async def play_initial_rent(self, game_state, player, card, rent_amount):
-        """Handle rent card play"""
-        card_to_play = next((c for c in player.hand if c.id == card['id']), None)
-        if not card_to_play:
-            return
-        player.hand.remove(card_to_play)
-        # Send rent request
-        game_state.player_ids_to_pay = [p.id for p in game_state.players if p.id != player.id]
-        game_state.num_players_owing = len(game_state.player_ids_to_pay)
-        game_state.total_paying_players = len(game_state.player_ids_to_pay)
-        game_state.rent_amount = rent_amount
-        game_state.rent_type = "rent"
-        game_state.rent_card = card_to_play
-        game_state.rent_recipient_id = str(player.id)
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {                
-                'type': 'broadcast_rent_pre_request',
-                'amount': game_state.rent_amount,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing,
-                'card': game_state.rent_card.to_dict()  # Convert card object to dictionary
-            }
-        )
-        game_state.discard_pile.append(card_to_play)
+    async def handle_action_with_notification(self, data, player_id):
+        card = data.get('card')
+        action = data.get('action')
+        game_state = self.game_state
+        move = self.build_move(data, player_id)
+        if not move:
+            return None
+        result = game_state.apply_move(move)
+        if not result:
+            logger.warning(f"Room {self.room_id}: rejected {action} from {player_id}: {result.error}")
+            return None
+        if isinstance(move, (moves.PlaySlyDeal, moves.PlayForcedDeal, moves.PlayDealBreaker)):
+            # Any Just Say No was already settled on the client before this message was sent
+            result.events += game_state.apply_move(moves.AcceptAction(game_state.pending_action.responder_id)).events
         
-    async def play_forced_deal(self, game_state, player, card_id, target_property_id, user_property_id):
-        """Handle forced deal action"""
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-
-        # Find target player and their property
-        target_player = None
-        target_property = None
-        target_property_color = None
-        for p in game_state.players:
-            if p != player:  # Don't search in the current player's properties
-                for color, props in p.properties.items():
-                    for prop in props:
-                        if prop.id == target_property_id:
-                            target_player = p
-                            target_property = prop
-                            target_property_color = color
-                            break
-                    if target_property:
-                        break
-                if target_property:
-                    break
-
-        if not target_player or not target_property:
-            return
+        # Send card played notification before the action's own broadcasts
+        await self.broadcast_card_played_notification(player_id, action, card)
+        if action == 'double_the_rent':
+            await self.broadcast_card_played_notification(player_id, action, data.get('double_the_rent_card'))
+        await self.broadcast_events(result.events)
+        return result
 
-        # Find current player's property
-        current_player = player
-        user_property = None
-        user_property_color = None
-        for color, props in current_player.properties.items():
-            for prop in props:
-                if prop.id == user_property_id:
-                    user_property = prop
-                    user_property_color = color
-                    break
-            if user_property:
-                break
-
-        if not user_property:
-            return
-
-        # Define set requirements
-        set_requirements = {
-            'brown': 2, 'mint': 2, 'blue': 2,
-            'light blue': 3, 'pink': 3, 'orange': 3, 
-            'red': 3, 'yellow': 3, 'green': 3,
-            'black': 4
-        }
-
-        # Handle houses and hotels for current player's property
-        user_color_cards = current_player.properties.get(user_property_color, [])
-        if user_color_cards:
-            # Separate cards by type
-            property_cards = [card for card in user_color_cards if card.card_type.lower() == 'property']
-            house_cards = [card for card in user_color_cards if card.card_type.lower() == 'action' and card.name.lower() == 'house']
-            hotel_cards = [card for card in user_color_cards if card.card_type.lower() == 'action' and card.name.lower() == 'hotel']
-            
-            required_cards = set_requirements.get(user_property_color, 0)
-            if len(property_cards) == 2 * required_cards:
-                if len(house_cards) > 1:
-                    current_player.properties[user_property_color].remove(house_cards[0])
-                    current_player.bank.append(house_cards[0])
-                if len(hotel_cards) > 1:
-                    current_player.properties[user_property_color].remove(hotel_cards[0])
-                    current_player.bank.append(hotel_cards[0])
-            elif len(property_cards) == required_cards:
-                if house_cards:
-                    current_player.properties[user_property_color].remove(house_cards[0])
-                    current_player.bank.append(house_cards[0])
-                if hotel_cards:
-                    current_player.properties[user_property_color].remove(hotel_cards[0])
-                    current_player.bank.append(hotel_cards[0])
-
-        # Remove properties from their current sets
-        for color, props in target_player.properties.items():
-            if target_property in props:
-                props.remove(target_property)
-                if not props:  # Remove empty color sets
-                    del target_player.properties[color]
-                break
-
-        for color, props in current_player.properties.items():
-            if user_property in props:
-                props.remove(user_property)
-                if not props:  # Remove empty color sets
-                    del current_player.properties[color]
-                break
-
-        # Add properties to their new owners
-        if target_property_color not in current_player.properties:
-            current_player.properties[target_property_color] = []
-        current_player.properties[target_property_color].append(target_property)
-
-        if user_property_color not in target_player.properties:
-            target_player.properties[user_property_color] = []
-        target_player.properties[user_property_color].append(user_property)
-
-        # Remove the forced deal card from player's hand
-        current_player.hand.remove(card_to_play)
-        game_state.discard_pile.append(card_to_play)
-
-        # Broadcast the property swap animation
-        await self.channel_layer.group_send(
+    async def broadcast_card_played_notification(self, player_id, action, card):
+        await self.group_send(
             self.game_group_name,
             {
-                'type': 'broadcast_property_swap',
-                'property1': target_property.to_dict(),
-                'property2': user_property.to_dict(),
-                'player1_id': player.id,
-                'player2_id': target_player.id,
-                'player1_name': player.name,
-                'player2_name': target_player.name
+                'type': 'broadcast_card_played',
+                'player_id': player_id,
+                'action': action,
+                'action_type': 'to_bank' if action == 'to_bank' else 'to_properties' if action == 'to_properties' else 'action',
+                'card': card
             }
         )
 
-    async def play_deal_breaker(self, game_state, player, card_id, target_set, target_color):
-        """Handle deal breaker action"""
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-        
-        # Find the target player who owns the set
-        target_player = None
-        for p in game_state.players:
-            if p != player and target_color in p.properties:
-                # Check if the target set matches the player's properties
-                target_card_ids = {card['id'] for card in target_set}
-                player_card_ids = {card.id for card in p.properties[target_color]}
-                if target_card_ids.issubset(player_card_ids):
-                    target_player = p
-                    break
-        
-        if target_player:
-            # First, get all the cards we want to transfer
-            cards_to_transfer = [
-                card for card in target_player.properties[target_color]
-                if card.id in {c['id'] for c in target_set}
-            ]
-            
-            # Add the cards to the current player's properties
-            if target_color not in player.properties:
-                player.properties[target_color] = []
-            player.properties[target_color].extend(cards_to_transfer)
-            
-            # Remove the cards from the target player
-            target_player.properties[target_color] = [
-                card for card in target_player.properties[target_color]
-                if card.id not in {c['id'] for c in target_set}
-            ]
-            
-            # If no cards left in that color, remove the color entry
-            if not target_player.properties[target_color]:
-                del target_player.properties[target_color]
-            
-            # Remove the deal breaker card from hand and add to discard pile
-            player.hand.remove(card_to_play)
-            game_state.discard_pile.append(card_to_play)
-            
-            # Send deal breaker overlay
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_deal_breaker_overlay',
-                    'stealerId': player.id,
-                    'targetId': target_player.id,
-                    'color': target_color,
-                    'property_set': [card.to_dict() for card in cards_to_transfer]
-                }
-            )
-
-    async def play_sly_deal(self, game_state, player, card_id, target_property_id):
-        """Handle sly deal action"""
-        card_to_play = next((c for c in player.hand if c.id == card_id), None)
-        if not card_to_play:
-            return
-        
-        stolen_property = None
-        property_color = None
-        target_player = None
-        for p in game_state.players:
-            if p != player:  # Don't search in the current player's properties
-                for color, properties in p.properties.items():
-                    for prop in properties:
-                        if prop.id == target_property_id:
-                            stolen_property = prop
-                            property_color = color
-                            target_player = p
-                            break
-                    if stolen_property:
-                        break
-                if stolen_property:
-                    break
-
-        if stolen_property and target_player:
-            target_player.properties[property_color].remove(stolen_property)
-            if not target_player.properties[property_color]:
-                del target_player.properties[property_color]
-            if property_color not in player.properties:
-                player.properties[property_color] = []
-            player.properties[property_color].append(stolen_property)
-            player.hand.remove(card_to_play)
-            game_state.discard_pile.append(card_to_play)
-            # Send notification about the sly deal
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_property_stolen',
-                    'player_id': str(player.id),
-                    'target_id': str(target_player.id),
-                    'player_name': player.name,
-                    'target_name': target_player.name,
-                    'property': stolen_property.to_dict()
-                }
-            )
-
-    def assist_rent_payment(self, game_state, player_id, recipient_id, card):
-        # Get the paying player and receiving player
-        paying_player = next(p for p in game_state.players if str(p.id) == player_id)
-        receiving_player = next(p for p in game_state.players if str(p.id) == recipient_id)
-        selected_cards = card.get('selected_cards', [])
-        
-        # Keep track of transferred cards with full info
-        transferred_cards = []
-        
-        # Find and transfer each selected card
-        for card_id in selected_cards:
-            # First try to find in bank
-            card_found = None
-            for bank_card in paying_player.bank[:]:  # Create a copy to safely modify during iteration
-                if bank_card.id == card_id:
-                    card_found = bank_card
-                    paying_player.bank.remove(card_found)
-                    receiving_player.bank.append(card_found)
-                    transferred_cards.append(card_found.to_dict())  # Add full card info
-                    break
-            
-            # If not in bank, search in properties
-            if not card_found:
-                # Create a list to store colors that need to be removed after iteration
-                colors_to_remove = []
-                
-                # Make a copy of the properties dictionary keys to safely iterate
-                for color in list(paying_player.properties.keys()):
-                    props = paying_player.properties[color]
-                    for prop in props[:]:  # Create a copy to safely modify during iteration
-                        if prop.id == card_id:
-                            card_found = prop
-                            paying_player.properties[color].remove(card_found)
-                            
-                            # Check if it's a house or hotel
-                            if card_found.name.lower() == 'house':
-                                for card in paying_player.properties[card_found.current_color]:
-                                    if card.name.lower() == 'hotel':
-                                        paying_player.properties[card_found.current_color].remove(card)
-                                        paying_player.bank.append(card)
-                                        break
-                                receiving_player.bank.append(card_found)
-                                transferred_cards.append(card_found.to_dict())  # Add full card info
-                            elif card_found.name.lower() == 'hotel':
-                                receiving_player.bank.append(card_found)
-                                transferred_cards.append(card_found.to_dict())  # Add full card info
-                            else:
-                                # Regular property card
-                                if card_found.current_color not in receiving_player.properties:
-                                    receiving_player.properties[card_found.current_color] = []
-                                
-                                # Get all cards of this color
-                                color_cards = paying_player.properties[card_found.current_color]
-                                
-                                # Define set requirements
-                                set_requirements = {
-                                    'brown': 2, 'mint': 2, 'blue': 2,
-                                    'light blue': 3, 'pink': 3, 'orange': 3, 
-                                    'red': 3, 'yellow': 3, 'green': 3,
-                                    'black': 4
-                                }
-                                
-                                # Get required cards for this color
-                                required_cards = set_requirements.get(card_found.current_color, 0)
-                                
-                                # Separate cards by type
-                                property_cards = [card for card in color_cards if card.card_type.lower() == 'property']
-                                house_cards = [card for card in color_cards if card.card_type.lower() == 'action' and card.name.lower() == 'house']
-                                hotel_cards = [card for card in color_cards if card.card_type.lower() == 'action' and card.name.lower() == 'hotel']
-                                
-                                if len(property_cards) + 1 == 2 * required_cards:
-                                    if len(house_cards) > 1:
-                                        paying_player.properties[card_found.current_color].remove(house_cards[0])
-                                        paying_player.bank.append(house_cards[0])
-                                    if len(hotel_cards) > 1:
-                                        paying_player.properties[card_found.current_color].remove(hotel_cards[0])
-                                        paying_player.bank.append(hotel_cards[0])
-                                elif len(property_cards) + 1 == required_cards:
-                                    if house_cards:
-                                        paying_player.properties[card_found.current_color].remove(house_cards[0])
-                                        paying_player.bank.append(house_cards[0])
-                                    if hotel_cards:
-                                        paying_player.properties[card_found.current_color].remove(hotel_cards[0])
-                                        paying_player.bank.append(hotel_cards[0])
-                                
-                                receiving_player.properties[card_found.current_color].append(card_found)
-                                transferred_cards.append(card_found.to_dict())  # Add full card info
-                            
-                            # Mark this color for removal if it's empty
-                            if not paying_player.properties[color]:
-                                colors_to_remove.append(color)
-                            break
-                    if card_found:
-                        break
-                
-                # Remove empty color sets after iteration is complete
-                for color in colors_to_remove:
-                    if color in paying_player.properties and not paying_player.properties[color]:
-                        del paying_player.properties[color]
-        
-        return transferred_cards  # Return the list of transferred cards with full info
+    async def broadcast_events(self, events, types=None):
+        """
+        Forward game_core events to the group; an event of type X is delivered by broadcast_X below.
+        """
+        for event in events:
+            if types is None or event['type'] in types:
+                await self.group_send(self.game_group_name, {**event, 'type': 'broadcast_' + event['type']})
     
+    async def offer_just_say_no(self, data, move=None):
+        """
+        Only the server sees every hand, so it decides whether the target of a steal or of the payment
+        asked for by a rent_request holds a Just Say No. If so, the target is given the choice (see
+        play_just_say_no_choice) instead of the action going ahead, and their id is returned; else None.
+        """
+        game_state = self.game_state
+        pending = game_state.pending_action
+        if data.get('action') == 'rent_request':
+            if not pending or pending.kind != PendingAction.PAYMENT or pending.blocked:
+                return None
+            target = game_state.get_player(pending.target_id)
+            opponent_id = pending.initiator_id
+            against_card = pending.card.to_dict()
+        else:
+            move = move or self.build_move(data, self.player_id)
+            target = self.steal_target(game_state, move)
+            opponent_id = move.player_id if move else None
+            against_card = data.get('card')
+        just_say_no_card = next((card for card in target.hand if card.name == "Just Say No"), None) if target else None
+        if not just_say_no_card:
+            return None
+        await self.play_just_say_no_choice({
+            'action': 'just_say_no_choice',
+            'playerId': target.id,
+            'opponentId': opponent_id,
+            'card': just_say_no_card.to_dict(),
+            'againstCard': against_card,
+            'data': data,
+        })
+        return target.id
+
     async def play_just_say_no_choice(self, data):
         player_id = data.get('playerId')
         opponent_id = data.get('opponentId')
@@ -793,22 +537,12 @@ class GameConsumer(AsyncWebsocketConsumer):
         action = data.get('action')
         against_card = data.get('againstCard') or None
         against_rent_card = data.get('againstRentCard') or None
-        original_action_data = json.loads(data.get('data'))
-        game_state = GameConsumer.game_instances[self.room_id]
-        if against_card['name'].lower() != 'it\'s your birthday' and against_card['name'].lower() != 'rent' and against_card['name'].lower() != 'double the rent' and against_card['name'].lower() != 'multicolor rent' and against_card['name'].lower() != 'debt collector':
+        original_action_data = original_action(data)
+        if against_card['name'].lower() not in PAYMENT_CARD_NAMES:
             # Display original action played notification
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_card_played',
-                    'player_id': original_action_data['player'],
-                    'action': original_action_data['action'],
-                    'action_type': 'to_bank' if original_action_data['action'] == 'to_bank' else 'to_properties' if original_action_data['action'] == 'to_properties' else 'action',
-                    'card': original_action_data['card']
-                }
-            )
+            await self.broadcast_card_played_notification(opponent_id, original_action_data['action'], original_action_data['card'])
         # Let everyone know player is making a choice to use just say no or not
-        await self.channel_layer.group_send(
+        await self.group_send(
             self.game_group_name,
             {
                 'type': 'broadcast_just_say_no_choice',
@@ -820,6 +554,13 @@ class GameConsumer(AsyncWebsocketConsumer):
                 'data': original_action_data
             }
         )
+        if self.is_bot(player_id):
+            # A bot answers on the spot instead of through the Just Say No modal
+            await self.pause_for_bot()
+            await self.play_just_say_no_response({
+                **data,
+                'playJustSayNo': await self.bot_wants_just_say_no(player_id, original_action_data),
+            })
         
     async def play_just_say_no_response(self, data):
         play_just_say_no = data.get('playJustSayNo')
@@ -829,256 +570,370 @@ class GameConsumer(AsyncWebsocketConsumer):
         action = data.get('action')
         against_card = data.get('againstCard')
         against_rent_card = data.get('againstRentCard') or None
-        original_action_data = json.loads(data.get('data'))
-        game_state = GameConsumer.game_instances[self.room_id]
+        original_action_data = original_action(data)
+        game_state = self.game_state
+        pending = game_state.pending_action
+        # Who played the blocked card: a payment's initiator (whose turn may have ended with it), else whose turn it is
+        initiator_id = pending.initiator_id if pending else game_state.current_player.id
+        response_event = {
+            'type': 'broadcast_just_say_no_response',
+            'playJustSayNo': play_just_say_no,
+            'playerId': player_id,
+            'opponentId': opponent_id,
+            'card': card,
+            'againstCard': against_card,
+            'againstRentCard': against_rent_card,
+            'data': original_action_data
+        }
         if not play_just_say_no:
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_just_say_no_response',
-                    'playJustSayNo': play_just_say_no,
-                    'playerId': player_id,
-                    'opponentId': opponent_id,
-                    'card': card,
-                    'againstCard': against_card,
-                    'againstRentCard': against_rent_card,
-                    'data': original_action_data
-                }
-            )
+            await self.group_send(self.game_group_name, response_event)
             # Proceed as usual
             if original_action_data['action'] == 'rent_request':
-                await self.channel_layer.group_send(
-                    self.game_group_name,
-                    {
-                        'type': 'broadcast_rent_request',
-                        'amount': game_state.rent_amount,
-                        'rent_type': game_state.rent_type,
-                        'recipient_id': game_state.rent_recipient_id,
-                        'target_player_id': str(game_state.player_ids_to_pay[0]),
-                        'total_players': game_state.total_paying_players,
-                        'num_players_owing': game_state.num_players_owing
-                    }
-                )
+                if game_state.pending_action:
+                    await self.group_send(self.game_group_name, game_state.payment_request('broadcast_rent_request'))
+                    await self.play_bot_payment()
             else:
-                await self.handle_action_with_notification(original_action_data, original_action_data['action'], original_action_data['card'], original_action_data['player'])
-                self.manage_turns(game_state)
+                await self.handle_action_with_notification(original_action_data, initiator_id)
             await self.send_game_state()
         else:
-            player_obj = next(p for p in game_state.players if p.id == player_id)
-            opponent_obj = next(p for p in game_state.players if p.id == opponent_id)
-            if against_card['name'].lower() != 'it\'s your birthday' and against_card['name'].lower() != 'rent' and against_card['name'].lower() != 'double the rent' and against_card['name'].lower() != 'multicolor rent' and against_card['name'].lower() != 'debt collector':
-                against_card_obj = next(c for c in opponent_obj.hand if c.id == against_card['id'])
-                opponent_obj.hand.remove(against_card_obj)
-            if against_rent_card:
-                against_rent_card_obj = next(c for c in opponent_obj.hand if c.id == against_rent_card['id'])
-                opponent_obj.hand.remove(against_rent_card_obj)
-            card_obj = next(c for c in player_obj.hand if c.id == card['id'])
-            player_obj.hand.remove(card_obj)
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_card_played',
-                    'player_id': player_id,
-                    'action': action,
-                    'action_type': 'to_bank' if action == 'to_bank' else 'to_properties' if action == 'to_properties' else 'action',
-                    'card': card
-                }
-            )
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_just_say_no_response',
-                    'playJustSayNo': play_just_say_no,
-                    'playerId': player_id,
-                    'opponentId': opponent_id,
-                    'card': card,
-                    'againstCard': against_card,
-                    'againstRentCard': against_rent_card,
-                    'data': original_action_data
-                }
-            )
-            
-            game_state.discard_pile.append(card_obj)
-            # recipient_id = original_action_data.get('player')
-            if not (against_card['name'].lower() != 'it\'s your birthday' and against_card['name'].lower() != 'rent' and against_card['name'].lower() != 'double the rent' and against_card['name'].lower() != 'multicolor rent' and against_card['name'].lower() != 'debt collector'):
-                game_state.player_ids_to_pay.pop(0)
-                game_state.num_players_owing -= 1
-                if game_state.num_players_owing > 0:
-                    await self.channel_layer.group_send(
-                        self.game_group_name,
-                        {
-                            'type': 'broadcast_rent_pre_request',
-                            'amount': game_state.rent_amount,
-                            # 'recipient_id': recipient_id,
-                            'recipient_id': game_state.rent_recipient_id,
-                            'target_player_id': str(game_state.player_ids_to_pay[0]),
-                            'total_players': game_state.total_paying_players,
-                            'num_players_owing': game_state.num_players_owing,
-                            'card': against_card
-                        }
-                    )
-                else:
-                    game_state.player_ids_to_pay = []
-                    game_state.num_players_owing = 0
-                    game_state.rent_amount = 0
-                    game_state.total_paying_players = 0
-            else:
-                self.manage_turns(game_state)
-            if against_rent_card:
-                self.manage_turns(game_state)  # The additional turn is handled here
+            # The blocked card and the Just Say No go in together; roll both back if either is rejected
+            snapshot = game_state.snapshot()
+            if against_card['name'].lower() not in PAYMENT_CARD_NAMES:
+                # The blocked action card is still played (and uses up an action)
+                result = game_state.apply_move(self.build_move(original_action_data, initiator_id))
+                if not result:
+                    logger.warning(f"Room {self.room_id}: rejected {original_action_data['action']} from {initiator_id}: {result.error}")
+                    return
+            result = game_state.apply_move(moves.JustSayNo(player_id, card['id']))
+            if not result:
+                logger.warning(f"Room {self.room_id}: rejected Just Say No from {player_id}: {result.error}")
+                game_state.restore(snapshot)
+                return
+            # The web client offers no counter Just Say No, so the initiator accepts the block
+            result = game_state.apply_move(moves.AcceptAction(initiator_id))
+            await self.broadcast_card_played_notification(player_id, action, card)
+            await self.group_send(self.game_group_name, response_event)
+            # Ask the next player owing, if any
+            await self.broadcast_events(result.events)
             await self.send_game_state()
 
     async def play_rent_request(self, data):
-        card = data.get('card')
-        player_id = data.get('player')
-        action = data.get('action')
-        game_state = GameConsumer.game_instances[self.room_id]
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_request',
-                'amount': game_state.rent_amount,
-                'rent_type': game_state.rent_type,
-                'recipient_id': game_state.rent_recipient_id,
-                'target_player_id': str(game_state.player_ids_to_pay[0]),
-                'total_players': game_state.total_paying_players,
-                'num_players_owing': game_state.num_players_owing
-            }
-        )
+        game_state = self.game_state
+        if await self.offer_just_say_no(data):
+            return
+        if game_state.pending_action:
+            await self.group_send(self.game_group_name, game_state.payment_request('broadcast_rent_request'))
+            await self.play_bot_payment()
 
-    async def play_rent_payment(self, data):
+    async def play_rent_payment(self, data, player_id):
         card = data.get('card')
-        player_id = data.get('player')
-        action = data.get('action')
-        game_state = GameConsumer.game_instances[self.room_id]
-        transferred_cards = self.assist_rent_payment(game_state, player_id, game_state.rent_recipient_id, card)
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {
-                'type': 'broadcast_rent_paid',
-                'recipient_id': game_state.rent_recipient_id,
-                'player_id': player_id,
-                'selected_cards': transferred_cards,  
-            }
-        )
+        game_state = self.game_state
+        result = game_state.apply_move(moves.PayRent(player_id, card.get('selected_cards', [])))
+        if not result:
+            logger.warning(f"Room {self.room_id}: rejected payment from {player_id}: {result.error}")
+            return
+        # The next player owing is asked once the client reports the payment animation done (rent_paid)
+        await self.broadcast_events(result.events, types={'rent_paid'})
         await self.send_game_state()
 
     async def play_rent_paid(self, data):
-        card = data.get('card')
-        player_id = data.get('player')
-        action = data.get('action')
-        game_state = GameConsumer.game_instances[self.room_id]
-        game_state.player_ids_to_pay.pop(0)
-        game_state.num_players_owing -= 1
-        if game_state.num_players_owing > 0:
-            await self.channel_layer.group_send(
-                self.game_group_name,
-                {
-                    'type': 'broadcast_rent_pre_request',
-                    'amount': game_state.rent_amount,
-                    'recipient_id': game_state.rent_recipient_id,
-                    'target_player_id': str(game_state.player_ids_to_pay[0]),
-                    'total_players': game_state.total_paying_players,
-                    'num_players_owing': game_state.num_players_owing,
-                    'card': game_state.rent_card.to_dict()
-                }
-            )
-        else:
-            game_state.player_ids_to_pay = []
-            game_state.num_players_owing = 0
-            game_state.rent_amount = 0
-            game_state.total_paying_players = 0
-            game_state.rent_type = None
-            game_state.rent_card = None
-
-    def manage_turns(self, game_state):
-        # Check if current player has won
-        current_player = game_state.players[game_state.turn_index]
-        if current_player.has_won():
-            print(f"{current_player.name} WON!")
-            game_state.winner = current_player
-
-        if game_state.actions_remaining == 1:
-            # Switch to next player's turn
-            game_state.turn_index = (game_state.turn_index + 1) % len(game_state.players)
-            game_state.actions_remaining = 3
-            next_player = game_state.players[game_state.turn_index]
-            if len(next_player.hand) == 0:
-                next_player.draw_cards(game_state.deck, 5)
-            else:
-                next_player.draw_cards(game_state.deck, 2)
-        else:
-            game_state.actions_remaining -= 1
+        game_state = self.game_state
+        pending = game_state.pending_action
+        if pending and pending.kind == PendingAction.PAYMENT:
+            await self.group_send(self.game_group_name, game_state.payment_request('broadcast_rent_pre_request'))
+
+
+    ########## ROOM WORKERS ##########
+
+    def enqueue_message(self, data):
+        queue = GameConsumer.room_queues.get(self.room_id)
+        if queue is None:
+            queue = GameConsumer.room_queues[self.room_id] = asyncio.Queue()
+            GameConsumer.room_workers[self.room_id] = asyncio.create_task(GameConsumer.run_room_worker(self.room_id, queue))
+        queue.put_nowait((self, data))
+
+    @classmethod
+    def handle_forwarded_message(cls, message):
+        """Queue a message another worker forwarded for a room owned here, as if its socket were local."""
+        consumer = cls()
+        consumer.room_id = message['room_id']
+        consumer.game_group_name = f'game_{consumer.room_id}'
+        consumer.player_id = message['player_id']
+        consumer.channel_name = message.get('channel_name')  # The socket's, on the worker holding it
+        consumer.channel_layer = get_channel_layer()
+        consumer.enqueue_message(message['data'])
+
+    @staticmethod
+    async def run_room_worker(room_id, queue):
+        """
+        The only writer of a room's game: handles queued messages in order, each with the consumer that
+        received it. Shuts down after ROOM_WORKER_IDLE_TIMEOUT seconds without messages.
+        """
+        while True:
+            try:
+                consumer, data = await asyncio.wait_for(queue.get(), ROOM_WORKER_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # No await between this check and the removal, so no message can slip in unhandled
+                    del GameConsumer.room_queues[room_id]
+                    del GameConsumer.room_workers[room_id]
+                    GameConsumer.room_games.pop(room_id, None)  # Saved after the last message
+                    return
+                continue
+            try:
+                await consumer.handle_room_message(data)
+            except Exception:
+                # One bad message must not stop the room
+                logger.error(f"Room {room_id}: error handling {data.get('action')}", exc_info=True)
+                if queue.empty() and room_id in GameConsumer.room_games:
+                    # The messages handled before it may be waiting for this drain's save
+                    consumer.game_state, consumer.game_version = GameConsumer.room_games[room_id]
+                    try:
+                        await consumer.save_game(data.get('action'))
+                    except Exception:
+                        logger.error(f"Room {room_id}: error saving the game", exc_info=True)
+
+    ########## BOTS ##########
+
+    def is_bot(self, player_id):
+        return str(player_id).startswith(BOT_ID_PREFIX)
+
+    async def pause_for_bot(self):
+        """Send what is queued so far and wait BOT_MOVE_DELAY, so the table can follow each bot move."""
+        await self.flush_outbox()
+        await asyncio.sleep(BOT_MOVE_DELAY)
+
+    def choose_bot_move(self, player_id, game_state=None):
+        """
+        Start a bot's search for its move and return the future of the move, so the caller can wait out
+        BOT_MOVE_DELAY meanwhile. The search runs in another process on a copy of the game: the room's game
+        is never read while it changes, and a second of search never competes with the event loop for the GIL.
+        """
+        if GameConsumer.bot_executor is None:
+            GameConsumer.bot_executor = ProcessPoolExecutor(BOT_SEARCH_PROCESSES, mp_context=multiprocessing.get_context('spawn'))
+        game = (game_state or self.game_state).clone()
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(GameConsumer.bot_executor, self.bot.choose_move, game, game.get_player(player_id), random.Random())
+
+    async def play_bot_turns(self):
+        """
+        Play the current turn while it belongs to a bot, one move at a time, through the same handlers as a
+        client's messages. Stops when a human has to answer (a payment or a Just Say No choice).
+        """
+        game_state = self.game_state
+        if not game_state:
+            return
+        while not game_state.winner and not game_state.pending_action and self.is_bot(game_state.current_player.id):
+            player_id = game_state.current_player.id
+            search = self.choose_bot_move(player_id)
+            await self.pause_for_bot()
+            move = await search
+            if not isinstance(move, moves.EndTurn):
+                data = self.bot_action_data(game_state, move)
+                target_id = await self.offer_just_say_no(data, move)
+                if target_id:
+                    if not self.is_bot(target_id):
+                        return  # Carried on once the client's just_say_no_response arrives
+                    continue
+                if await self.handle_action_with_notification(data, player_id):
+                    await self.send_game_state()
+                    continue
+            # Ending the turn is also the way out if the engine turned the move down
+            game_state.apply_move(moves.EndTurn(player_id))
+            await self.send_game_state()
+
+    async def play_bot_payment(self):
+        """Pay the pending payment if a bot owes it; clients pay through their rent modal instead."""
+        game_state = self.game_state
+        pending = game_state.pending_action
+        if not pending or not self.is_bot(pending.responder_id) or pending.kind != PendingAction.PAYMENT or pending.blocked:
+            return
+        search = self.choose_bot_move(pending.responder_id)
+        await self.pause_for_bot()
+        move = await search
+        if not isinstance(move, moves.PayRent):
+            # Just Say No was already offered through the choice flow, so only the payment is left
+            move = next(move for move in game_state.legal_moves(game_state.get_player(pending.responder_id)) if isinstance(move, moves.PayRent))
+        await self.play_rent_payment({'card': {'selected_cards': move.card_ids}}, move.player_id)
+        # A client reports the end of its payment animation before the next player is asked; do it for the bot
+        await self.pause_for_bot()
+        await self.play_rent_paid({})
+
+    async def bot_wants_just_say_no(self, player_id, original_action_data):
+        """Whether a bot plays Just Say No against the action described by a client message."""
+        game = self.game_state.clone()
+        pending = game.pending_action
+        if not pending or str(pending.responder_id) != str(player_id):
+            # Steals are only applied once the Just Say No choice is made; look at the position after it
+            move = self.build_move(original_action_data, game.current_player.id)
+            if not move or not game.apply_move(move) or not game.pending_action:
+                return False
+        move = await self.choose_bot_move(player_id, game)
+        return isinstance(move, moves.JustSayNo)
 
+    def steal_target(self, game_state, move):
+        """The player a steal move takes from (None for other moves)."""
+        if isinstance(move, (moves.PlaySlyDeal, moves.PlayForcedDeal)):
+            zone = game_state.find_card(move.target_card_id)[1]
+            return game_state.get_player(zone.owner_id) if zone else None
+        elif isinstance(move, moves.PlayDealBreaker):
+            return game_state.get_player(move.target_id)
+        return None
+
+    def bot_action_data(self, game_state, move):
+        """Describe a bot's turn move as the message a client would send for it (the inverse of build_move)."""
+        player = game_state.get_player(move.player_id)
+        card = game_state.find_card(move.card_id)[0].to_dict()
+        data = {'player': move.player_id, 'card': card}
+        if isinstance(move, moves.BankCard):
+            data['action'] = 'to_bank'
+        elif isinstance(move, (moves.PlayProperty, moves.PlaceBuilding)):
+            data['action'] = 'to_properties'
+            card['currentColor'] = move.color
+        elif isinstance(move, moves.PlayPassGo):
+            data['action'] = 'pass_go'
+        elif isinstance(move, moves.PlayBirthday):
+            data['action'] = "it's_your_birthday"
+        elif isinstance(move, moves.PlayDebtCollector):
+            data.update(action='debt_collector', targetPlayer=move.target_id)
+        elif isinstance(move, moves.PlayRent):
+            amount = common_functions.calculate_rent(player, move.color)
+            if move.double_the_rent_id is not None:
+                data.update(action='double_the_rent', targetPlayer=move.target_id, rentColor=move.color, rentAmount=amount * 2,
+                            double_the_rent_card=game_state.find_card(move.double_the_rent_id)[0].to_dict())
+            else:
+                data.update(action='multicolor rent' if move.target_id else 'rent', targetPlayer=move.target_id,
+                            rentColor=move.color, rentAmount=amount)
+        elif isinstance(move, moves.PlaySlyDeal):
+            data.update(action='sly_deal', target_property=game_state.find_card(move.target_card_id)[0].to_dict())
+        elif isinstance(move, moves.PlayForcedDeal):
+            data.update(action='forced_deal', target_property=game_state.find_card(move.target_card_id)[0].to_dict(),
+                        user_property=game_state.find_card(move.offered_card_id)[0].to_dict())
+        elif isinstance(move, moves.PlayDealBreaker):
+            target_set = game_state.get_player(move.target_id).properties[move.color]
+            data.update(action='deal_breaker', target_color=move.color, target_set=[c.to_dict() for c in target_set])
+        return data
 
     ########## SENDS - CALLING BROADCASTS ##########
 
-    # Track previous game state to compute diffs
-    previous_game_states = {}
-    
+    async def group_send(self, group, event):
+        """
+        Send `event` to every socket in `group`. The message is built by the broadcast_X method named by the
+        event type and encoded once here, so each socket forwards the same text (see send_frame) instead of
+        encoding its own copy.
+        While a room message is handled the message waits in the outbox, to go out with the rest of the action.
+        """
+        text = codec.dumps(getattr(self, event['type'])(event))
+        if self.outbox is not None:
+            self.outbox.append((group, text))
+        else:
+            await self.channel_layer.group_send(group, {'type': 'send_frame', 'text': text})
+
+    async def flush_outbox(self):
+        """
+        Send the messages in the outbox as one frame per socket. Once the game has started and some messages
+        are for single players, each player's group gets the room-wide messages and their own, in the order
+        they were sent, and nothing goes to the game group: every socket in it has a seat, as no socket joins
+        a started game without one (see add_player_to_room). Otherwise every group gets its own messages.
+        Several messages travel as {"type": "batch", "messages": [...]}, joined from their encoded text.
+        """
+        if not self.outbox:
+            return
+        outbox, self.outbox = self.outbox, []
+        frames = {}  # group -> encoded messages
+        if self.game_state and any(group != self.game_group_name for group, _ in outbox):
+            for player in self.game_state.players:
+                if not self.is_bot(player.id):
+                    player_group = self.player_group_name(player.id)
+                    frames[player_group] = [text for group, text in outbox if group in (self.game_group_name, player_group)]
+            seated_groups = set(frames) | {self.game_group_name}
+        else:
+            seated_groups = set()
+        # Any other group (e.g. a player no longer seated) still gets its own messages
+        for group, text in outbox:
+            if group not in seated_groups:
+                frames.setdefault(group, []).append(text)
+        for group, texts in frames.items():
+            if texts:
+                text = texts[0] if len(texts) == 1 else '{"type": "batch", "messages": [' + ', '.join(texts) + ']}'
+                await self.channel_layer.group_send(group, {'type': 'send_frame', 'text': text})
+
     async def send_game_state(self, full_state=False):
         """
-        Broadcast the current game state to all clients in the group.
-        If full_state is True, send the entire state, otherwise send only the changes.
+        Send each player in the game their own view of the current state (their hand in full, the other
+        hands as card counts) through their player group.
+        If full_state is True, send the entire state, otherwise send only the changes: card moves as ops
+        (see Game.changes) under a state version one above the last, so clients can spot a missed update.
         """
-        game_state = self.game_instances.get(self.room_id)
+        game_state = self.game_state
         if game_state:
-            current_state = game_state.to_dict()
+            # Serialized once with every hand, then projected per player. Changes come from the game's
+            # journal of what the handled message touched.
+            changes = None if full_state else game_state.changes()
+            # If this is the first update or full_state is requested, send the entire state
+            is_full_state = changes is None
+            current_state = game_state.to_dict() if is_full_state else changes
             if hasattr(game_state, 'last_action'):
                 current_state['last_action'] = game_state.last_action
                 # Clear the last action after broadcasting
                 game_state.last_action = None
-            
-            # If this is the first update or full_state is requested, send the entire state
-            if full_state or self.room_id not in self.previous_game_states:
-                await self.channel_layer.group_send(
-                    self.game_group_name,
-                    {
-                        'type': 'broadcast_game_update',
-                        'state': current_state,
-                        'is_full_state': True
-                    }
-                )
-                # Store the current state for future diffs
-                self.previous_game_states[self.room_id] = current_state
+            # Later changes are relative to what is being sent now
+            game_state.track_changes()
+            if not current_state:
                 return
-            
-            # Calculate the diff between previous and current state
-            previous_state = self.previous_game_states[self.room_id]
-            state_diff = self.calculate_state_diff(previous_state, current_state)
-            
-            # Send only the diff if it's not empty
-            if state_diff:
-                await self.channel_layer.group_send(
-                    self.game_group_name,
-                    {
-                        'type': 'broadcast_game_update',
-                        'state': state_diff,
-                        'is_full_state': False
-                    }
-                )
-            
-            # Update the previous state
-            self.previous_game_states[self.room_id] = current_state
+            if not is_full_state:
+                game_state.state_version += 1
+
+            for player in game_state.players:
+                if self.is_bot(player.id):
+                    continue
+                await self.send_player_state(player.id, view_for(current_state, player.id), is_full_state)
+
+    async def send_player_state(self, player_id, state, is_full_state=True):
+        """Send one player a state update (their full view unless is_full_state is False)."""
+        await self.group_send(
+            self.player_group_name(player_id),
+            {
+                'type': 'broadcast_game_update',
+                'state': state,
+                'is_full_state': is_full_state,
+                'version': self.game_state.state_version
+            }
+        )
+
+    def player_group_name(self, player_id):
+        """Group holding only `player_id`'s socket in this room, for messages meant for them alone."""
+        return f'player_{self.room_id}_{player_id}'
 
     async def send_room_update(self):
         """
         Broadcast the updated room state to all clients in the group.
         """
-        print(await self.db_get_room_data_by_id(self.room_id))
-        await self.channel_layer.group_send(
+        room_data = await self.db_get_room_data_by_id(self.room_id)
+        await self.group_send(
             self.game_group_name,
             {
                 'type': 'broadcast_room_update',
-                'data': await self.db_get_room_data_by_id(self.room_id)
+                'data': room_data
             }
         )
 
 
-    ########## BROADCASTS - FINAL MESSAGE SEND VIA SOCKET ##########
+    ########## BROADCASTS - MESSAGES SENT VIA SOCKET ##########
+    # broadcast_X builds the message sent to each socket for an event of type 'broadcast_X' (see group_send)
+
+    async def send_frame(self, event):
+        """
+        Channel layer handler: pass a message group_send already encoded straight to the socket, converted to
+        the binary protocol if the socket asked for it.
+        """
+        if self.binary:
+            await self.send(bytes_data=codec.binary_frame(event['text']))
+        else:
+            await self.send(text_data=event['text'])
     
-    async def broadcast_just_say_no_response(self, event):
-        await self.send(text_data=json.dumps({
+    def broadcast_just_say_no_response(self, event):
+        return {
             'type': 'just_say_no_response',
             'playJustSayNo': event['playJustSayNo'],
             'playerId': event['playerId'],
@@ -1087,10 +942,10 @@ class GameConsumer(AsyncWebsocketConsumer):
             'againstCard': event['againstCard'],
             'againstRentCard': event['againstRentCard'],
             'data': event['data']
-        }))
+        }
     
-    async def broadcast_just_say_no_choice(self, event):
-        await self.send(text_data=json.dumps({
+    def broadcast_just_say_no_choice(self, event):
+        return {
             'type': 'just_say_no_choice',
             'opponentId': event['opponentId'],
             'playerId': event['playerId'],
@@ -1098,94 +953,89 @@ class GameConsumer(AsyncWebsocketConsumer):
             'againstCard': event['againstCard'],
             'againstRentCard': event['againstRentCard'],
             'data': event['data']
-        }))
+        }
 
-    async def broadcast_game_started(self, event):
+    def broadcast_game_started(self, event):
         # This method will be called when a game has started
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'broadcast_game_started',
             'message': event.get('message', 'The game has started!'),
-        }))
+        }
 
-    async def broadcast_game_update(self, event):
+    def broadcast_game_update(self, event):
         """
-        Send game state update to WebSocket.
+        Game state update for one player (see send_player_state).
         """
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'game_update',
             'state': event['state'],
-            'is_full_state': event.get('is_full_state', True)
-        }))
+            'is_full_state': event.get('is_full_state', True),
+            'version': event.get('version')
+        }
 
-    async def broadcast_card_played(self, event):
+    def broadcast_card_played(self, event):
         """
-        Broadcast a card played event to all clients in the group.
+        A card played event for all clients in the group.
         """
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'card_played',
             'player_id': event['player_id'],
             'action': event['action'],
             'action_type': event['action_type'],
             'card': event['card']
-        }))
+        }
         
-    async def broadcast_rent_pre_request(self, event):
-        try:
-            await self.send(text_data=json.dumps({
-                'type': 'rent_pre_request',
-                'amount': event['amount'],
-                'recipient_id': event['recipient_id'],
-                'target_player_id': event.get('target_player_id', None),
-                'total_players': event.get('total_players', None),
-                'num_players_owing': event.get('num_players_owing', None),
-                'card': event['card']
-            }))
-        except Exception as e:
-            print(f"Error in broadcast_rent_pre_request: {e}")
-
-    async def broadcast_rent_request(self, event):
-        try:
-            await self.send(text_data=json.dumps({
-                'type': 'rent_request',
-                'amount': event['amount'],
-                'rent_type': event['rent_type'],
-                'recipient_id': event['recipient_id'],
-                'target_player_id': event.get('target_player_id', None),
-                'total_players': event.get('total_players', None),
-                'num_players_owing': event.get('num_players_owing', None)
-            }))
-        except Exception as e:
-            print(f"Error in broadcast_rent_request: {e}")
-
-    async def broadcast_rent_paid(self, event):
+    def broadcast_rent_pre_request(self, event):
+        return {
+            'type': 'rent_pre_request',
+            'amount': event['amount'],
+            'recipient_id': event['recipient_id'],
+            'target_player_id': event.get('target_player_id', None),
+            'total_players': event.get('total_players', None),
+            'num_players_owing': event.get('num_players_owing', None),
+            'card': event['card']
+        }
+
+    def broadcast_rent_request(self, event):
+        return {
+            'type': 'rent_request',
+            'amount': event['amount'],
+            'rent_type': event['rent_type'],
+            'recipient_id': event['recipient_id'],
+            'target_player_id': event.get('target_player_id', None),
+            'total_players': event.get('total_players', None),
+            'num_players_owing': event.get('num_players_owing', None)
+        }
+
+    def broadcast_rent_paid(self, event):
         """Notify players that rent has been paid"""
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'rent_paid',
             'recipient_id': event['recipient_id'],
             'player_id': event['player_id'],
             'selected_cards': event['selected_cards'],
-        }))
+        }
 
-    async def broadcast_room_update(self, event):
+    def broadcast_room_update(self, event):
         """
-        Send room state update to WebSocket.
+        Room state update.
         """
-        await self.send(text_data=json.dumps(event['data']))
+        return event['data']
 
-    async def broadcast_property_stolen(self, event):
+    def broadcast_property_stolen(self, event):
         """Notify players that a property has been stolen"""
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'property_stolen',
             'player_id': event['player_id'],
             'target_id': event['target_id'],
             'player_name': event['player_name'],
             'target_name': event['target_name'],
             'property': event['property']
-        }))
+        }
 
-    async def broadcast_property_swap(self, event):
-        """Send property swap animation data to the client"""
-        await self.send(text_data=json.dumps({
+    def broadcast_property_swap(self, event):
+        """Property swap animation data for the client"""
+        return {
             'type': 'property_swap',
             'property1': event['property1'],
             'property2': event['property2'],
@@ -1193,72 +1043,82 @@ class GameConsumer(AsyncWebsocketConsumer):
             'player2_id': event['player2_id'],
             'player1_name': event['player1_name'],
             'player2_name': event['player2_name']
-        }))
+        }
 
-    async def broadcast_deal_breaker_overlay(self, event):
-        """Send deal breaker overlay data to the client"""
-        await self.send(text_data=json.dumps({
+    def broadcast_deal_breaker_overlay(self, event):
+        """Deal breaker overlay data for the client"""
+        return {
             'type': 'deal_breaker_overlay',
             'stealerId': event['stealerId'],
             'targetId': event['targetId'],
             'color': event['color'],
             'property_set': event['property_set']
-        }))
+        }
 
-    async def broadcast_player_disconnected(self, event):
+    def broadcast_player_disconnected(self, event):
         """Notify players that another player has disconnected"""
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'player_disconnected',
             'player_id': event['player_id'],
             'username': event['username']
-        }))
+        }
 
 
     ########## DATABASE FETCHES AND UPDATES ##########
+    # Rooms and users are read through lookup_cache; every helper writing a room invalidates its cached copy
 
     @database_sync_to_async
     def db_mark_game_start(self, room):
         """
-        Mark the game as started and update the database.
+        Mark the game as started and update the database. Returns the players seated at that moment.
         """
+        from backend.game.models import GameRoom
+        with transaction.atomic():
+            locked = GameRoom.objects.select_for_update().get(pk=room.pk)
+            locked.has_started = True
+            locked.save(update_fields=['has_started'])
+            players = locked.players
         room.has_started = True
-        room.save()
+        lookup_cache.invalidate_room(room.room_id)
+        return players
 
-    @database_sync_to_async
-    def db_get_room_by_id(self, room_id):
+    async def db_get_room_by_id(self, room_id):
         """
-        Retrieve a game room by its ID.
+        Retrieve a game room by its ID (cached).
         """
+        return await lookup_cache.get_room(room_id, self.db_fetch_room_by_id)
+
+    @database_sync_to_async
+    def db_fetch_room_by_id(self, room_id):
         from backend.game.models import GameRoom
         try:
-            return GameRoom.objects.get(room_id=room_id)
+            return GameRoom.objects.with_players().get(room_id=room_id)
         except GameRoom.DoesNotExist:
             return None
 
-    @database_sync_to_async
-    def db_get_room_data_by_id(self, room_id):
+    async def db_get_room_data_by_id(self, room_id):
         """
         Retrieve the room data by its ID.
         """
-        from backend.game.models import GameRoom
-        try:
-            room = GameRoom.objects.get(room_id=room_id)
-            room_data = {
-                'id': room_id,
-                'player_count': room.player_count,
-                'max_players': room.max_players,
-                'has_started': room.has_started,
-                'players': room.players
-            }
-            return room_data
-        except GameRoom.DoesNotExist:
+        room = await self.db_get_room_by_id(room_id)
+        if room is None:
             return None
+        return {
+            'id': room_id,
+            'player_count': room.player_count,
+            'max_players': room.max_players,
+            'has_started': room.has_started,
+            'players': room.players
+        }
 
-    @database_sync_to_async
-    def db_get_user_by_unique_id(self, unique_id):
+    async def db_get_user_by_unique_id(self, unique_id):
         """
-        Querying the user by unique_id
+        Querying the user by unique_id (cached)
         """
+        return await lookup_cache.get_user(unique_id, self.db_fetch_user_by_unique_id)
+
+    @database_sync_to_async
+    def db_fetch_user_by_unique_id(self, unique_id):
         from django.contrib.auth import get_user_model
         User = get_user_model()
         try:
@@ -1270,37 +1130,72 @@ class GameConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def db_add_player_to_room(self, room, user):
         """
-        Add a player to the room and update the database.
+        Add a player to the room and update the database. The row stays locked from the checks to the write,
+        so simultaneous joins cannot overwrite each other or overfill the room.
+        Returns why the player cannot join, or None once they joined.
         """
-        room.players.append({'id': str(user.unique_id), 'name': user.username, 'isReady': False})
-        room.player_count += 1
-        room.save()
+        from backend.game.models import GameRoom
+        room_id, player_id = room.room_id, str(user.unique_id)
+        try:
+            with transaction.atomic():
+                room = GameRoom.objects.select_for_update().get(room_id=room_id)
+                if room.has_started:
+                    return "The game has already begun"
+                if room.members.filter(player_id=player_id).exists():
+                    return "You are already in this room! Player:" + user.username
+                if room.player_count >= room.max_players:
+                    return "Room is full."
+                self.db_seat_player(room, user=user, player_id=player_id, name=user.username)
+        except GameRoom.DoesNotExist:
+            return "Room does not exist"
+        finally:
+            # Also after a refusal: the cached room let the player get this far, so it is out of date
+            lookup_cache.invalidate_room(room_id)
+        return None
+
+    @database_sync_to_async
+    def db_add_bot_to_room(self):
+        """
+        Fill an empty seat with a bot (always ready) and update the database.
+        """
+        from backend.game.models import GameRoom
+        with transaction.atomic():
+            room = GameRoom.objects.select_for_update().filter(room_id=self.room_id).first()
+            if room is None or room.has_started or room.player_count >= room.max_players:
+                return
+            bot_number = room.members.filter(user=None).count() + 1
+            self.db_seat_player(room, player_id=f'{BOT_ID_PREFIX}{uuid.uuid4().hex[:8]}', name=f'Bot {bot_number}', is_ready=True)
+        lookup_cache.invalidate_room(self.room_id)
+
+    def db_seat_player(self, room, **fields):
+        """Give a player the seat after the last taken one in `room`, whose row the caller has locked."""
+        last_seat = room.members.aggregate(last=Max('seat'))['last']
+        room.members.create(seat=0 if last_seat is None else last_seat + 1, **fields)
+        room.player_count = F('player_count') + 1
+        room.save(update_fields=['player_count'])
 
     @database_sync_to_async
     def db_remove_player_from_room(self, player_id):
         """
-        Remove a player from the room and update the database.
+        Remove a player from the room and update the database. Returns whether the room was deleted.
         """
         from backend.game.models import GameRoom
-        try:
-            room = GameRoom.objects.get(room_id=self.room_id)
-            room.players = [player for player in room.players if player['id'] != player_id]
-            room.player_count -= 1
-            room.save()
-            """CHANGE IF YOU WANT TO REMOVE GAME ROOM FROM DATABASE IF NO PLAYERS IN"""
-            if room.player_count <= 0:
-                GameRoom.objects.filter(room_id=self.room_id).delete()
-        except GameRoom.DoesNotExist:
-            pass
+        deleted = False
+        with transaction.atomic():
+            room = GameRoom.objects.select_for_update().filter(room_id=self.room_id).first()
+            if room is not None and room.members.filter(player_id=player_id).delete()[0]:
+                """CHANGE IF YOU WANT TO REMOVE GAME ROOM FROM DATABASE IF NO PLAYERS IN"""
+                if not room.members.filter(user__isnull=False).exists():
+                    room.delete()  # No players left, or only bots
+                    deleted = True
+                else:
+                    room.player_count = F('player_count') - 1
+                    room.save(update_fields=['player_count'])
+        lookup_cache.invalidate_room(self.room_id)
+        return deleted
 
     @database_sync_to_async
     def db_set_player_ready(self, readiness):
-        from backend.game.models import GameRoom
-        try:
-            room = GameRoom.objects.get(room_id=self.room_id)
-            for player in room.players:
-                if player['id'] == self.player_id:
-                    player['isReady'] = readiness
-                    room.save()
-        except GameRoom.DoesNotExist:
-            pass
+        from backend.game.models import RoomPlayer
+        RoomPlayer.objects.filter(room__room_id=self.room_id, player_id=self.player_id).update(is_ready=readiness)
+        lookup_cache.invalidate_room(self.room_id)
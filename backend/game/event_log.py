@@ -0,0 +1,167 @@
+"""
+Append-only record of each room's game, from which it can be rebuilt (see game_core/replay.py).
+
+A room's log starts with the game's seating and deck seed, followed by one event per move applied, in
+order. The consumer appends the moves of each handled message in one batch once the game is saved, and
+replays the log when a room's game is missing from the game store (e.g. after a worker restart).
+
+Long games are checkpointed: the consumer saves a snapshot of the game (replay.snapshot_game) at the end of
+each turn and every SNAPSHOT_EVERY events, and recovery replays only the events logged after the latest one.
+
+LocalEventLog keeps the logs in this process; RedisEventLog keeps each in a Redis stream, so they outlive
+the workers; NullEventLog keeps nothing. Pick one with the GAME_EVENT_LOG setting ('local', 'redis' or
+'none'). A room's log is deleted once its game is over or the room is gone.
+"""
+from django.conf import settings
+
+from backend.game import codec
+
+GAME_EVENT_LOG_TTL = 7 * 24 * 60 * 60  # Seconds a room's log is kept after its last event
+
+class EventLog:
+    """
+    Interface: start(room_id, players, seed); append(room_id, events) -> number of events since the latest
+    snapshot; save_snapshot(room_id, snapshot), taken after everything appended so far;
+    load(room_id) -> (players, seed, events since the latest snapshot, snapshot or None) or None;
+    delete(room_id).
+    """
+
+    async def start(self, room_id, players, seed):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def append(self, room_id, events):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def save_snapshot(self, room_id, snapshot):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def load(self, room_id):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def delete(self, room_id):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+class NullEventLog(EventLog):
+    """Logs nothing, so no game can be recovered: for a single worker whose games die with it anyway."""
+
+    async def start(self, room_id, players, seed):
+        pass
+
+    async def append(self, room_id, events):
+        return 0
+
+    async def save_snapshot(self, room_id, snapshot):
+        pass
+
+    async def load(self, room_id):
+        return None
+
+    async def delete(self, room_id):
+        pass
+
+class LocalEventLog(EventLog):
+    """Logs live in this process (so they only outlast the games of a LocalGameStore, not the process)."""
+
+    def __init__(self):
+        self.logs = {}  # room id -> [players, seed, events, latest snapshot, number of events it covers]
+
+    async def start(self, room_id, players, seed):
+        self.logs[room_id] = [players, seed, [], None, 0]
+
+    async def append(self, room_id, events):
+        log = self.logs.get(room_id)
+        if log is None:
+            return 0
+        log[2].extend(events)
+        return len(log[2]) - log[4]
+
+    async def save_snapshot(self, room_id, snapshot):
+        log = self.logs.get(room_id)
+        if log is not None:
+            log[3], log[4] = snapshot, len(log[2])
+
+    async def load(self, room_id):
+        log = self.logs.get(room_id)
+        if log is None:
+            return None
+        players, seed, events, snapshot, covered = log
+        return players, seed, events[covered:], snapshot
+
+    async def delete(self, room_id):
+        self.logs.pop(room_id, None)
+
+class RedisEventLog(EventLog):
+    """
+    One Redis stream per room. The first entry holds the seating and seed; each later entry holds either the
+    events of one handled message as a JSON list, so a batch costs one XADD, or a snapshot. A small hash
+    beside it keeps the id of the latest snapshot entry and the number of events appended since, so loading
+    reads the stream from that snapshot on.
+    """
+
+    KEY = 'game_events:{}'
+    SNAPSHOT_KEY = 'game_snapshot:{}'
+
+    def __init__(self, url):
+        import redis.asyncio as redis  # Installed with channels_redis
+        self.redis = redis.from_url(url)
+
+    async def start(self, room_id, players, seed):
+        key, snapshot_key = self.KEY.format(room_id), self.SNAPSHOT_KEY.format(room_id)
+        # A room code can be reused: a new game replaces the room's old log
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key, snapshot_key)
+            pipe.xadd(key, {'start': codec.dumps_bytes({'players': players, 'seed': seed})})
+            pipe.expire(key, GAME_EVENT_LOG_TTL)
+            await pipe.execute()
+
+    async def append(self, room_id, events):
+        key, snapshot_key = self.KEY.format(room_id), self.SNAPSHOT_KEY.format(room_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, {'events': codec.dumps_bytes(events)})
+            pipe.hincrby(snapshot_key, 'pending', len(events))
+            pipe.expire(key, GAME_EVENT_LOG_TTL)
+            pipe.expire(snapshot_key, GAME_EVENT_LOG_TTL)
+            _, pending, _, _ = await pipe.execute()
+        return pending
+
+    async def save_snapshot(self, room_id, snapshot):
+        key, snapshot_key = self.KEY.format(room_id), self.SNAPSHOT_KEY.format(room_id)
+        entry_id = await self.redis.xadd(key, {'snapshot': snapshot})
+        # Should this fail, load() still finds the snapshot entry when reading from an older one
+        await self.redis.hset(snapshot_key, mapping={'after': entry_id, 'pending': 0})
+
+    async def load(self, room_id):
+        key = self.KEY.format(room_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xrange(key, count=1)
+            pipe.hget(self.SNAPSHOT_KEY.format(room_id), 'after')
+            first, after = await pipe.execute()
+        if not first or b'start' not in first[0][1]:
+            return None
+        start = codec.loads(first[0][1][b'start'])
+        entries = await self.redis.xrange(key, min=after or '-')
+        snapshot, events = None, []
+        for _, fields in entries:
+            if b'snapshot' in fields:
+                snapshot, events = fields[b'snapshot'], []
+            elif b'events' in fields:
+                events.extend(codec.loads(fields[b'events']))
+        return start['players'], start['seed'], events, snapshot
+
+    async def delete(self, room_id):
+        await self.redis.delete(self.KEY.format(room_id), self.SNAPSHOT_KEY.format(room_id))
+
+_event_log = None
+
+def get_event_log():
+    """The process-wide log chosen by settings.GAME_EVENT_LOG."""
+    global _event_log
+    if _event_log is None:
+        kind = getattr(settings, 'GAME_EVENT_LOG', 'none')
+        if kind == 'redis':
+            _event_log = RedisEventLog(settings.GAME_STATE_REDIS_URL)
+        elif kind == 'local':
+            _event_log = LocalEventLog()
+        else:
+            _event_log = NullEventLog()
+    return _event_log
@@ -0,0 +1,120 @@
+"""
+Where live games are kept between websocket messages.
+
+Each room's game is stored with a version number. A consumer loads the game and its version, handles one
+message, and saves the game back only if nobody saved a newer version in the meantime (optimistic
+concurrency); a failed save returns None and the caller reloads.
+
+LocalGameStore keeps games in this process (one ASGI worker). RedisGameStore keeps them in the Redis
+server the channel layer already uses, so any number of workers can serve the same room. Pick one with
+the GAME_STATE_STORE setting ('local' or 'redis').
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+
+from backend.game_core.bitboard import dumps_game, loads_game
+
+GAME_STATE_TTL = 24 * 60 * 60  # Seconds an untouched game is kept in Redis
+LOADED_GAMES = 1000  # Rooms whose last loaded state a RedisGameStore remembers, least recently used dropped first
+
+class GameStore:
+    """
+    Interface: load(room_id) -> (game or None, version); save(...) -> new version or None on conflict;
+    delete(room_id), once the room's game is over or the room is gone.
+    """
+
+    shared = True  # Whether other processes may write the games too
+
+    async def load(self, room_id):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def save(self, room_id, game, version):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def delete(self, room_id):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+class LocalGameStore(GameStore):
+    """Games live in this process as Game objects; nothing is serialized."""
+
+    shared = False
+
+    def __init__(self):
+        self.games = {}  # room id -> (game, version)
+
+    async def load(self, room_id):
+        return self.games.get(room_id, (None, 0))
+
+    async def save(self, room_id, game, version):
+        if self.games.get(room_id, (None, 0))[1] != version:
+            return None
+        self.games[room_id] = (game, version + 1)
+        return version + 1
+
+    async def delete(self, room_id):
+        self.games.pop(room_id, None)
+
+class RedisGameStore(GameStore):
+    """
+    One Redis hash per room holding the game (dumps_game bytes) and its version. Saves are a
+    compare-and-set done by a Lua script, so two workers can never both write on top of the same version.
+    """
+
+    KEY = 'game:{}'
+    # KEYS[1] = room key; ARGV = expected version, state bytes, ttl. Returns the new version, or -1 on conflict.
+    SAVE_SCRIPT = """
+        local version = tonumber(redis.call('HGET', KEYS[1], 'version') or '0')
+        if version ~= tonumber(ARGV[1]) then
+            return -1
+        end
+        redis.call('HSET', KEYS[1], 'version', version + 1, 'state', ARGV[2])
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return version + 1
+    """
+
+    def __init__(self, url):
+        import redis.asyncio as redis  # Installed with channels_redis
+        self.redis = redis.from_url(url)
+        self.save_script = self.redis.register_script(self.SAVE_SCRIPT)
+        self.loaded = OrderedDict()  # room id -> (version, state bytes) last loaded here, to skip unchanged saves
+
+    async def load(self, room_id):
+        version, state = await self.redis.hmget(self.KEY.format(room_id), 'version', 'state')
+        if state is None:
+            self.loaded.pop(room_id, None)
+            return None, int(version or 0)
+        self.remember(room_id, int(version), state)
+        return loads_game(state), int(version)
+
+    async def save(self, room_id, game, version):
+        state = dumps_game(game)
+        if self.loaded.get(room_id) == (version, state):
+            return version  # Unchanged: nothing to write
+        new_version = await self.save_script(keys=[self.KEY.format(room_id)], args=[version, state, GAME_STATE_TTL])
+        if new_version < 0:
+            return None
+        self.remember(room_id, new_version, state)
+        return new_version
+
+    def remember(self, room_id, version, state):
+        self.loaded[room_id] = (version, state)
+        self.loaded.move_to_end(room_id)
+        if len(self.loaded) > LOADED_GAMES:
+            self.loaded.popitem(last=False)  # Rooms deleted on another worker are only ever dropped here
+
+    async def delete(self, room_id):
+        self.loaded.pop(room_id, None)
+        await self.redis.delete(self.KEY.format(room_id))
+
+_game_store = None
+
+def get_game_store():
+    """The process-wide store chosen by settings.GAME_STATE_STORE."""
+    global _game_store
+    if _game_store is None:
+        if getattr(settings, 'GAME_STATE_STORE', 'local') == 'redis':
+            _game_store = RedisGameStore(settings.GAME_STATE_REDIS_URL)
+        else:
+            _game_store = LocalGameStore()
+    return _game_store
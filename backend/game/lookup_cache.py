@@ -0,0 +1,59 @@
+"""
+Cached GameRoom and User lookups for the game consumer.
+
+Lobby events read their room, and often a user, on every message: each read was a database_sync_to_async
+thread hop plus a query. Records found are now kept for a short while in Django's cache framework: this
+process's memory by default, or Redis when several workers serve the same rooms (GAME_LOOKUP_CACHE, see
+settings.CACHES). Hits in process memory are read straight from the event loop, without a thread hop.
+
+The consumer's db_* helpers invalidate a room whenever they write it, and a user is invalidated whenever it
+is saved or deleted (the account API writes users). ROOM_TTL bounds how stale a room written anywhere else
+(e.g. in the admin) can get.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+
+ROOM_TTL = 30  # Seconds a room is served from the cache
+USER_TTL = 300  # Seconds a user is served from the cache
+
+ROOM_KEY = 'game_room:{}'
+USER_KEY = 'game_user:{}'
+
+async def _cached(key, ttl, fetch, *args):
+    """The record under `key`, or else `await fetch(*args)`, which is cached unless it is None."""
+    cache = caches['default']
+    in_memory = isinstance(cache, LocMemCache)
+    record = cache.get(key) if in_memory else await cache.aget(key)
+    if record is None:
+        record = await fetch(*args)
+        if record is not None:
+            if in_memory:
+                cache.set(key, record, ttl)
+            else:
+                await cache.aset(key, record, ttl)
+    return record
+
+async def get_room(room_id, fetch):
+    """The GameRoom `room_id`, or else `await fetch(room_id)`. Each call returns its own copy."""
+    return await _cached(ROOM_KEY.format(room_id), ROOM_TTL, fetch, room_id)
+
+async def get_user(unique_id, fetch):
+    """The user with `unique_id`, or else `await fetch(unique_id)`. Each call returns its own copy."""
+    return await _cached(USER_KEY.format(unique_id), USER_TTL, fetch, unique_id)
+
+def invalidate_room(room_id):
+    caches['default'].delete(ROOM_KEY.format(room_id))
+
+def invalidate_user(unique_id):
+    caches['default'].delete(USER_KEY.format(unique_id))
+
+def _user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.unique_id)
+
+def connect_signals():
+    """Invalidate users whenever they are saved or deleted (called once the apps are ready)."""
+    User = get_user_model()
+    post_save.connect(_user_changed, sender=User, dispatch_uid='lookup_cache_user_saved')
+    post_delete.connect(_user_changed, sender=User, dispatch_uid='lookup_cache_user_deleted')
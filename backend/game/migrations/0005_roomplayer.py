@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def players_to_rows(apps, schema_editor):
+    """One RoomPlayer per entry of each room's players list, seated in list order."""
+    GameRoom = apps.get_model('game', 'GameRoom')
+    RoomPlayer = apps.get_model('game', 'RoomPlayer')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    for room in GameRoom.objects.all():
+        members = {}
+        for player in room.players:
+            user = None
+            if not player.get('isBot'):
+                user = User.objects.filter(unique_id=player['id']).first()
+                if user is None:
+                    continue  # The account was deleted
+            members.setdefault(player['id'], RoomPlayer(
+                room=room, user=user, player_id=player['id'], name=player['name'],
+                is_ready=player.get('isReady', False), seat=len(members),
+            ))
+        RoomPlayer.objects.bulk_create(members.values())
+        room.player_count = len(members)
+        room.save(update_fields=['player_count'])
+
+
+def rows_to_players(apps, schema_editor):
+    GameRoom = apps.get_model('game', 'GameRoom')
+    for room in GameRoom.objects.all():
+        room.players = []
+        for member in room.members.order_by('seat'):
+            player = {'id': member.player_id, 'name': member.name, 'isReady': member.is_ready}
+            if member.user_id is None:
+                player['isBot'] = True
+            room.players.append(player)
+        room.save(update_fields=['players'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_remove_gameroom_is_active_gameroom_has_started_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomPlayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=150)),
+                ('is_ready', models.BooleanField(default=False)),
+                ('seat', models.PositiveSmallIntegerField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='game.gameroom')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='room_seats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'room_player',
+                'ordering': ['seat'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('room', 'player_id'), name='unique_room_player'),
+                    models.UniqueConstraint(fields=('room', 'seat'), name='unique_room_seat'),
+                ],
+            },
+        ),
+        migrations.RunPython(players_to_rows, rows_to_players),
+        migrations.RemoveField(
+            model_name='gameroom',
+            name='players',
+        ),
+    ]
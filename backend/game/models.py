@@ -1,17 +1,55 @@
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
 
+class GameRoomQuerySet(models.QuerySet):
+    def with_players(self):
+        """Rooms with their members fetched alongside, so reading room.players runs no further query."""
+        return self.prefetch_related('members')
+
 class GameRoom(models.Model):
     room_id = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     player_count = models.IntegerField(default=0)
     max_players = models.IntegerField(default=4)
     has_started = models.BooleanField(default=False)
-    players = models.JSONField(default=list) # Stores player data with readiness - [{'name': 'Player 1', 'isReady': False}, ...]
+
+    objects = GameRoomQuerySet.as_manager()
+
+    @property
+    def players(self):
+        """The room's players in seat order, as the API sends them - [{'id': ..., 'name': 'Player 1', 'isReady': False}, ...]."""
+        return [member.to_dict() for member in self.members.all()]
 
     def __str__(self):
         return f"Game Room {self.room_id} ({self.player_count}/{self.max_players} players)"
 
     class Meta:
         db_table = 'game_room'
+
+class RoomPlayer(models.Model):
+    """One seat taken in a room, by a user or a bot."""
+    room = models.ForeignKey(GameRoom, on_delete=models.CASCADE, related_name='members')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='room_seats')  # None for bots
+    player_id = models.CharField(max_length=64)  # The user's unique_id, or the bot's id
+    name = models.CharField(max_length=150)
+    is_ready = models.BooleanField(default=False)
+    seat = models.PositiveSmallIntegerField()  # Join order
+
+    def to_dict(self):
+        player = {'id': self.player_id, 'name': self.name, 'isReady': self.is_ready}
+        if self.user_id is None:
+            player['isBot'] = True
+        return player
+
+    def __str__(self):
+        return f"{self.name} in {self.room.room_id} (seat {self.seat})"
+
+    class Meta:
+        db_table = 'room_player'
+        ordering = ['seat']
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'player_id'], name='unique_room_player'),
+            models.UniqueConstraint(fields=['room', 'seat'], name='unique_room_seat'),
+        ]
@@ -0,0 +1,101 @@
+"""
+Room affinity between ASGI worker processes.
+
+With GAME_WORKERS > 1, each room belongs to exactly one worker, picked from the room code by a stable hash,
+and only that worker ever touches the room's game, so it can stay in process memory (LocalGameStore).
+A websocket may land on any worker: messages for a room owned elsewhere are forwarded over the channel
+layer to the owner's worker channel, where they join the room's queue like local messages. Everything the
+owner broadcasts goes to the room's group, which reaches every socket whichever worker holds it.
+
+Every worker runs with the same GAME_WORKERS and its own GAME_WORKER_INDEX (0 to GAME_WORKERS - 1), and
+starts listening for forwarded messages as soon as its server runs (see start_when_server_runs), as the
+sockets of the rooms it owns may all be held by other workers.
+"""
+import asyncio
+import logging
+import sys
+import zlib
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_MESSAGE = 'room.forward'
+
+def room_owner(room_id, num_workers):
+    """Index of the worker owning `room_id`; the same in every process (unlike hash())."""
+    return zlib.crc32(str(room_id).encode()) % num_workers
+
+def worker_channel(index):
+    return f'game_worker.{index}'
+
+def num_workers():
+    return getattr(settings, 'GAME_WORKERS', 1)
+
+def worker_index():
+    return getattr(settings, 'GAME_WORKER_INDEX', 0)
+
+def is_local(room_id):
+    workers = num_workers()
+    return workers <= 1 or room_owner(room_id, workers) == worker_index()
+
+async def forward(channel_layer, room_id, player_id, data, channel_name=None):
+    """
+    Send a websocket message for `room_id` to the worker owning the room. `channel_name` is the sending
+    socket's, for the owner to add it to the room's groups or reject it.
+    """
+    await channel_layer.send(worker_channel(room_owner(room_id, num_workers())), {
+        'type': FORWARDED_MESSAGE,
+        'room_id': room_id,
+        'player_id': player_id,
+        'channel_name': channel_name,
+        'data': data,
+    })
+
+_listener = None
+
+def start_listener(channel_layer, handle):
+    """
+    Start receiving the messages other workers forward to this one (once per process). `handle` is
+    called with each forwarded message.
+    """
+    global _listener
+    if num_workers() > 1 and (_listener is None or _listener.done()):
+        _listener = asyncio.create_task(_listen(channel_layer, worker_channel(worker_index()), handle))
+
+def start_when_server_runs():
+    """
+    Have the listener started once the server's event loop runs (called from GameConfig.ready, before it
+    does). Daphne runs the loop under Twisted, whose reactor is installed before the app is loaded; ASGI
+    servers sending lifespan events start it through lifespan() instead.
+    """
+    reactor = sys.modules.get('twisted.internet.reactor')
+    if num_workers() > 1 and reactor is not None:
+        # Daphne makes the reactor's loop the current one before running it
+        reactor.callWhenRunning(lambda: asyncio.get_event_loop().call_soon(start_game_listener))
+
+def start_game_listener():
+    """Start the listener with the default channel layer, queueing forwarded messages for the rooms' workers."""
+    from channels.layers import get_channel_layer
+    from backend.game.consumers import GameConsumer
+    start_listener(get_channel_layer(), GameConsumer.handle_forwarded_message)
+
+async def lifespan(scope, receive, send):
+    """ASGI app for the 'lifespan' scope (see asgi.py): starts the listener when the server starts."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            start_game_listener()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def _listen(channel_layer, channel, handle):
+    while True:
+        message = await channel_layer.receive(channel)
+        try:
+            handle(message)
+        except Exception:
+            # A malformed message must not stop the worker from serving its rooms
+            logger.error(f"Worker channel {channel}: error handling forwarded message", exc_info=True)
@@ -1,3 +1,770 @@
-from django.test import TestCase
+import asyncio
+import os
+import pickle
+import runpy
+import uuid
+from unittest import mock, skipUnless
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from channels.layers import InMemoryChannelLayer
+from backend.game.consumers import GameConsumer
+from backend.game_core.mcts import MCTSPolicy
+from backend.game.game_store import LocalGameStore
+from backend.game.event_log import LocalEventLog, NullEventLog, get_event_log
+from backend.game import codec, event_log, lookup_cache, room_router
+from backend.game.models import GameRoom, RoomPlayer
+from backend.game_core.game import Game
+from backend.game_core.moves import EndTurn
+from backend.game_core.replay import new_game, move_to_event
+from backend.game_core.card import ActionCard, MoneyCard, PropertyCard
 
-# Create your tests here.
+async def receive(layer, channel):
+    """The next event sent to `channel`; fails rather than waits forever if none comes."""
+    return await asyncio.wait_for(layer.receive(channel), timeout=1)
+
+class DealBreakerJustSayNoTests(SimpleTestCase):
+    """A Deal Breaker sent by a client names the set it takes, not its owner; the owner must still be offered Just Say No."""
+
+    def setUp(self):
+        self.consumer = GameConsumer()
+        self.consumer.room_id = 'r1'
+        self.consumer.game_group_name = 'game_r1'
+        self.consumer.channel_layer = InMemoryChannelLayer()
+        game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+        self.deal_breaker = ActionCard("Deal Breaker", card_id=200)
+        self.blue_set = [PropertyCard("Boardwalk", "blue", 4, card_id=201), PropertyCard("Park Place", "blue", 4, card_id=202)]
+        game.players[0].hand = [self.deal_breaker]
+        game.players[1].hand = [ActionCard("Just Say No", card_id=203)]
+        game.players[1].properties = {"blue": self.blue_set}
+        self.consumer.game_state = game
+        self.consumer.player_id = 'p1'
+
+    async def received(self, channel):
+        message = codec.loads((await receive(self.consumer.channel_layer, channel))['text'])
+        return message['messages'] if message['type'] == 'batch' else [message]
+
+    async def test_deal_breaker_offers_just_say_no(self):
+        layer = self.consumer.channel_layer
+        channel = await layer.new_channel()
+        await layer.group_add(self.consumer.game_group_name, channel)
+
+        await self.consumer.handle_message({
+            'action': 'deal_breaker', 'player': 'p1', 'card': self.deal_breaker.to_dict(),
+            'target_color': 'blue', 'target_set': [card.to_dict() for card in self.blue_set],
+        })
+
+        messages = await self.received(channel) + await self.received(channel)
+        choices = [message for message in messages if message['type'] == 'just_say_no_choice']
+        self.assertEqual(len(choices), 1)
+        choice = choices[0]
+        self.assertEqual(choice['playerId'], 'p2')
+        self.assertEqual(choice['opponentId'], 'p1')
+        self.assertEqual(choice['card']['id'], 203)
+        # Nothing is taken until p2 answers
+        game = self.consumer.game_state
+        self.assertEqual([card.id for card in game.get_player('p2').properties['blue']], [201, 202])
+        self.assertIn(self.deal_breaker, game.get_player('p1').hand)
+
+    def test_deal_breaker_move_names_the_set_owner(self):
+        move = self.consumer.build_move({
+            'action': 'deal_breaker', 'player': 'p1', 'card': self.deal_breaker.to_dict(),
+            'target_color': 'blue', 'target_set': [card.to_dict() for card in self.blue_set],
+        }, 'p1')
+        self.assertEqual(move.target_id, 'p2')
+        self.assertEqual(move.card_ids, [201, 202])
+
+class PlayerIdentityTests(SimpleTestCase):
+    """A socket makes moves as its own player, whoever its messages name."""
+
+    def setUp(self):
+        self.consumer = GameConsumer()
+        self.consumer.room_id = 'r1'
+        self.consumer.game_group_name = 'game_r1'
+        self.consumer.channel_layer = InMemoryChannelLayer()
+        game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+        self.card = MoneyCard(5, card_id=201)
+        game.players[0].hand = [self.card]
+        self.consumer.game_state = game
+
+    async def test_move_made_as_another_player_is_rejected(self):
+        self.consumer.player_id = 'p2'
+        with self.assertLogs('backend.game.consumers', 'WARNING'):
+            await self.consumer.handle_message({'action': 'to_bank', 'player': 'p1', 'card': self.card.to_dict()})
+            await self.consumer.handle_message({'action': 'skip_turn', 'player': 'p1'})
+        game = self.consumer.game_state
+        self.assertIn(self.card, game.get_player('p1').hand)
+        self.assertEqual(game.current_player.id, 'p1')
+
+    async def test_move_is_made_as_the_sockets_player(self):
+        self.consumer.player_id = 'p1'
+        await self.consumer.handle_message({'action': 'to_bank', 'card': self.card.to_dict()})
+        self.assertIn(self.card, self.consumer.game_state.get_player('p1').bank)
+
+class ResyncTests(SimpleTestCase):
+    """A client that missed an update (a gap in the state versions) asks for the whole game again."""
+
+    async def test_resync_sends_the_full_state(self):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = layer = InMemoryChannelLayer()
+        consumer.player_id = 'p1'
+        game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+        game.state_version = 7
+        consumer.game_state = game
+        channel = await layer.new_channel()
+        await layer.group_add(consumer.player_group_name('p1'), channel)
+
+        await consumer.handle_message({'action': 'resync'})
+
+        message = codec.loads((await receive(layer, channel))['text'])
+        self.assertEqual(message['type'], 'game_update')
+        self.assertTrue(message['is_full_state'])
+        self.assertEqual(message['version'], 7)
+        self.assertEqual(message['state'], codec.loads(codec.dumps(game.to_dict('p1'))))
+
+class FlushOutboxTests(SimpleTestCase):
+    """Once the game has started, every seated player gets one frame with the room-wide messages and their own."""
+
+    async def test_one_send_per_seated_player(self):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = layer = InMemoryChannelLayer()
+        consumer.game_state = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'bot-1', 'name': 'Bot 1'}], verbose=False)
+        channel = await layer.new_channel()
+        await layer.group_add(consumer.game_group_name, channel)
+        await layer.group_add(consumer.player_group_name('p1'), channel)
+
+        consumer.outbox = []
+        await consumer.group_send(consumer.game_group_name, {'type': 'broadcast_game_started', 'message': 'The game has started!'})
+        await consumer.send_player_state('p1', {'players': []})
+        with mock.patch.object(layer, 'group_send', wraps=layer.group_send) as group_send:
+            await consumer.flush_outbox()
+
+        # Nothing for the bot, and nothing to the game group on top of the player's frame
+        self.assertEqual([call.args[0] for call in group_send.call_args_list], [consumer.player_group_name('p1')])
+        frame = codec.loads((await receive(layer, channel))['text'])
+        self.assertEqual([message['type'] for message in frame['messages']], ['broadcast_game_started', 'game_update'])
+
+    async def test_room_wide_messages_alone_go_to_the_game_group(self):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = layer = InMemoryChannelLayer()
+        consumer.game_state = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+
+        consumer.outbox = []
+        await consumer.group_send(consumer.game_group_name, {'type': 'broadcast_game_started', 'message': 'The game has started!'})
+        with mock.patch.object(layer, 'group_send', wraps=layer.group_send) as group_send:
+            await consumer.flush_outbox()
+
+        self.assertEqual([call.args[0] for call in group_send.call_args_list], [consumer.game_group_name])
+
+def expand_cards(obj):
+    """Undo codec.compact_cards on an unpacked binary frame, as the client does with its card catalog."""
+    if isinstance(obj, codec.msgpack.ExtType):
+        card = dict(codec.card_catalog()[int.from_bytes(obj.data[:2], 'big')])
+        if obj.code == codec.WILD_CARD_EXT:
+            card['currentColor'] = obj.data[2:].decode()
+        return card
+    if isinstance(obj, dict):
+        return {key: expand_cards(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [expand_cards(value) for value in obj]
+    return obj
+
+class CodecTests(SimpleTestCase):
+    """Binary frames carry the same messages as JSON ones, with catalog cards sent as references."""
+
+    def round_trip(self, message):
+        unpacked = codec.unpack(codec.pack(message))
+        self.assertEqual(expand_cards(unpacked), codec.loads(codec.dumps(message)))
+        return unpacked
+
+    @skipUnless(codec.msgpack, "the binary protocol needs msgpack")
+    def test_full_state_round_trip(self):
+        message = codec.sample_messages()['full state']
+
+        unpacked = self.round_trip(message)
+
+        hand = unpacked['state']['players'][0]['hand']
+        self.assertTrue(hand and all(isinstance(card, codec.msgpack.ExtType) for card in hand))
+        self.assertLess(len(codec.pack(message)), len(codec.dumps(message)) / 2)
+
+    @skipUnless(codec.msgpack, "the binary protocol needs msgpack")
+    def test_card_op_round_trip(self):
+        money, wild = codec.card_catalog()[90], dict(codec.card_catalog()[30], currentColor='green')
+        ops = [
+            {'id': 90, 'from': ['hand', 'p1'], 'to': ['bank', 'p1'], 'index': 0, 'card': money},
+            {'id': 30, 'from': ['hand', 'p1'], 'to': ['properties', 'p1', 'green'], 'index': 0, 'card': wild},
+        ]
+
+        unpacked = self.round_trip({'type': 'game_update', 'state': {'ops': ops}, 'is_full_state': False, 'version': 2})
+
+        cards = [op['card'] for op in unpacked['state']['ops']]
+        self.assertEqual(cards, [codec.msgpack.ExtType(codec.CARD_EXT, b'\x00\x5a'),
+                                 codec.msgpack.ExtType(codec.WILD_CARD_EXT, b'\x00\x1egreen')])
+
+    @skipUnless(codec.msgpack, "the binary protocol needs msgpack")
+    def test_unknown_ext_type(self):
+        # A dict that is not a catalog card travels as a plain map, never as a reference the client cannot resolve
+        not_a_card = dict(codec.card_catalog()[90], value=99)
+        self.assertEqual(self.round_trip({'card': not_a_card}), {'card': not_a_card})
+        # Extension types other than cards are passed through as they are (the client rejects them)
+        unknown = codec.msgpack.ExtType(9, b'\x00\x01')
+        self.assertEqual(codec.unpack(codec.msgpack.packb({'card': unknown})), {'card': unknown})
+
+    async def test_connect_chooses_the_subprotocol(self):
+        cases = [
+            ([codec.BINARY_SUBPROTOCOL], True, codec.BINARY_SUBPROTOCOL),
+            (['other', codec.BINARY_SUBPROTOCOL], True, codec.BINARY_SUBPROTOCOL),
+            ([], True, None),
+            (['other'], True, None),
+            ([codec.BINARY_SUBPROTOCOL], False, None),  # msgpack is not installed
+        ]
+        for offered, has_msgpack, accepted in cases:
+            consumer = GameConsumer()
+            consumer.scope = {'url_route': {'kwargs': {'room_id': 'r1'}}, 'subprotocols': offered}
+            consumer.channel_layer = InMemoryChannelLayer()
+            consumer.accept = mock.AsyncMock()
+            consumer.route_message = mock.AsyncMock()
+            with mock.patch.object(room_router, 'start_listener'), \
+                    mock.patch.object(codec, 'msgpack', codec.msgpack if has_msgpack else None):
+                await consumer.connect()
+            consumer.accept.assert_awaited_once_with(accepted)
+            self.assertEqual(consumer.binary, accepted is not None)
+
+class SendFrameTests(SimpleTestCase):
+    """Everything a handled message sends reaches each socket as a single websocket message, in its protocol."""
+
+    @skipUnless(codec.msgpack, "the binary protocol needs msgpack")
+    async def test_one_message_per_socket(self):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = layer = InMemoryChannelLayer()
+        channel = await layer.new_channel()
+        await layer.group_add(consumer.game_group_name, channel)
+        card = PropertyCard("Boardwalk", "blue", 4, card_id=1).to_dict()
+
+        consumer.outbox = []
+        await consumer.group_send(consumer.game_group_name, {'type': 'broadcast_game_started', 'message': 'The game has started!'})
+        await consumer.group_send(consumer.game_group_name, {'type': 'broadcast_card_played', 'player_id': 'p1',
+                                                             'action': 'to_properties', 'action_type': 'to_properties', 'card': card})
+        await consumer.flush_outbox()
+        frame = await receive(layer, channel)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), timeout=0.1)
+
+        received = {}
+        for binary in (False, True):
+            sent = []
+            async def send(text_data=None, bytes_data=None):
+                sent.append(text_data if text_data is not None else bytes_data)
+            socket = GameConsumer()
+            socket.send = send
+            socket.binary = binary
+            await socket.send_frame(frame)
+            self.assertEqual(len(sent), 1)
+            received[binary] = expand_cards(codec.unpack(sent[0])) if binary else codec.loads(sent[0])
+        self.assertEqual(received[False]['type'], 'batch')
+        self.assertEqual([message['type'] for message in received[False]['messages']], ['broadcast_game_started', 'card_played'])
+        self.assertEqual(received[True], received[False])
+
+class CountingGameStore(LocalGameStore):
+    def __init__(self):
+        super().__init__()
+        self.loads = self.saves = 0
+
+    async def load(self, room_id):
+        self.loads += 1
+        return await super().load(room_id)
+
+    async def save(self, room_id, game, version):
+        self.saves += 1
+        return await super().save(room_id, game, version)
+
+class RoomWorkerTests(SimpleTestCase):
+    """A room's worker keeps a game nobody else writes, rather than going through the store for every message."""
+
+    def tearDown(self):
+        GameConsumer.room_games.pop('r1', None)
+
+    async def test_owned_game_is_loaded_once_and_saved_when_drained(self):
+        store = CountingGameStore()
+        game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+        await store.save('r1', game, 0)
+        store.saves = 0
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = InMemoryChannelLayer()
+        queue = asyncio.Queue()
+        handled = []
+        async def handle_message(data):
+            handled.append((data['n'], consumer.game_state))
+        consumer.handle_message = handle_message
+
+        with mock.patch('backend.game.consumers.get_game_store', return_value=store), \
+                mock.patch.dict(GameConsumer.room_queues, {'r1': queue}):
+            for n in range(3):
+                queue.put_nowait((consumer, {'action': 'resync', 'n': n}))
+            while not queue.empty():
+                await consumer.handle_room_message(queue.get_nowait()[1])
+
+        self.assertEqual([n for n, _ in handled], [0, 1, 2])
+        self.assertTrue(all(state is game for _, state in handled))
+        self.assertEqual((store.loads, store.saves), (1, 1))
+        self.assertEqual(await store.load('r1'), (game, 2))
+
+class DiscardGameTests(SimpleTestCase):
+    """A room's game and its event log are dropped everywhere once the game is over or the room is deleted."""
+
+    def setUp(self):
+        self.store = LocalGameStore()
+        self.log = LocalEventLog()
+        self.game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], verbose=False)
+        self.consumer = GameConsumer()
+        self.consumer.room_id = 'r1'
+        self.consumer.game_group_name = 'game_r1'
+        self.consumer.channel_layer = InMemoryChannelLayer()
+        self.consumer.player_id = 'p1'
+
+    def tearDown(self):
+        GameConsumer.room_games.pop('r1', None)
+
+    def stored(self):
+        return mock.patch('backend.game.consumers.get_game_store', return_value=self.store), \
+            mock.patch('backend.game.consumers.get_event_log', return_value=self.log)
+
+    async def assert_discarded(self):
+        self.assertEqual(await self.store.load('r1'), (None, 0))
+        self.assertIsNone(await self.log.load('r1'))
+        self.assertNotIn('r1', GameConsumer.room_games)
+
+    async def test_finished_game_is_discarded(self):
+        await self.store.save('r1', self.game, 0)
+        await self.log.start('r1', [{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], 1)
+        GameConsumer.room_games['r1'] = (self.game, 1)
+        async def handle_message(data):
+            self.consumer.game_state.winner = self.consumer.game_state.players[0]
+        self.consumer.handle_message = handle_message
+
+        store, log = self.stored()
+        with store, log:
+            await self.consumer.handle_room_message({'action': 'skip_turn'})
+
+        await self.assert_discarded()
+
+    async def test_deleted_rooms_game_is_discarded(self):
+        await self.store.save('r1', self.game, 0)
+        await self.log.start('r1', [{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], 1)
+        GameConsumer.room_games['r1'] = (self.game, 1)
+
+        store, log = self.stored()
+        with store, log, mock.patch.object(GameConsumer, 'db_get_room_by_id', return_value=None), \
+                mock.patch.object(GameConsumer, 'db_remove_player_from_room', return_value=True):
+            await self.consumer.remove_player_from_room()
+
+        await self.assert_discarded()
+
+    @override_settings(GAME_EVENT_LOG='none')  # The default for one worker with a local store (see settings.py)
+    def test_none_keeps_no_log(self):
+        with mock.patch.object(event_log, '_event_log', None):
+            self.assertIsInstance(get_event_log(), NullEventLog)
+
+class RoomQueueTests(SimpleTestCase):
+    """A room's messages are handled one at a time, in the order they arrived, whichever socket sent them."""
+
+    async def test_messages_are_handled_in_arrival_order(self):
+        handled = []
+        async def handle_room_message(consumer, data):
+            handled.append(('start', data['n']))
+            # The even messages take longer, so any that ran alongside the next one would finish after it
+            await asyncio.sleep(0.01 if data['n'] % 2 == 0 else 0)
+            handled.append(('end', data['n']))
+        sockets = [GameConsumer(), GameConsumer()]
+        for socket in sockets:
+            socket.room_id = 'r1'
+
+        with mock.patch.object(GameConsumer, 'handle_room_message', handle_room_message), \
+                mock.patch('backend.game.consumers.ROOM_WORKER_IDLE_TIMEOUT', 0.05):
+            for n in range(6):
+                sockets[n % 2].enqueue_message({'action': 'resync', 'n': n})
+            await GameConsumer.room_workers['r1']
+
+        self.assertEqual(handled, [(step, n) for n in range(6) for step in ('start', 'end')])
+        # The idle worker shut down and took its queue with it
+        self.assertNotIn('r1', GameConsumer.room_queues)
+        self.assertNotIn('r1', GameConsumer.room_workers)
+
+class RoomRoutingTests(SimpleTestCase):
+    """Joining and leaving a room owned by another worker process go through that worker too."""
+
+    def setUp(self):
+        self.consumer = GameConsumer()
+        self.consumer.channel_layer = InMemoryChannelLayer()
+        self.consumer.channel_name = 'websocket.1'
+        # A room owned by worker 1, while this process is worker 0
+        self.consumer.room_id = next(room for room in map(str, range(100)) if room_router.room_owner(room, 2) == 1)
+        self.consumer.game_group_name = f'game_{self.consumer.room_id}'
+
+    async def forwarded(self):
+        return await receive(self.consumer.channel_layer, room_router.worker_channel(1))
+
+    @override_settings(GAME_WORKERS=2, GAME_WORKER_INDEX=0)
+    async def test_join_is_forwarded_with_the_socket(self):
+        await self.consumer.receive(codec.dumps({'action': 'establish_connection', 'player_id': 'u1'}))
+
+        message = await self.forwarded()
+        self.assertEqual(message['data'], {'action': 'establish_connection', 'player_id': 'u1'})
+        self.assertEqual((message['player_id'], message['channel_name']), ('u1', 'websocket.1'))
+        self.assertNotIn(self.consumer.room_id, GameConsumer.room_queues)
+
+    @override_settings(GAME_WORKERS=2, GAME_WORKER_INDEX=0)
+    async def test_leaving_is_forwarded(self):
+        self.consumer.player_id = 'u1'
+        await self.consumer.disconnect(1000)
+
+        message = await self.forwarded()
+        self.assertEqual(message['data'], {'action': 'player_disconnected', 'left': True})
+        self.assertEqual(message['player_id'], 'u1')
+
+class ReconnectTests(SimpleTestCase):
+    """A seated player whose connection dropped keeps their seat, and gets their game back on a new socket."""
+
+    PLAYERS = [{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}]
+
+    def setUp(self):
+        self.room = mock.Mock(has_started=True, players=self.PLAYERS)
+        self.user = mock.Mock(unique_id='p1', username='Player 1')
+
+    def tearDown(self):
+        GameConsumer.room_games.pop('r1', None)
+
+    def seated(self):
+        return mock.patch.object(GameConsumer, 'db_get_room_by_id', return_value=self.room), \
+            mock.patch.object(GameConsumer, 'db_get_user_by_unique_id', return_value=self.user), \
+            mock.patch.object(GameConsumer, 'db_get_room_data_by_id', return_value={})
+
+    async def test_dropped_connection_keeps_the_seat(self):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.game_group_name = 'game_r1'
+        consumer.channel_layer = InMemoryChannelLayer()
+        consumer.player_id = 'p1'
+        room, user, room_data = self.seated()
+
+        with room, user, room_data, \
+                mock.patch.object(GameConsumer, 'db_remove_player_from_room') as remove:
+            await consumer.handle_message({'action': 'player_disconnected', 'left': False})
+            remove.assert_not_called()
+            await consumer.handle_message({'action': 'player_disconnected', 'left': True})
+            remove.assert_called_once_with('p1')
+
+    async def test_restarted_worker_recovers_the_game_for_a_reconnecting_socket(self):
+        game = new_game(self.PLAYERS, 5, verbose=False)
+        game.move_log = []
+        move = next(move for move in game.legal_moves(game.current_player) if not isinstance(move, EndTurn))
+        self.assertTrue(game.apply_move(move))
+        log = LocalEventLog()
+        await log.start('r1', self.PLAYERS, 5)
+        await log.append('r1', [move_to_event(move) for move in game.move_log])
+
+        # The worker restarted: its store and the games it kept are gone, the event log is not
+        consumer = GameConsumer()
+        consumer.scope = {'url_route': {'kwargs': {'room_id': 'r1'}}, 'subprotocols': []}
+        consumer.channel_layer = layer = InMemoryChannelLayer()
+        consumer.channel_name = await layer.new_channel()
+        consumer.accept = mock.AsyncMock()
+        room, user, room_data = self.seated()
+
+        with room, user, room_data, \
+                mock.patch('backend.game.consumers.get_game_store', return_value=LocalGameStore()), \
+                mock.patch('backend.game.consumers.get_event_log', return_value=log), \
+                mock.patch.object(room_router, 'start_listener'), \
+                mock.patch('backend.game.consumers.ROOM_WORKER_IDLE_TIMEOUT', 0.05):
+            await consumer.connect()
+            await consumer.receive(codec.dumps({'action': 'establish_connection', 'player_id': 'p1'}))
+            await GameConsumer.room_workers['r1']
+
+        message = codec.loads((await receive(layer, consumer.channel_name))['text'])
+        update = next(message for message in message['messages'] if message['type'] == 'game_update')
+        self.assertTrue(update['is_full_state'])
+        self.assertEqual(update['state'], codec.loads(codec.dumps(game.to_dict('p1'))))
+
+@override_settings(GAME_WORKERS=2, GAME_WORKER_INDEX=1)
+class WorkerStartupTests(SimpleTestCase):
+    """A worker serves the rooms it owns from the moment its server starts, before any socket connects to it."""
+
+    def setUp(self):
+        self.layer = InMemoryChannelLayer()
+        self.room_id = next(room for room in map(str, range(100)) if room_router.room_owner(room, 2) == 1)
+        self.handled = asyncio.Event()
+        async def handle_room_message(consumer, data):
+            self.forwarded = (consumer.player_id, consumer.channel_name, data)
+            self.handled.set()
+        self.patches = [mock.patch('channels.layers.get_channel_layer', return_value=self.layer),
+                        mock.patch('backend.game.consumers.get_channel_layer', return_value=self.layer),
+                        mock.patch.object(GameConsumer, 'handle_room_message', handle_room_message),
+                        mock.patch('backend.game.consumers.ROOM_WORKER_IDLE_TIMEOUT', 0.05),
+                        mock.patch.object(room_router, '_listener', None)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    async def assert_forwarded_message_is_handled(self):
+        self.assertFalse(room_router._listener.done())
+        # Sent by worker 0, which holds the socket
+        await room_router.forward(self.layer, self.room_id, 'u1', {'action': 'resync'}, 'websocket.1')
+        await asyncio.wait_for(self.handled.wait(), timeout=1)
+        self.assertEqual(self.forwarded, ('u1', 'websocket.1', {'action': 'resync'}))
+        await GameConsumer.room_workers[self.room_id]
+        room_router._listener.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await room_router._listener
+
+    async def test_lifespan_startup_starts_the_listener(self):
+        events = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+        async def receive():
+            return events.pop(0)
+        async def send(message):
+            sent.append(message['type'])
+
+        await room_router.lifespan({'type': 'lifespan'}, receive, send)
+
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        await self.assert_forwarded_message_is_handled()
+
+    async def test_daphne_reactor_start_starts_the_listener(self):
+        reactor = mock.Mock()
+        with mock.patch.dict('sys.modules', {'twisted.internet.reactor': reactor}):
+            room_router.start_when_server_runs()
+        reactor.callWhenRunning.call_args.args[0]()
+        await asyncio.sleep(0)
+
+        await self.assert_forwarded_message_is_handled()
+
+class BotSearchTests(SimpleTestCase):
+    """A bot's search runs in another process while the room's worker carries on."""
+
+    async def test_search_leaves_the_event_loop_free(self):
+        consumer = GameConsumer()
+        game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'bot-1', 'name': 'Bot 1'}], seed=1, verbose=False)
+        game.current_player.draw_cards(game.deck, 2)
+        consumer.game_state = game
+        loop = asyncio.get_running_loop()
+
+        with mock.patch.object(GameConsumer, 'bot', MCTSPolicy(time_limit=0.5)):
+            search = consumer.choose_bot_move(game.current_player.id)
+            started = loop.time()
+            ticks = 0
+            while not search.done():
+                await asyncio.sleep(0.01)
+                ticks += 1
+            move = await search
+
+        self.assertIn(move, set(game.legal_moves(game.current_player)))
+        self.assertGreater(loop.time() - started, 0.4)
+        # Ticks come about every 10ms; a search holding the loop or the GIL would leave far fewer
+        self.assertGreater(ticks, 0.6 * (loop.time() - started) / 0.01)
+
+class RoomDatabaseTestCase(TransactionTestCase):
+    """
+    A room 'r1' and two users, read and written through a consumer's db_* helpers. Those run in
+    database_sync_to_async, which closes the connection of TestCase's wrapping transaction.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        User = get_user_model()
+        self.alice = User.objects.create(username='alice', email='alice@example.com')
+        self.bob = User.objects.create(username='bob', email='bob@example.com')
+        GameRoom.objects.create(room_id='r1', max_players=2)
+        self.consumer = self.consumer_for(self.alice)
+
+    def consumer_for(self, user):
+        consumer = GameConsumer()
+        consumer.room_id = 'r1'
+        consumer.player_id = str(user.unique_id)
+        return consumer
+
+class LookupCacheTests(RoomDatabaseTestCase):
+    """Rooms and users are served from the cache until they are written, never as they were before."""
+
+    def cached_room(self):
+        return caches['default'].get(lookup_cache.ROOM_KEY.format('r1'))
+
+    async def assert_invalidated(self, write):
+        """Run `write` with the room cached; it must drop the cached copy. Returns the room read afterwards."""
+        await self.consumer.db_get_room_by_id('r1')
+        self.assertIsNotNone(self.cached_room())
+        await write
+        self.assertIsNone(self.cached_room())
+        return await self.consumer.db_get_room_by_id('r1')
+
+    async def test_room_writes_invalidate_the_cached_room(self):
+        room = await self.consumer.db_get_room_by_id('r1')
+        room = await self.assert_invalidated(self.consumer.db_add_player_to_room(room, self.alice))
+        self.assertEqual([player['name'] for player in room.players], ['alice'])
+        room = await self.assert_invalidated(self.consumer_for(self.bob).db_add_player_to_room(room, self.bob))
+        self.assertEqual(room.player_count, 2)
+        room = await self.assert_invalidated(self.consumer.db_set_player_ready(True))
+        self.assertTrue(room.players[0]['isReady'])
+        room = await self.assert_invalidated(self.consumer_for(self.bob).db_remove_player_from_room(str(self.bob.unique_id)))
+        self.assertEqual([player['name'] for player in room.players], ['alice'])
+        room = await self.assert_invalidated(self.consumer.db_mark_game_start(room))
+        self.assertTrue(room.has_started)
+
+    async def test_refused_join_invalidates_the_cached_room(self):
+        # A cached room still showing a free seat lets a player through to the database, which refuses them
+        room = await self.consumer.db_get_room_by_id('r1')
+        await GameRoom.objects.filter(room_id='r1').aupdate(player_count=2)
+        self.assertEqual((await self.consumer.db_get_room_by_id('r1')).player_count, 0)
+
+        self.assertEqual(await self.consumer.db_add_player_to_room(room, self.alice), "Room is full.")
+        self.assertEqual((await self.consumer.db_get_room_by_id('r1')).player_count, 2)
+
+    async def test_saved_user_is_not_served_stale(self):
+        unique_id = self.alice.unique_id
+        self.assertEqual((await self.consumer.db_get_user_by_unique_id(unique_id)).username, 'alice')
+        self.alice.username = 'alicia'
+        await self.alice.asave()
+        self.assertEqual((await self.consumer.db_get_user_by_unique_id(unique_id)).username, 'alicia')
+
+    async def test_cached_records_are_copies(self):
+        room = await self.consumer.db_get_room_by_id('r1')
+        room.has_started = True
+        self.assertFalse((await self.consumer.db_get_room_by_id('r1')).has_started)
+
+    def test_redis_store_shares_the_cache(self):
+        settings_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend', 'settings.py')
+        def cache_backend(**environ):
+            with mock.patch.dict(os.environ, environ):
+                return runpy.run_path(settings_file)['CACHES']['default']['BACKEND']
+
+        self.assertEqual(cache_backend(GAME_STATE_STORE='local', GAME_WORKERS='1'), 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertEqual(cache_backend(GAME_STATE_STORE='redis'), 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(cache_backend(GAME_WORKERS='2'), 'django.core.cache.backends.redis.RedisCache')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis'}})
+    async def test_workers_share_cached_rooms_and_their_invalidation(self):
+        redis = {}  # The Redis server every worker's cache talks to
+        async def aget(cache, key, default=None):
+            return pickle.loads(redis[key]) if key in redis else default
+        async def aset(cache, key, value, timeout=None):
+            redis[key] = pickle.dumps(value)
+        def delete(cache, key):
+            return redis.pop(key, None) is not None
+        key = lookup_cache.ROOM_KEY.format('r1')
+
+        with mock.patch.multiple('django.core.cache.backends.redis.RedisCache', aget=aget, aset=aset, delete=delete):
+            room = await self.consumer.db_get_room_by_id('r1')
+            self.assertIn(key, redis)
+            # Another worker reads the room this one cached, and its write drops it for both
+            other = self.consumer_for(self.bob)
+            with mock.patch.object(other, 'db_fetch_room_by_id') as fetch:
+                await other.db_get_room_by_id('r1')
+                fetch.assert_not_called()
+            await other.db_add_player_to_room(room, self.bob)
+            self.assertNotIn(key, redis)
+            self.assertEqual((await self.consumer.db_get_room_by_id('r1')).player_count, 1)
+
+class RoomPlayerTests(RoomDatabaseTestCase):
+    """A room's players are its RoomPlayer rows, and seats are counted under the room's row lock."""
+
+    def test_players_are_derived_from_the_rows(self):
+        room = GameRoom.objects.get(room_id='r1')
+        RoomPlayer.objects.create(room=room, player_id='bot-1', name='Bot 1', is_ready=True, seat=1)
+        RoomPlayer.objects.create(room=room, user=self.alice, player_id=str(self.alice.unique_id), name='alice', seat=0)
+
+        room = GameRoom.objects.with_players().get(room_id='r1')
+        with self.assertNumQueries(0):
+            players = room.players
+        self.assertEqual(players, [
+            {'id': str(self.alice.unique_id), 'name': 'alice', 'isReady': False},
+            {'id': 'bot-1', 'name': 'Bot 1', 'isReady': True, 'isBot': True},
+        ])
+        self.assertEqual(players, [member.to_dict() for member in RoomPlayer.objects.filter(room=room).order_by('seat')])
+
+    async def test_seats_are_counted_under_the_row_lock(self):
+        room = await self.consumer.db_get_room_by_id('r1')
+        # Written by someone else since the room was read: the count must add to it, not overwrite it
+        await GameRoom.objects.filter(room_id='r1').aupdate(max_players=4, player_count=1)
+        await RoomPlayer.objects.acreate(room=await GameRoom.objects.aget(room_id='r1'), player_id='bot-1', name='Bot 1', seat=0)
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as lock:
+            self.assertIsNone(await self.consumer.db_add_player_to_room(room, self.alice))
+            await self.consumer.db_add_bot_to_room()
+            await self.consumer_for(self.bob).db_add_player_to_room(room, self.bob)
+            await self.consumer.db_remove_player_from_room('bot-1')
+        self.assertEqual(lock.call_count, 4)
+
+        room = await GameRoom.objects.aget(room_id='r1')
+        self.assertEqual(room.player_count, 3)
+        seats = [seat async for seat in RoomPlayer.objects.filter(room=room).values_list('seat', flat=True)]
+        self.assertEqual(seats, [1, 2, 3])
+
+    async def test_concurrent_joins_for_the_last_seat(self):
+        # Both joins passed their checks against the same room read, with one seat left
+        await self.consumer.db_add_bot_to_room()
+        room = await self.consumer.db_get_room_by_id('r1')
+        self.assertEqual(room.player_count, 1)
+
+        results = await asyncio.gather(
+            self.consumer.db_add_player_to_room(room, self.alice),
+            self.consumer_for(self.bob).db_add_player_to_room(room, self.bob),
+        )
+
+        self.assertCountEqual(results, [None, "Room is full."])
+        room = await GameRoom.objects.aget(room_id='r1')
+        self.assertEqual(room.player_count, 2)
+        self.assertEqual(await RoomPlayer.objects.filter(room=room).acount(), 2)
+
+class RoomPlayerMigrationTests(TransactionTestCase):
+    """Migration 0005 turns each room's players list into RoomPlayer rows, and back when reversed."""
+
+    BEFORE = [('game', '0004_remove_gameroom_is_active_gameroom_has_started_and_more')]
+    AFTER = [('game', '0005_roomplayer')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        return executor.migrate(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_players_list_becomes_rows_and_back(self):
+        apps = self.migrate(self.BEFORE)
+        User = apps.get_model('authentication', 'User')
+        alice = User.objects.create(username='alice', email='alice@example.com')
+        alice_id = str(alice.unique_id)
+        alice_player = {'id': alice_id, 'name': 'alice', 'isReady': True}
+        bot_player = {'id': 'bot-1', 'name': 'Bot 1', 'isReady': True, 'isBot': True}
+        deleted_player = {'id': str(uuid.uuid4()), 'name': 'gone', 'isReady': False}
+        apps.get_model('game', 'GameRoom').objects.create(
+            room_id='r1', player_count=4, players=[bot_player, deleted_player, alice_player, dict(alice_player)])
+
+        apps = self.migrate(self.AFTER)
+        room = apps.get_model('game', 'GameRoom').objects.get(room_id='r1')
+        members = apps.get_model('game', 'RoomPlayer').objects.filter(room=room).order_by('seat')
+        self.assertEqual(
+            [(member.player_id, member.name, member.is_ready, member.seat, member.user_id) for member in members],
+            [('bot-1', 'Bot 1', True, 0, None), (alice_id, 'alice', True, 1, alice.pk)],
+        )
+        self.assertEqual(room.player_count, 2)
+
+        apps = self.migrate(self.BEFORE)
+        room = apps.get_model('game', 'GameRoom').objects.get(room_id='r1')
+        self.assertEqual(room.players, [bot_player, alice_player])
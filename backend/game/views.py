@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
@@ -7,14 +7,24 @@ import random
 import string
 import logging
 from .models import GameRoom
+from . import codec
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 
 logger = logging.getLogger(__name__)
 
+class CodecJsonResponse(HttpResponse):
+    """django.http.JsonResponse, encoded with the game's JSON codec (orjson when installed)."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=codec.dumps_bytes(data), **kwargs)
+
 def fetch_rooms(request):
     try:
-        rooms = GameRoom.objects.all()  # Fetch all game rooms
+        rooms = GameRoom.objects.with_players()  # Fetch all game rooms, with their players
         room_list = [{
             'room_id': room.room_id,
             'player_count': room.player_count,
@@ -23,14 +33,18 @@ def fetch_rooms(request):
             'players': room.players
         } for room in rooms]
         
-        return JsonResponse(room_list, safe=False)
+        return CodecJsonResponse(room_list, safe=False)
     except Exception as e:
         logger.error(f"Error fetching rooms: {str(e)}", exc_info=True)
-        return JsonResponse({
+        return CodecJsonResponse({
             'status': 'error',
             'message': str(e)
         }, status=400)
 
+def card_catalog(request):
+    """Every card by id, for clients of the binary websocket protocol (which sends cards by id)."""
+    return CodecJsonResponse(codec.card_catalog())
+
 def generate_room_code():
     """
     Generate a 6-character room code.
@@ -59,7 +73,7 @@ def create_room(request):
         if attempts == max_attempts:
             raise Exception("Failed to generate unique room code")
         
-        room = GameRoom.objects.create(room_id=room_id, player_count=0, players=[])
+        room = GameRoom.objects.create(room_id=room_id, player_count=0)
         logger.info(f"Successfully created room with ID: {room_id}")
         
         response_data = {
@@ -70,10 +84,10 @@ def create_room(request):
             'players': room.players
         }
         logger.info(f"Returning response: {response_data}")
-        return JsonResponse(response_data)
+        return CodecJsonResponse(response_data)
     except Exception as e:
         logger.error(f"Error creating room: {str(e)}", exc_info=True)
-        return JsonResponse({
+        return CodecJsonResponse({
             'status': 'error',
             'message': str(e)
         }, status=400)
@@ -91,20 +105,20 @@ def join_room(request, room_id):
         # Check if player is already in the room
         if room.has_started:
             logger.info(f"This room has already started playing.")
-            return JsonResponse({
+            return CodecJsonResponse({
                 'status': 'error',
                 'message': 'This room has already started playing.'
             })
-        player_exists = any(player['id'] == id for player in room.players)
+        player_exists = room.members.filter(player_id=id).exists()
         if player_exists:
             logger.info(f"You are already in this room!")
-            return JsonResponse({
+            return CodecJsonResponse({
                 'status': 'error',
                 'message': 'You are already in this room!'
             })
         if room.player_count >= room.max_players:
             logger.info(f"Room is full.")
-            return JsonResponse({
+            return CodecJsonResponse({
                 'status': 'error',
                 'message': 'Room is full.'
             })
@@ -119,18 +133,18 @@ def join_room(request, room_id):
         }
 
         logger.info(f"Returning response: {response_data}")
-        return JsonResponse(response_data)
+        return CodecJsonResponse(response_data)
     
     except GameRoom.DoesNotExist:
         logger.warning(f"Room not found: {room_id}")
-        return JsonResponse({
+        return CodecJsonResponse({
             'status': 'error',
             'message': 'Room not found'
         }, status=404)
         
     except Exception as e:
         logger.error(f"Error getting room: {str(e)}", exc_info=True)
-        return JsonResponse({
+        return CodecJsonResponse({
             'status': 'error',
             'message': str(e)
         }, status=400)
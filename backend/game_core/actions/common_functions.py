@@ -1,13 +1,29 @@
-from backend.game_core.card import PropertyCard, ActionCard
+# Counts are read from the PropertySet kept per color in player.properties, so none of these scan the cards
 
 def count_fixed_property_cards(self, color):
-    return sum(1 for card in self.properties.get(color, []) if isinstance(card, PropertyCard) and not card.is_wild)
+    cards = self.properties.get(color)
+    return cards.fixed if cards is not None else 0
 
 def count_wild_property_cards(self, color):
-    return sum(1 for card in self.properties.get(color, []) if isinstance(card, PropertyCard) and card.is_wild)
+    cards = self.properties.get(color)
+    return cards.wilds if cards is not None else 0
 
 def count_house_cards(self, color):
-    return sum(1 for card in self.properties.get(color, []) if isinstance(card, ActionCard) and card.name == "House")
+    cards = self.properties.get(color)
+    return cards.houses if cards is not None else 0
 
 def count_hotel_cards(self, color):
-    return sum(1 for card in self.properties.get(color, []) if isinstance(card, ActionCard) and card.name == "Hotel")
+    cards = self.properties.get(color)
+    return cards.hotels if cards is not None else 0
+
+def count_property_cards(self, color):
+    return self.properties.num_property_cards(color)
+
+def count_complete_sets(self, color):
+    cards = self.properties.get(color)
+    return cards.num_complete_sets if cards is not None else 0
+
+def calculate_rent(self, color):
+    """Rent owed for the player's `color` set, including any House (+3M) and Hotel (+4M)."""
+    cards = self.properties.get(color)
+    return cards.rent if cards is not None else 0
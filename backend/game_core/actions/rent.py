@@ -1,7 +1,7 @@
 from backend.game_core.actions.base_action import BaseAction
 from backend.game_core.card import ActionCard, PropertyCard, RentCard
-from backend.game_core.properties import rent_values, num_properties_needed_for_full_set
 from backend.game_core.actions.just_say_no import JustSayNo
+from backend.game_core.actions import common_functions
 
 class Rent(BaseAction):
     def select_target_player(self):
@@ -35,7 +35,7 @@ class Rent(BaseAction):
         # Filter properties based on the RentCard's colors
         properties_to_charge = {}
         for color in rent_card.colors:
-            if color in self.player.properties and any(isinstance(prop, PropertyCard) for prop in self.player.properties[color]):
+            if common_functions.count_property_cards(self.player, color):
                 properties_to_charge[color] = self.player.properties[color]
 
         if not properties_to_charge:
@@ -61,12 +61,7 @@ class Rent(BaseAction):
                 print("Invalid choice. Please select a valid property set.")
 
         # Calculate rent based on the number of properties in the selected set (+ house + hotel)
-        rent_index = min(len(properties_to_charge[selected_color]), num_properties_needed_for_full_set[selected_color]) - 1
-        rent_amount = rent_values[selected_color][rent_index]
-        if any(isinstance(card, ActionCard) and card.name == "House" for card in properties_to_charge[selected_color]):
-            rent_amount += 3
-        if any(isinstance(card, ActionCard) and card.name == "Hotel" for card in properties_to_charge[selected_color]):
-            rent_amount += 4
+        rent_amount = common_functions.calculate_rent(self.player, selected_color)
         
         # Double rent if a double rent card is played
         if double_rent:
@@ -106,7 +101,7 @@ class Rent(BaseAction):
                 # Filter properties based on the RentCard's colors
                 properties_to_charge = {}
                 for color in card.colors:
-                    if color in self.player.properties and any(isinstance(prop, PropertyCard) for prop in self.player.properties[color]):
+                    if common_functions.count_property_cards(self.player, color):
                         properties_to_charge[color] = self.player.properties[color]
 
                 if not properties_to_charge:
@@ -0,0 +1,335 @@
+"""
+Compact, fixed-size representation of a Game for search and large self-play runs.
+
+Every catalog card id (2-109) gets one slot in a few bytearrays and one bit in each zone mask:
+    location[card_id]   zone code of the card (deck, discard, or a seat's hand / bank / color set)
+    position[card_id]   the card's index inside its zone, so zone order survives the round trip
+    wild_color[card_id] index into COLORS of a wild card's current color
+Zone masks are Python ints used as 128-bit sets, so set completion, rent and bank totals are a few
+AND + bit_count() operations against the precomputed tables below. Cloning copies three 128 byte
+arrays and a short list of ints; hashing hashes those bytes.
+
+BitboardState.from_game() / to_game() convert to and from the object model losslessly for games
+dealt from the catalog (see deck.py). to_bytes() / from_bytes() store a state in about 3KB, most of it
+the RNG state (which can be left out): dumps_game() / loads_game() are the shortcuts for storing a Game.
+"""
+import copy
+import json
+import random
+import struct
+from backend.game_core.card import PropertyCard, ActionCard
+from backend.game_core.card_index import CardIndex
+from backend.game_core.deck import Deck, CARD_CATALOG, WILD_CARD_IDS
+from backend.game_core.moves import PendingAction
+from backend.game_core.player import Player
+from backend.game_core.properties import num_properties_needed_for_full_set, rent_values
+
+CARD_SLOTS = 128  # One slot per card id; ids are 2-109
+COLORS = tuple(num_properties_needed_for_full_set)
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+NUM_PROPERTIES_NEEDED = tuple(num_properties_needed_for_full_set[color] for color in COLORS)
+# RENT_TABLE[color][n] is the rent for n property cards of that color (capped at a full set)
+RENT_TABLE = tuple((0,) + tuple(rent_values[color]) for color in COLORS)
+
+def card_mask(card_ids):
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << card_id
+    return mask
+
+def iter_bits(mask):
+    """Yield the card ids whose bits are set in `mask`, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+PROPERTY_MASK = card_mask(card.id for card in CARD_CATALOG.values() if isinstance(card, PropertyCard))
+HOUSE_MASK = card_mask(card.id for card in CARD_CATALOG.values() if isinstance(card, ActionCard) and card.name == "House")
+HOTEL_MASK = card_mask(card.id for card in CARD_CATALOG.values() if isinstance(card, ActionCard) and card.name == "Hotel")
+VALUE_MASKS = {}  # value -> mask of the cards worth that much (multicolor wilds have no value)
+for _card in CARD_CATALOG.values():
+    if _card.value:
+        VALUE_MASKS[_card.value] = VALUE_MASKS.get(_card.value, 0) | (1 << _card.id)
+VALUE_MASKS = tuple(VALUE_MASKS.items())
+del _card
+
+FORMAT_VERSION = 2
+_HEADER = struct.Struct('<BI')  # Format version, length of the JSON fields that follow
+_RNG_STATE = struct.Struct('<625I')  # random.Random keeps 624 words plus an index
+
+# Zone codes
+DECK = 1
+DISCARD = 2
+HAND = 0
+BANK = 1
+PROPERTIES = 2
+ZONES_PER_SEAT = PROPERTIES + len(COLORS)
+
+def zone_code(seat, kind, color=None):
+    """Code of a seat's hand (HAND), bank (BANK) or color set (PROPERTIES with a color)."""
+    code = DISCARD + 1 + seat * ZONES_PER_SEAT + kind
+    return code + COLOR_INDEX[color] if kind == PROPERTIES else code
+
+class BitboardState:
+    __slots__ = ('player_ids', 'player_names', 'location', 'position', 'wild_color', 'masks', 'property_colors',
+                 'turn_index', 'actions', 'actions_remaining', 'winner', 'pending_action', 'rng_state', 'verbose',
+                 'state_version')
+
+    def __init__(self, player_ids, player_names):
+        self.player_ids = tuple(player_ids)
+        self.player_names = tuple(player_names)
+        self.location = bytearray(CARD_SLOTS)
+        self.position = bytearray(CARD_SLOTS)
+        self.wild_color = bytearray(CARD_SLOTS)
+        self.masks = [0] * (DISCARD + 1 + len(self.player_ids) * ZONES_PER_SEAT)
+        self.property_colors = ((),) * len(self.player_ids)  # Per seat: color indices in the order the sets were started
+        self.turn_index = 0
+        self.actions = 0
+        self.actions_remaining = 3
+        self.winner = None  # Seat index
+        self.pending_action = None
+        self.rng_state = None
+        self.verbose = False
+        self.state_version = 0
+
+    ########## CONVERSION ##########
+
+    @classmethod
+    def from_game(cls, game):
+        state = cls([player.id for player in game.players], [player.name for player in game.players])
+        state._add_zone(DECK, game.deck.card_ids)
+        state._add_zone(DISCARD, [card.id for card in game.discard_pile])
+        for seat, player in enumerate(game.players):
+            state._add_zone(zone_code(seat, HAND), state._catalog_ids(player.hand))
+            state._add_zone(zone_code(seat, BANK), state._catalog_ids(player.bank))
+            for color, cards in player.properties.items():
+                state._add_zone(zone_code(seat, PROPERTIES, color), state._catalog_ids(cards))
+            state.property_colors = state.property_colors[:seat] + (tuple(COLOR_INDEX[color] for color in player.properties),) + state.property_colors[seat + 1:]
+        for card_id in WILD_CARD_IDS:
+            # Wilds still in the deck may not have a per-game copy yet; those keep the catalog color
+            card = game.deck.wild_cards.get(card_id) or game.card_index.locations.get(card_id, (None,))[0] or CARD_CATALOG[card_id]
+            state.wild_color[card_id] = COLOR_INDEX[card.current_color]
+        state.turn_index = game.turn_index
+        state.actions = game.actions
+        state.actions_remaining = game.actions_remaining
+        state.winner = game.players.index(game.winner) if game.winner else None
+        state.pending_action = game.pending_action.clone() if game.pending_action else None
+        state.rng_state = game.rng.getstate()
+        state.verbose = game.verbose
+        state.state_version = game.state_version
+        return state
+
+    def to_game(self):
+        """Build an independent Game object equal to the one this state was taken from."""
+        from backend.game_core.game import Game
+        wild_cards = {}
+        for card_id in WILD_CARD_IDS:
+            card = wild_cards[card_id] = copy.copy(CARD_CATALOG[card_id])
+            card.current_color = COLORS[self.wild_color[card_id]]
+        cards = lambda code: [wild_cards.get(card_id) or CARD_CATALOG[card_id] for card_id in self.cards_in(code)]
+
+        game = Game.__new__(Game)
+        game.rng = random.Random()
+        if self.rng_state is not None:
+            game.rng.setstate(self.rng_state)
+        game.verbose = self.verbose
+        game.card_index = CardIndex()
+        game.deck = Deck(self.cards_in(DECK), wild_cards)
+        game.discard_pile = cards(DISCARD)
+        game.players = []
+        for seat, (player_id, name) in enumerate(zip(self.player_ids, self.player_names)):
+            player = Player(player_id, name)
+            player.hand = cards(zone_code(seat, HAND))
+            player.bank = cards(zone_code(seat, BANK))
+            player.properties = {COLORS[i]: cards(zone_code(seat, PROPERTIES, COLORS[i])) for i in self.property_colors[seat]}
+            game.players.append(player)
+        game.players_by_id = {str(player.id): player for player in game.players}
+        game.turn_index = self.turn_index
+        game.winner = game.players[self.winner] if self.winner is not None else None
+        game.actions = self.actions
+        game.actions_remaining = self.actions_remaining
+        game.pending_action = self.pending_action.clone() if self.pending_action else None
+        game.state_version = self.state_version
+        game.move_log = None
+        game._index_cards()
+        return game
+
+    def _catalog_ids(self, cards):
+        card_ids = [card.id for card in cards]
+        for card, card_id in zip(cards, card_ids):
+            catalog_card = CARD_CATALOG.get(card_id)
+            if catalog_card is None or (card is not catalog_card and card_id not in WILD_CARD_IDS):
+                raise ValueError(f"{card} (id {card_id}) is not a catalog card and cannot be stored in a BitboardState")
+        return card_ids
+
+    def _add_zone(self, code, card_ids):
+        for index, card_id in enumerate(card_ids):
+            self.location[card_id] = code
+            self.position[card_id] = index
+            self.masks[code] |= 1 << card_id
+
+    ########## SERIALIZATION ##########
+
+    def to_bytes(self, rng=True):
+        """
+        Compact binary form: a small JSON header for the per-game fields, then the card arrays and the RNG state.
+        With rng=False the RNG state is left out (about 2.5KB less) and comes back as None.
+        """
+        fields = json.dumps([
+            self.player_ids, self.player_names, self.property_colors, self.turn_index, self.actions,
+            self.actions_remaining, self.winner, self.verbose,
+            self.pending_action.to_dict() if self.pending_action else None, self.state_version,
+        ], separators=(',', ':')).encode()
+        data = [_HEADER.pack(FORMAT_VERSION, len(fields)), fields, self.location, self.position, self.wild_color]
+        if rng:
+            rng_version, words, gauss_next = self.rng_state
+            data += [_RNG_STATE.pack(*words), json.dumps([rng_version, gauss_next]).encode()]
+        return b''.join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, length = _HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported state format {version}")
+        offset = _HEADER.size
+        (player_ids, player_names, property_colors, turn_index, actions, actions_remaining, winner, verbose,
+         pending, state_version) = json.loads(data[offset:offset + length])
+        offset += length
+        state = cls(player_ids, player_names)
+        for name in ('location', 'position', 'wild_color'):
+            setattr(state, name, bytearray(data[offset:offset + CARD_SLOTS]))
+            offset += CARD_SLOTS
+        for card_id in CARD_CATALOG:
+            if state.location[card_id]:
+                state.masks[state.location[card_id]] |= 1 << card_id
+        if offset < len(data):
+            words = _RNG_STATE.unpack_from(data, offset)
+            rng_version, gauss_next = json.loads(data[offset + _RNG_STATE.size:])
+            state.rng_state = (rng_version, words, gauss_next)
+        state.property_colors = tuple(tuple(colors) for colors in property_colors)
+        state.turn_index = turn_index
+        state.actions = actions
+        state.actions_remaining = actions_remaining
+        state.winner = winner
+        state.verbose = verbose
+        state.state_version = state_version
+        # Pending actions only hold action and rent cards, which are never per-game copies
+        state.pending_action = PendingAction.from_dict(pending, CARD_CATALOG[pending['card']]) if pending else None
+        return state
+
+    ########## CLONING AND HASHING ##########
+
+    def clone(self):
+        state = BitboardState.__new__(BitboardState)
+        state.player_ids = self.player_ids
+        state.player_names = self.player_names
+        state.location = self.location[:]
+        state.position = self.position[:]
+        state.wild_color = self.wild_color[:]
+        state.masks = self.masks[:]
+        state.property_colors = self.property_colors
+        state.turn_index = self.turn_index
+        state.actions = self.actions
+        state.actions_remaining = self.actions_remaining
+        state.winner = self.winner
+        state.pending_action = self.pending_action.clone() if self.pending_action else None
+        state.rng_state = self.rng_state
+        state.verbose = self.verbose
+        state.state_version = self.state_version
+        return state
+
+    def key(self):
+        """Hashable summary of the card layout and turn; pending actions and the RNG are not included."""
+        return (bytes(self.location), bytes(self.position), bytes(self.wild_color), self.property_colors,
+                self.turn_index, self.actions_remaining, self.winner)
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        return isinstance(other, BitboardState) and self.key() == other.key()
+
+    ########## QUERIES ##########
+
+    def cards_in(self, code):
+        """Card ids in a zone, in zone order."""
+        position = self.position
+        return sorted(iter_bits(self.masks[code]), key=position.__getitem__)
+
+    def num_property_cards(self, seat, color):
+        return (self.masks[zone_code(seat, PROPERTIES, color)] & PROPERTY_MASK).bit_count()
+
+    def num_complete_sets(self, seat):
+        base = zone_code(seat, PROPERTIES, COLORS[0])
+        return sum((self.masks[base + i] & PROPERTY_MASK).bit_count() // needed for i, needed in enumerate(NUM_PROPERTIES_NEEDED))
+
+    def has_won(self, seat):
+        return self.num_complete_sets(seat) >= 3
+
+    def rent(self, seat, color):
+        """Rent owed for a seat's `color` set, including any House (+3M) and Hotel (+4M)."""
+        i = COLOR_INDEX[color]
+        mask = self.masks[zone_code(seat, PROPERTIES, color)]
+        rent_amount = RENT_TABLE[i][min((mask & PROPERTY_MASK).bit_count(), NUM_PROPERTIES_NEEDED[i])]
+        if mask & HOUSE_MASK:
+            rent_amount += 3
+        if mask & HOTEL_MASK:
+            rent_amount += 4
+        return rent_amount
+
+    def bank_value(self, seat):
+        mask = self.masks[zone_code(seat, BANK)]
+        return sum(value * (mask & value_mask).bit_count() for value, value_mask in VALUE_MASKS)
+
+    ########## MUTATIONS ##########
+
+    def move_card(self, card_id, code):
+        """Move a card to the end of zone `code` (like list.remove + list.append on the object model)."""
+        old_code = self.location[card_id]
+        if old_code:
+            self.masks[old_code] &= ~(1 << card_id)
+            old_position = self.position[card_id]
+            for other_id in iter_bits(self.masks[old_code]):
+                if self.position[other_id] > old_position:
+                    self.position[other_id] -= 1
+            self._update_property_colors(old_code)
+        self.position[card_id] = self.masks[code].bit_count()
+        self.location[card_id] = code
+        self.masks[code] |= 1 << card_id
+        self._update_property_colors(code)
+
+    def draw(self, seat, num=2):
+        """Move the top `num` deck cards into a seat's hand (Player.draw_cards)."""
+        hand = zone_code(seat, HAND)
+        for _ in range(num):
+            size = self.masks[DECK].bit_count()
+            if not size:
+                break
+            top = next(card_id for card_id in iter_bits(self.masks[DECK]) if self.position[card_id] == size - 1)
+            self.move_card(top, hand)
+
+    def _update_property_colors(self, code):
+        # Keep each seat's color order like the properties dict: a color appears when its set is started
+        # and disappears when the set is emptied
+        if code <= DISCARD:
+            return
+        seat, offset = divmod(code - DISCARD - 1, ZONES_PER_SEAT)
+        if offset < PROPERTIES:
+            return
+        color_index = offset - PROPERTIES
+        colors = self.property_colors[seat]
+        if self.masks[code] and color_index not in colors:
+            colors = colors + (color_index,)
+        elif not self.masks[code] and color_index in colors:
+            colors = tuple(i for i in colors if i != color_index)
+        else:
+            return
+        self.property_colors = self.property_colors[:seat] + (colors,) + self.property_colors[seat + 1:]
+
+def dumps_game(game):
+    """Store a Game dealt from the catalog as bytes (see BitboardState.to_bytes)."""
+    return BitboardState.from_game(game).to_bytes()
+
+def loads_game(data):
+    return BitboardState.from_bytes(data).to_game()
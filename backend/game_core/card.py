@@ -1,4 +1,6 @@
 class Card:
+    __slots__ = ('name', 'card_type', 'value', 'id')
+
     def __init__(self, name, card_type, value, card_id=None):
         self.name = name
         self.card_type = card_type
@@ -9,6 +11,7 @@ class Card:
         return self.name
 
 class PropertyCard(Card):
+    __slots__ = ('colors', 'current_color', 'is_wild')
     
     propertyMap = {
         "brown": {'rent': [1, 2], 'is_utility': False, 'is_railroad': False},
@@ -29,9 +32,32 @@ class PropertyCard(Card):
         self.current_color = self.colors[0]
         self.colors = color if isinstance(color, list) else color
         self.is_wild = is_wild
-        self.rent = self.propertyMap[self.current_color.lower()]['rent']
-        self.is_utility = self.propertyMap[self.current_color.lower()]['is_utility']
-        self.is_railroad = self.propertyMap[self.current_color.lower()]['is_railroad']
+
+    @property
+    def color_info(self):
+        # Static rent data comes from the card's printed (first) color and is shared by every card of that color
+        color = self.colors[0] if isinstance(self.colors, list) else self.colors
+        return self.propertyMap[color.lower()]
+
+    @property
+    def rent(self):
+        return self.color_info['rent']
+
+    @property
+    def is_utility(self):
+        return self.color_info['is_utility']
+
+    @property
+    def is_railroad(self):
+        return self.color_info['is_railroad']
+
+    def __copy__(self):
+        # Games copy wild cards whenever they are dealt or cloned, so skip the generic slots copy
+        card = PropertyCard.__new__(PropertyCard)
+        card.name, card.card_type, card.value, card.id = self.name, self.card_type, self.value, self.id
+        card.colors, card.current_color, card.is_wild = self.colors, self.current_color, self.is_wild
+        return card
+
     def assign_color(self, color):
         if self.is_wild and color in self.colors:
             self.current_color = color
@@ -52,6 +78,7 @@ class PropertyCard(Card):
         }
 
 class ActionCard(Card):
+    __slots__ = ()
     
     actionMap = {
         "deal breaker": {'value': 5, 'description': "Steal a complete property set from any player"},
@@ -72,7 +99,10 @@ class ActionCard(Card):
         self.card_type = "Action"
         self.value = self.actionMap[name.lower()]['value']
         self.id = card_id
-        self.description = self.actionMap[name.lower()]['description']
+
+    @property
+    def description(self):
+        return self.actionMap[self.name.lower()]['description']
     
     def to_dict(self):
         return {
@@ -84,6 +114,7 @@ class ActionCard(Card):
         }
 
 class RentCard(Card):
+    __slots__ = ('colors', 'is_wild')
     
     rentMap = {
         "multicolor rent": {'value': 3, 'description': "Collect rent from ONE player for any property"},
@@ -96,9 +127,12 @@ class RentCard(Card):
         self.name = "Rent"
         if is_wild: self.name = "Multicolor Rent"
         self.value = self.rentMap[self.name.lower()]['value']
-        self.description = self.rentMap[self.name.lower()]['description']
         self.colors = color if isinstance(color, list) else [color]
         self.is_wild = is_wild
+
+    @property
+    def description(self):
+        return self.rentMap[self.name.lower()]['description']
     
     def to_dict(self):
         return {
@@ -111,6 +145,8 @@ class RentCard(Card):
         }
 
 class MoneyCard(Card):
+    __slots__ = ()
+
     def __init__(self, value, card_id=None):
         super().__init__(f"${value} Million", "Money", value, card_id)
     def to_dict(self):
@@ -0,0 +1,239 @@
+from backend.game_core.card import PropertyCard
+
+class CardIndex:
+    """
+    card id -> (card, zone key) for every card in a game, so a card is found without scanning hands, banks and sets.
+    Zones (CardZone lists and the Deck) keep it current: every card they gain or lose is placed or lifted here.
+    Locations hold zone keys rather than zones, so a cloned game can copy them wholesale (see clone()).
+    A clone shares the players' zones with the game it was cloned from until either side touches one (see
+    CardZone.freeze); lookup() hands out this game's own copy of a shared zone, made by the player holding it.
+    While `journal` is a list, every card a zone gains or loses is recorded in it, in order (see Game.changes).
+    """
+
+    def __init__(self):
+        self.locations = {}
+        self.zones = {}  # zone key -> zone
+        self.wild_cards = {}  # card id -> wild property card in play; the only cards a clone has to copy
+        self.holders = {}  # owner id -> Player, who copies their zones this game shares with a clone
+        # (card, zone key left, zone key entered, index entered at) per card moved since Game.track_changes(),
+        # with None for the side that does not apply; None when not tracking
+        self.journal = None
+
+    def __reduce__(self):
+        # A copied or unpickled game registers its zones again (see Game.__setstate__)
+        return (CardIndex, ())
+
+    def clone(self, copies):
+        """Copy of the index for a cloned game; `copies` maps each wild card to its copy in the clone."""
+        card_index = CardIndex.__new__(CardIndex)
+        card_index.locations = self.locations.copy()
+        card_index.zones = self.zones.copy()  # The players' zones are shared; the others are replaced as they are cloned
+        card_index.wild_cards = {}
+        card_index.holders = {}  # Filled in as the players are cloned
+        card_index.journal = None  # Clones are for search and previews; nobody is sent their changes
+        for card_id, card in self.wild_cards.items():
+            copied = card_index.wild_cards[card_id] = copies[card]
+            card_index.locations[card_id] = (copied, self.locations[card_id][1])
+        return card_index
+
+    def add_zone(self, zone):
+        self.zones[zone.key] = zone
+
+    def remove_zone(self, zone):
+        if self.zones.get(zone.key) is zone:
+            del self.zones[zone.key]
+
+    def place(self, card, zone):
+        if self.journal is not None:
+            self.journal.append((card, None, zone.key, zone.index(card)))
+        if card.id is not None:
+            self.locations[card.id] = (card, zone.key)
+            if card.__class__ is PropertyCard and card.is_wild:
+                self.wild_cards[card.id] = card
+
+    def place_ids(self, card_ids, zone):
+        # Cards still in the deck are only ids; the deck builds the card when it is asked for
+        self.locations.update(dict.fromkeys(card_ids, (None, zone.key)))
+
+    def lift(self, card, zone):
+        if self.journal is not None:
+            self.journal.append((card, zone.key, None, None))
+        location = self.locations.get(card.id)
+        if location is not None and location[1] == zone.key:
+            del self.locations[card.id]
+            self.wild_cards.pop(card.id, None)
+
+    def lookup(self, card_id):
+        """Returns (card, zone) for a card id, or (None, None) if no such card is in play."""
+        location = self.locations.get(card_id)
+        if location is None:
+            return None, None
+        card, key = location
+        zone = self.zones[key]
+        if zone.frozen:
+            zone = self.holders[zone.owner_id].own_zone(zone)
+        if card is None:
+            card = zone.card_for(card_id)
+        return card, zone
+
+    def locate(self, card_id):
+        """Returns (zone, owner_id, color, index) for a card id, or None if no such card is in play."""
+        card, zone = self.lookup(card_id)
+        if zone is None:
+            return None
+        return zone.zone, zone.owner_id, zone.color, zone.index(card)
+
+    def __contains__(self, card_id):
+        return card_id in self.locations
+
+    def __len__(self):
+        return len(self.locations)
+
+def zone_key(zone):
+    return (zone.owner_id, zone.color or zone.zone)
+
+class CardZone(list):
+    """
+    A list of cards in one place (a player's hand or bank, the discard pile) that reports every card
+    added or removed to the game's CardIndex. Without an index it is just a list.
+    """
+
+    frozen = False  # Shared by a game and its clones, none of which may change it (see freeze)
+
+    def __init__(self, zone, owner_id=None, cards=(), color=None):
+        super().__init__()
+        self.zone = zone
+        self.owner_id = owner_id
+        self.color = color
+        self.card_index = None
+        self.extend(cards)
+
+    def __reduce__(self):
+        return (CardZone, (self.zone, self.owner_id, list(self), self.color))
+
+    def clone(self, card_index=None, copies=None):
+        """
+        Copy the zone for a cloned game. `card_index` is the clone's index, already holding the card
+        locations; `copies` maps each wild card to its copy in the clone. Other cards are shared.
+        """
+        cls = self.__class__
+        zone = cls.__new__(cls)  # Skip __init__: nothing needs recounting
+        zone.__dict__ = state = self.__dict__.copy()
+        state['card_index'] = card_index
+        list.extend(zone, map(copies.get, self, self) if copies else self)
+        if card_index is not None:
+            card_index.zones[state['key']] = zone
+        return zone
+
+    def freeze(self):
+        """
+        Share the zone between its game and a clone. From now on it is never changed: each game that touches
+        it first takes its own copy (see thaw), so a clone only pays for the zones it uses.
+        """
+        self.frozen = True
+
+    def thaw(self, card_index=None):
+        """
+        A changeable copy of a frozen zone for the game owning `card_index`. Wild cards are swapped for that
+        game's own copies, which its index holds (see CardIndex.clone); other cards are shared.
+        """
+        cls = self.__class__
+        zone = cls.__new__(cls)
+        zone.__dict__ = state = self.__dict__.copy()
+        state['frozen'] = False
+        state['card_index'] = card_index
+        if card_index is None:
+            list.extend(zone, self)
+        else:
+            locations = card_index.locations
+            list.extend(zone, [locations.get(card.id, (card,))[0] if card.__class__ is PropertyCard and card.is_wild else card for card in self])
+            card_index.zones[state['key']] = zone
+        return zone
+
+    def _raise_frozen(self):
+        raise RuntimeError(f"This {self.zone} zone is shared with a cloned game; fetch it again from its player")
+
+    def attach(self, card_index):
+        self.card_index = card_index
+        self.key = zone_key(self)
+        card_index.add_zone(self)
+        for card in self:
+            card_index.place(card, self)
+
+    def detach(self):
+        if self.card_index is not None:
+            for card in self:
+                self.card_index.lift(card, self)
+            self.card_index.remove_zone(self)
+        self.card_index = None
+
+    def _added(self, cards):
+        if self.card_index is not None:
+            for card in cards:
+                self.card_index.place(card, self)
+
+    def _removed(self, cards):
+        if self.card_index is not None:
+            for card in cards:
+                self.card_index.lift(card, self)
+
+    def append(self, card):
+        if self.frozen:
+            self._raise_frozen()
+        super().append(card)
+        self._added((card,))
+
+    def extend(self, cards):
+        if self.frozen:
+            self._raise_frozen()
+        cards = list(cards)
+        super().extend(cards)
+        self._added(cards)
+
+    def insert(self, index, card):
+        if self.frozen:
+            self._raise_frozen()
+        super().insert(index, card)
+        self._added((card,))
+
+    def remove(self, card):
+        if self.frozen:
+            self._raise_frozen()
+        super().remove(card)
+        self._removed((card,))
+
+    def pop(self, index=-1):
+        if self.frozen:
+            self._raise_frozen()
+        card = super().pop(index)
+        self._removed((card,))
+        return card
+
+    def clear(self):
+        if self.frozen:
+            self._raise_frozen()
+        cards = list(self)
+        super().clear()
+        self._removed(cards)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def _replace(self, update, *args):
+        if self.frozen:
+            self._raise_frozen()
+        cards = list(self)
+        update(*args)
+        self._removed(cards)
+        self._added(self)
+
+    def __imul__(self, times):
+        self._replace(super().__imul__, times)
+        return self
+
+    def __setitem__(self, index, value):
+        self._replace(super().__setitem__, index, value)
+
+    def __delitem__(self, index):
+        self._replace(super().__delitem__, index)
@@ -1,7 +1,10 @@
 from backend.game_core.card import PropertyCard, ActionCard, RentCard, MoneyCard
+from types import MappingProxyType
+import copy
 import random
 
-def create_deck():
+def build_catalog():
+    """Construct one instance of every card in the game (108 cards, ids 2-109)."""
     deck = []
     card_id = 1  # Start ID counter
     
@@ -106,7 +109,73 @@ def create_deck():
     deck.extend(actions)
     deck.extend(money)
     
-    # Shuffle the deck
-    random.shuffle(deck)
-    
     return deck
+
+# Built once at import and shared by every game. Only wild cards carry per-game state (their current
+# color), so games get their own copy of those; every other card instance is shared and never mutated.
+CARD_CATALOG = MappingProxyType({card.id: card for card in build_catalog()})
+CARD_IDS = tuple(CARD_CATALOG)
+WILD_CARD_IDS = frozenset(card_id for card_id, card in CARD_CATALOG.items() if isinstance(card, PropertyCard) and card.is_wild)
+
+class Deck:
+    """
+    A game's draw pile: a shuffled list of card ids into CARD_CATALOG. Drawing returns the shared catalog
+    card, except for wild cards which come from this game's overlay of private copies (made on first draw).
+    """
+
+    zone = 'deck'
+    owner_id = None
+    color = None
+    key = (None, 'deck')
+    frozen = False  # Each clone gets its own deck (see CardZone.freeze)
+
+    def __init__(self, card_ids, wild_cards=None):
+        self.card_ids = card_ids
+        self.wild_cards = wild_cards if wild_cards is not None else {}
+        self.card_index = None
+
+    def clone(self, card_index=None, copies=None):
+        """Copy for a cloned game (see CardZone.clone)."""
+        copies = copies or {}
+        deck = Deck(self.card_ids[:], {card_id: copies.get(card, card) for card_id, card in self.wild_cards.items()})
+        deck.card_index = card_index
+        if card_index is not None:
+            card_index.add_zone(deck)
+        return deck
+
+    def attach(self, card_index):
+        self.card_index = card_index
+        card_index.add_zone(self)
+        card_index.place_ids(self.card_ids, self)
+
+    def index(self, card):
+        return self.card_ids.index(card.id)
+
+    def card_for(self, card_id):
+        if card_id in WILD_CARD_IDS:
+            card = self.wild_cards.get(card_id)
+            if card is None:
+                card = self.wild_cards[card_id] = copy.copy(CARD_CATALOG[card_id])
+            return card
+        return CARD_CATALOG[card_id]
+
+    def pop(self):
+        card = self.card_for(self.card_ids.pop())
+        if self.card_index is not None:
+            self.card_index.lift(card, self)
+        return card
+
+    def __len__(self):
+        return len(self.card_ids)
+
+    def __bool__(self):
+        return bool(self.card_ids)
+
+    def __iter__(self):
+        return (self.card_for(card_id) for card_id in self.card_ids)
+
+def create_deck(rng=None):
+    """A new shuffled deck: a single permutation of the catalog's card ids."""
+    card_ids = list(CARD_IDS)
+    (rng or random).shuffle(card_ids)
+    return Deck(card_ids)
@@ -1,36 +1,780 @@
 from backend.game_core.deck import create_deck
 from backend.game_core.player import Player
+from backend.game_core.card import PropertyCard, ActionCard, RentCard
+from backend.game_core.properties import num_properties_needed_for_full_set
+from backend.game_core.actions import common_functions
+from backend.game_core.actions.house import House
+from backend.game_core.actions.hotel import Hotel
+from backend.game_core import moves
+from backend.game_core.moves import MoveResult, PendingAction
+from backend.game_core.card_index import CardIndex, CardZone
 from colorama import init, Fore
+import random
 init()  # Initialize colorama to enable cross-platform color support
 
+class InvalidMove(Exception):
+    """Raised by the move handlers to reject a move; apply_move() turns it into a failed MoveResult."""
+
+def _minimal_covers(cards, amount, start=0, chosen=()):
+    """Yield the subsets of `cards` (in order) worth at least `amount` from which no card can be dropped."""
+    if amount <= 0:
+        # `-amount` is the overpayment; the cover is minimal if every card is worth more than that
+        if all(card.value > -amount for card in chosen):
+            yield list(chosen)
+        return
+    for i in range(start, len(cards)):
+        yield from _minimal_covers(cards, amount - cards[i].value, i + 1, chosen + (cards[i],))
+
+def zone_path(key):
+    """A zone key as clients know it: ['deck'], ['discard'], ['hand', id], ['bank', id] or ['properties', id, color]."""
+    owner_id, zone = key
+    if owner_id is None:
+        return [zone]
+    if zone in ('hand', 'bank'):
+        return [zone, owner_id]
+    return ['properties', owner_id, zone]
+
+def view_for(state, viewer_id):
+    """
+    Project a full Game.to_dict() (or Game.changes()) onto one player's view, as Game.to_dict(viewer_id)
+    would build it, so a state serialized once can be handed out per player.
+    """
+    hidden = lambda path: path[0] == 'deck' or (path[0] == 'hand' and str(path[1]) != str(viewer_id))
+    view = dict(state)
+    if 'players' in state:
+        players = []
+        for player in state['players']:
+            if 'hand' in player and str(player['id']) != str(viewer_id):
+                hand_count = len(player['hand'])
+                player = {key: value for key, value in player.items() if key != 'hand'}
+                player['hand_count'] = hand_count
+            players.append(player)
+        view['players'] = players
+    if 'ops' in state:
+        ops = []
+        for op in state['ops']:
+            if 'to' in op and hidden(op['to']):
+                # Only that a card went there, and which card if it left a zone the viewer sees
+                projected = {key: op[key] for key in ('from', 'to') if key in op}
+                if 'from' in op and not hidden(op['from']):
+                    projected['id'] = op['id']
+                op = projected
+            elif 'to' not in op and hidden(op['from']):
+                op = {'from': op['from']}
+            ops.append(op)
+        view['ops'] = ops
+    return view
+
 class Game:
-    def __init__(self, player_names):
-        self.deck = create_deck()
+    def __init__(self, player_names, seed=None, verbose=True):
+        self.rng = random.Random(seed)  # Seeded games (e.g. simulations) are fully reproducible
+        self.verbose = verbose
+        self.card_index = CardIndex()  # card id -> (card, zone), kept current by the zones holding the cards
+        self.deck = create_deck(self.rng)
         self.discard_pile = []
         self.players = [Player(user['id'], user['name']) for user in player_names]
+        self.players_by_id = {str(player.id): player for player in self.players}
+        self._index_cards()
         self.turn_index = 0
         self.winner = None
         self.actions = 0
         self.actions_remaining = 3
+        self.pending_action = None  # PendingAction waiting on Just Say No / payment responses
+        self.state_version = 0  # Number of state updates sent to the players so far (kept by the game consumer)
+        self.move_log = None  # Moves applied since a list was set here, for the event log (see game_core/replay.py)
         self.start_game()
         
-    def to_dict(self):
+    def to_dict(self, viewer_id=None):
+        """
+        The game as `viewer_id` sees it: their own hand in full, everyone else's as a card count.
+        Without a viewer every hand is included (server-side use only).
+        """
         return {
-            "deck_count": len(self.deck),
             # "discard_pile_count": len(self.discard_pile),
-            "players": [player.to_dict() for player in self.players],
+            "players": [player.to_dict(show_hand=viewer_id is None or str(player.id) == str(viewer_id)) for player in self.players],
             "discard_pile": [card.to_dict() for card in self.discard_pile] if self.discard_pile else None,
+            **self._fields()
+        }
+
+    def _fields(self):
+        return {
+            "deck_count": len(self.deck),
             "current_turn": self.players[self.turn_index].id,
             "winner": self.winner.name if self.winner else None,
             "actions_remaining": self.actions_remaining
         }
 
+    ########## CHANGE JOURNAL ##########
+
+    def track_changes(self):
+        """Start recording what changes from here on (see changes()); called again after each update sent."""
+        self.card_index.journal = []
+        self._tracked_fields = self._fields()
+
+    def changes(self):
+        """
+        What changed since track_changes(): the to_dict() fields that differ, plus under "ops" one entry per
+        card moved, in order ({} if nothing changed). An op is {"id", "from", "to", "index", "card"}, where
+        "from" and "to" are zone paths (see zone_path), "index" the card's position in "to" and "card" its
+        to_dict(); a card only leaving has no "to" (nor index or card), a card only arriving no "from".
+        Applying the ops in order to the previous to_dict() gives the current one (neither lists empty
+        property sets). Returns None when changes are not being tracked.
+        """
+        journal = self.card_index.journal
+        if journal is None:
+            return None
+        diff = {key: value for key, value in self._fields().items() if self._tracked_fields.get(key) != value}
+        ops = []
+        i = 0
+        while i < len(journal):
+            card, source, target, index = journal[i]
+            i += 1
+            if target is None and i < len(journal) and journal[i][0] is card and journal[i][1] is None:
+                # Lifted from one zone and placed straight in another: a move
+                target, index = journal[i][2:]
+                i += 1
+            op = {"id": card.id}
+            if source is not None:
+                op["from"] = zone_path(source)
+            if target is not None:
+                # The card as it is now: a rollback (restore()) may have replaced a wild card with a copy
+                card = self.find_card(card.id)[0] or card
+                op.update({"to": zone_path(target), "index": index, "card": card.to_dict()})
+            ops.append(op)
+        if ops:
+            diff["ops"] = ops
+        return diff
+
     def start_game(self):
         # Distribute 5 cards to each player
-        print("Dealing 5 cards to each player...", end=" ")
+        if self.verbose:
+            print("Dealing 5 cards to each player...", end=" ")
         for player in self.players:
             player.draw_cards(self.deck, 5)
-        print("Done\n")
+        if self.verbose:
+            print("Done\n")
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = random.Random()
+            self._rng.setstate(self._rng_state)
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng):
+        self._rng = rng
+        self._rng_state = None
+
+    def __setstate__(self, state):
+        # Copies and unpickled games get an empty CardIndex (see CardIndex.__reduce__); refill it
+        self.__dict__.update(state)
+        self._index_cards()
+
+    def clone(self):
+        """
+        An independent copy of the game for search, what-if previews and rollback. Catalog cards are
+        shared; only the zones, wild cards (their color can change), players and pending action are copied.
+        The players' zones are copied lazily, by whichever game uses them first (see Player.clone).
+        """
+        game = Game.__new__(Game)
+        game.__dict__ = self.__dict__.copy()
+        # Both games rebuild their RNG from the same state the first time they use it
+        if self._rng is not None:
+            self._rng_state = self._rng.getstate()
+            self._rng = None
+        game._rng, game._rng_state = None, self._rng_state
+        copies = {card: card.__copy__() for card in self.card_index.wild_cards.values()}
+        copies.update((card, card.__copy__()) for card in self.deck.wild_cards.values() if card not in copies)
+        card_index = game.card_index = self.card_index.clone(copies)
+        game.deck = self.deck.clone(card_index, copies)
+        game._discard_pile = self.discard_pile.clone(card_index, copies)
+        game.players = [player.clone(card_index) for player in self.players]
+        game.players_by_id = {str(player.id): player for player in game.players}
+        if self.winner:
+            game.winner = game.players[self.players.index(self.winner)]
+        if self.pending_action:
+            game.pending_action = self.pending_action.clone()
+        game.move_log = None
+        return game
+
+    def snapshot(self):
+        """Capture the current state; restore() rolls the game back to it and can be called repeatedly."""
+        snapshot = self.clone()
+        journal = self.card_index.journal
+        snapshot.journal_length = len(journal) if journal is not None else 0
+        snapshot.move_log_length = len(self.move_log) if self.move_log is not None else 0
+        return snapshot
+
+    def restore(self, snapshot):
+        journal = self.card_index.journal
+        move_log = self.move_log
+        self.__dict__.update(snapshot.clone().__dict__)
+        del self.journal_length, self.move_log_length
+        if journal is not None:
+            # Cards moved before the snapshot are still to be reported; later moves are undone
+            del journal[snapshot.journal_length:]
+        self.card_index.journal = journal
+        if move_log is not None:
+            del move_log[snapshot.move_log_length:]
+        self.move_log = move_log
+
+    def _index_cards(self):
+        self.deck.attach(self.card_index)
+        self.discard_pile.attach(self.card_index)
+        for player in self.players:
+            player.attach(self.card_index)
+
+    @property
+    def discard_pile(self):
+        return self._discard_pile
+
+    @discard_pile.setter
+    def discard_pile(self, cards):
+        if hasattr(self, '_discard_pile'):
+            self._discard_pile.detach()
+        self._discard_pile = CardZone('discard', None, cards)
+        self._discard_pile.attach(self.card_index)
+
+    def discard_card(self, card):
+        self.discard_pile.append(card)
+
+    def get_player(self, player_id):
+        return self.players_by_id.get(str(player_id))
+
+    def find_card(self, card_id):
+        """Returns (card, zone) for a card id in play, or (None, None). See CardIndex.lookup."""
+        return self.card_index.lookup(card_id)
+
+    def locate_card(self, card_id):
+        """Returns (zone, owner_id, color, index) for a card id in play, or None. See CardIndex.locate."""
+        return self.card_index.locate(card_id)
+
+    @property
+    def current_player(self):
+        return self.players[self.turn_index]
+
+    @property
+    def acting_player(self):
+        """The player expected to move next: the responder of a pending action, otherwise the current player."""
+        pending = self.pending_action
+        return self.get_player(pending.responder_id) if pending else self.current_player
+
+    ########## HEADLESS MOVE API ##########
+
+    def apply_move(self, move):
+        """
+        Validate and apply a single Move (see game_core/moves.py) without any input()/print().
+        Invalid moves leave the state untouched and come back as a failed MoveResult.
+        """
+        handler = self._move_handlers.get(type(move))
+        if handler is None:
+            return MoveResult(False, error=f"Unknown move type {type(move).__name__}")
+        events = []
+        try:
+            player = self._check_move_allowed(move)
+            handler(self, player, move, events)
+        except InvalidMove as e:
+            return MoveResult(False, error=str(e))
+        self._check_winner()
+        if self.move_log is not None:
+            self.move_log.append(move)
+        return MoveResult(True, events)
+
+    def apply_legal_move(self, move):
+        """
+        Apply a move just generated by legal_moves() or card_moves() for this position, skipping apply_move's
+        turn checks and MoveResult. For search playouts, which apply millions of moves that are legal by
+        construction; a move that is not leaves the game inconsistent, so anything else uses apply_move.
+        """
+        self._move_handlers[type(move)](self, self.get_player(move.player_id), move, [])
+        self._check_winner()
+        if self.move_log is not None:
+            self.move_log.append(move)
+
+    def payment_request(self, event_type='rent_pre_request'):
+        """Describe the pending payment for the player currently owing, shaped like the rent broadcasts."""
+        pending = self.pending_action
+        return {
+            'type': event_type,
+            'amount': pending.amount,
+            'rent_type': pending.rent_type,
+            'recipient_id': str(pending.initiator_id),
+            'target_player_id': str(pending.target_id),
+            'total_players': pending.total_targets,
+            'num_players_owing': len(pending.target_ids),
+            'card': pending.card.to_dict()
+        }
+
+    def _check_move_allowed(self, move):
+        if self.winner:
+            raise InvalidMove("The game is already over")
+        player = self.get_player(move.player_id)
+        if not player:
+            raise InvalidMove(f"Unknown player {move.player_id}")
+        if move.is_response:
+            if not self.pending_action:
+                raise InvalidMove("There is no pending action to respond to")
+            if str(self.pending_action.responder_id) != str(player.id):
+                raise InvalidMove(f"{player.name} is not the player expected to respond")
+        else:
+            if self.pending_action:
+                raise InvalidMove("Waiting for responses to the pending action")
+            if player is not self.current_player:
+                raise InvalidMove(f"It is not {player.name}'s turn")
+        return player
+
+    def _check_winner(self):
+        for player in self.players:
+            if player.has_won():
+                self.winner = player
+                return
+
+    def _end_action(self, count=1):
+        """Use up `count` actions of the current turn, passing the turn (and drawing) when they run out."""
+        for _ in range(count):
+            if self.actions_remaining == 1:
+                # Switch to next player's turn
+                self.turn_index = (self.turn_index + 1) % len(self.players)
+                self.actions_remaining = 3
+                next_player = self.players[self.turn_index]
+                if len(next_player.hand) == 0:
+                    next_player.draw_cards(self.deck, 5)
+                else:
+                    next_player.draw_cards(self.deck, 2)
+            else:
+                self.actions_remaining -= 1
+
+    def _card_from_hand(self, player, card_id, name=None, card_class=None):
+        card, zone = self.find_card(card_id)
+        if zone is not player.hand:
+            raise InvalidMove(f"Card {card_id} is not in {player.name}'s hand")
+        if name and card.name != name:
+            raise InvalidMove(f"Card {card_id} is not a {name} card")
+        if card_class and not isinstance(card, card_class):
+            raise InvalidMove(f"Card {card_id} cannot be played this way")
+        return card
+
+    def _opponent(self, player, target_id):
+        target = self.get_player(target_id)
+        if not target or target is player:
+            raise InvalidMove(f"Invalid target player {target_id}")
+        return target
+
+    def _find_stealable_property(self, player, card_id):
+        """Locate an opponent's property card that is not part of a complete set (Sly Deal / Forced Deal rules)."""
+        card, zone = self.find_card(card_id)
+        owner = self.get_player(zone.owner_id) if zone is not None and zone.zone == 'properties' else None
+        if owner is None or owner is player:
+            raise InvalidMove(f"Card {card_id} is not an opponent's property")
+        if not isinstance(card, PropertyCard):
+            raise InvalidMove("Only property cards can be taken")
+        if zone.num_property_cards % num_properties_needed_for_full_set[zone.color] == 0:
+            raise InvalidMove(f"The {zone.color} set is complete and cannot be broken up")
+        return owner
+
+    ##### Legal moves #####
+
+    def legal_moves(self, player):
+        """
+        Lazily yield every move `player` can make right now; each one is accepted by apply_move().
+        On their turn that is every turn move (EndTurn last). When they owe a response it is Just Say No,
+        AcceptAction where allowed, and for payments every minimal set of cards covering the amount
+        (all payable cards when the amount cannot be covered). Deal Breakers are yielded in the
+        take-the-set-and-buildings form rather than for every choice of cards from an oversized set.
+        """
+        if self.winner:
+            return
+        pending = self.pending_action
+        if pending:
+            if str(pending.responder_id) == str(player.id):
+                yield from self._legal_responses(player, pending)
+            return
+        if player is not self.current_player:
+            return
+
+        opponents = [p for p in self.players if p is not player]
+        double_the_rent_ids = [c.id for c in player.hand if c.name == "Double The Rent"] if self.actions_remaining >= 2 else []
+        for card in player.hand:
+            yield from self._card_moves(player, card, opponents, double_the_rent_ids)
+        yield moves.EndTurn(player.id)
+
+    def card_moves(self, player, card):
+        """
+        The moves legal_moves() yields for one card in `player`'s hand on their turn, without EndTurn:
+        a cheaper way to pick a random move one card at a time.
+        """
+        if self.winner or self.pending_action or player is not self.current_player:
+            return iter(())
+        opponents = [p for p in self.players if p is not player]
+        double_the_rent_ids = [c.id for c in player.hand if c.name == "Double The Rent"] if self.actions_remaining >= 2 else []
+        return self._card_moves(player, card, opponents, double_the_rent_ids)
+
+    def _card_moves(self, player, card, opponents, double_the_rent_ids):
+        player_id = player.id
+        card_id = card.id
+        if card.__class__ is PropertyCard:
+            for color in (card.colors if isinstance(card.colors, list) else [card.colors]):
+                yield moves.PlayProperty(player_id, card_id, color)
+            return
+        yield moves.BankCard(player_id, card_id)
+        name = card.name
+        if card.__class__ is RentCard:
+            targets = [opponent.id for opponent in opponents] if card.is_wild else [None]
+            for color in card.colors:
+                if not common_functions.count_property_cards(player, color):
+                    continue
+                for target_id in targets:
+                    yield moves.PlayRent(player_id, card_id, color, target_id)
+                    for double_the_rent_id in double_the_rent_ids:
+                        yield moves.PlayRent(player_id, card_id, color, target_id, double_the_rent_id)
+        elif name == "House" or name == "Hotel":
+            for color, cards in player.properties.items():
+                if color in self._no_building_colors or not cards.num_complete_sets:
+                    continue
+                if (cards.num_complete_sets > cards.houses) if name == "House" else (cards.houses > cards.hotels):
+                    yield moves.PlaceBuilding(player_id, card_id, color)
+        elif name == "Pass Go":
+            yield moves.PlayPassGo(player_id, card_id)
+        elif name == "It's Your Birthday":
+            yield moves.PlayBirthday(player_id, card_id)
+        elif name == "Debt Collector":
+            for opponent in opponents:
+                yield moves.PlayDebtCollector(player_id, card_id, opponent.id)
+        elif name == "Sly Deal":
+            for target_card_id in self._stealable_properties(opponents):
+                yield moves.PlaySlyDeal(player_id, card_id, target_card_id)
+        elif name == "Forced Deal":
+            own_property_ids = [c.id for cards in player.properties.values() for c in cards if c.__class__ is PropertyCard]
+            if own_property_ids:
+                for target_card_id in self._stealable_properties(opponents):
+                    for offered_card_id in own_property_ids:
+                        yield moves.PlayForcedDeal(player_id, card_id, target_card_id, offered_card_id)
+        elif name == "Deal Breaker":
+            for opponent in opponents:
+                for color, cards in opponent.properties.items():
+                    if cards.num_complete_sets:
+                        yield moves.PlayDealBreaker(player_id, card_id, color, target_id=opponent.id)
+
+    _no_building_colors = frozenset(("black", "mint"))  # Railroads and utilities take no houses or hotels
+
+    def _stealable_properties(self, opponents):
+        """Ids of opponents' property cards that are not protected by a complete set."""
+        for opponent in opponents:
+            for color, cards in opponent.properties.items():
+                if cards.num_property_cards % num_properties_needed_for_full_set[color] == 0:
+                    continue
+                for card in cards:
+                    if card.__class__ is PropertyCard:
+                        yield card.id
+
+    def _legal_responses(self, player, pending):
+        player_id = player.id
+        for card in player.hand:
+            if card.name == "Just Say No":
+                yield moves.JustSayNo(player_id, card.id)
+        if pending.blocked or pending.kind == PendingAction.STEAL:
+            yield moves.AcceptAction(player_id)
+            return
+        payable = [card for card in player.bank] + [card for cards in player.properties.values() for card in cards if card.value is not None]
+        if sum(card.value for card in payable) < pending.amount:
+            yield moves.PayRent(player_id, [card.id for card in payable])
+            return
+        for cards in _minimal_covers(payable, pending.amount):
+            yield moves.PayRent(player_id, [card.id for card in cards])
+
+    ##### Turn actions #####
+
+    def _bank_card(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id)
+        if isinstance(card, PropertyCard):
+            raise InvalidMove("Property cards cannot be banked")
+        player.hand.remove(card)
+        player.bank.append(card)
+        self._end_action()
+
+    def _play_property(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, card_class=PropertyCard)
+        colors = card.colors if isinstance(card.colors, list) else [card.colors]
+        color = move.color or card.current_color
+        if color not in colors:
+            raise InvalidMove(f"{card.name} cannot be played as {color}")
+        if card.is_wild:
+            card.assign_color(color)
+        player.hand.remove(card)
+        player.add_property(card, color)
+        self._end_action()
+
+    def _place_building(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, card_class=ActionCard)
+        if card.name == "House":
+            eligible_sets = House(player, self)._get_eligible_property_sets()
+        elif card.name == "Hotel":
+            eligible_sets = Hotel(player, self)._get_eligible_property_sets()
+        else:
+            raise InvalidMove(f"{card.name} is not a building")
+        if move.color not in eligible_sets:
+            raise InvalidMove(f"A {card.name} cannot be placed on the {move.color} set")
+        player.hand.remove(card)
+        player.properties[move.color].append(card)
+        self._end_action()
+
+    def _pass_go(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Pass Go")
+        player.hand.remove(card)
+        player.draw_cards(self.deck, 2)
+        self.discard_card(card)
+        self._end_action()
+
+    def _rent(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, card_class=RentCard)
+        double_the_rent_card = None
+        if move.double_the_rent_id is not None:
+            double_the_rent_card = self._card_from_hand(player, move.double_the_rent_id, name="Double The Rent")
+            if self.actions_remaining < 2:
+                raise InvalidMove("Double The Rent needs two actions")
+        if move.color is None:
+            raise InvalidMove("A rent color is required")
+        if move.color not in card.colors:
+            raise InvalidMove(f"{card.name} cannot charge rent for {move.color}")
+        if not common_functions.count_property_cards(player, move.color):
+            raise InvalidMove(f"{player.name} has no {move.color} properties")
+        amount = common_functions.calculate_rent(player, move.color) * (2 if double_the_rent_card else 1)
+        if move.amount is not None and move.amount != amount:
+            raise InvalidMove(f"Rent for {move.color} is {amount}M, not {move.amount}M")
+        if card.is_wild:
+            target_ids = [self._opponent(player, move.target_id).id]
+        else:
+            target_ids = [p.id for p in self.players if p is not player]
+
+        player.hand.remove(card)
+        self.discard_card(card)
+        if double_the_rent_card:
+            player.hand.remove(double_the_rent_card)
+            self.discard_card(double_the_rent_card)
+            rent_type = "double_the_rent"
+        else:
+            rent_type = "multicolor rent" if card.is_wild else "rent"
+        self._start_payment(player, double_the_rent_card or card, target_ids, amount, rent_type, events)
+        self._end_action(2 if double_the_rent_card else 1)
+
+    def _debt_collector(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Debt Collector")
+        target = self._opponent(player, move.target_id)
+        player.hand.remove(card)
+        self.discard_card(card)
+        self._start_payment(player, card, [target.id], 5, "debt collector", events)  # Debt Collector cards request 5M
+        self._end_action()
+
+    def _its_your_birthday(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="It's Your Birthday")
+        player.hand.remove(card)
+        self.discard_card(card)
+        target_ids = [p.id for p in self.players if p is not player]
+        self._start_payment(player, card, target_ids, 2, "it's your birthday", events)  # It's Your Birthday cards request 2M
+        self._end_action()
+
+    def _sly_deal(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Sly Deal")
+        target = self._find_stealable_property(player, move.target_card_id)
+        self._start_steal(player, card, target, move)
+
+    def _forced_deal(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Forced Deal")
+        target = self._find_stealable_property(player, move.target_card_id)
+        offered_card, zone = self.find_card(move.offered_card_id)
+        if zone is None or zone is not player.properties.get(zone.color) or not isinstance(offered_card, PropertyCard):
+            raise InvalidMove(f"Card {move.offered_card_id} is not one of {player.name}'s properties")
+        self._start_steal(player, card, target, move)
+
+    def _deal_breaker(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Deal Breaker")
+        needed = num_properties_needed_for_full_set.get(move.color)
+        if needed is None:
+            raise InvalidMove(f"Unknown color {move.color}")
+        card_ids = set(move.card_ids) if move.card_ids is not None else None
+        if move.target_id is not None:
+            target = self._opponent(player, move.target_id)
+        else:
+            # Find the opponent whose set holds the selected cards
+            _, zone = self.find_card(next(iter(card_ids))) if card_ids else (None, None)
+            target = self.get_player(zone.owner_id) if zone is not None and zone is not self.deck and zone.color == move.color else None
+            if not target or target is player:
+                raise InvalidMove("No opponent owns the selected set")
+        if common_functions.count_property_cards(target, move.color) < needed:
+            raise InvalidMove(f"{target.name} has no complete {move.color} set")
+        if card_ids is not None:
+            set_cards = target.properties[move.color]
+            if not card_ids <= {c.id for c in set_cards}:
+                raise InvalidMove(f"The selected cards are not all in {target.name}'s {move.color} set")
+            if sum(1 for c in set_cards if c.id in card_ids and isinstance(c, PropertyCard)) < needed:
+                raise InvalidMove("The selected cards do not form a complete set")
+        self._start_steal(player, card, target, move)
+
+    def _end_turn(self, player, move, events):
+        self.actions_remaining = 1  # This will trigger the turn switch below
+        self._end_action()
+
+    ##### Pending actions and responses #####
+
+    def _start_payment(self, player, card, target_ids, amount, rent_type, events):
+        if not target_ids:
+            return
+        self.pending_action = PendingAction(PendingAction.PAYMENT, player.id, card, target_ids, amount, rent_type)
+        events.append(self.payment_request())
+
+    def _start_steal(self, player, card, target, move):
+        player.hand.remove(card)
+        self.discard_card(card)
+        self.pending_action = PendingAction(PendingAction.STEAL, player.id, card, [target.id], move=move)
+        self._end_action()
+
+    def _advance_pending(self, events):
+        """The current target is done (paid, accepted or blocked); move on to the next one."""
+        pending = self.pending_action
+        pending.target_ids.pop(0)
+        pending.blocked = False
+        if not pending.target_ids:
+            self.pending_action = None
+        elif pending.kind == PendingAction.PAYMENT:
+            events.append(self.payment_request())
+
+    def _pay_rent(self, player, move, events):
+        pending = self.pending_action
+        if pending.kind != PendingAction.PAYMENT or pending.blocked:
+            raise InvalidMove("There is no payment to make")
+        if len(set(move.card_ids)) != len(move.card_ids):
+            raise InvalidMove("A card was selected more than once")
+        total = 0
+        for card_id in move.card_ids:
+            card, zone = self.find_card(card_id)
+            if zone is None or (zone is not player.bank and zone is not player.properties.get(zone.color)):
+                raise InvalidMove(f"Card {card_id} is not in {player.name}'s bank or properties")
+            if card.value is None:
+                raise InvalidMove(f"{card.name} has no monetary value")
+            total += card.value
+        num_payable = len(player.bank) + sum(1 for cards in player.properties.values() for card in cards if card.value is not None)
+        if total < pending.amount and len(move.card_ids) < num_payable:
+            raise InvalidMove(f"Payment of {total}M does not cover {pending.amount}M")
+
+        recipient = self.get_player(pending.initiator_id)
+        transferred_cards = []
+        for card_id in move.card_ids:
+            # Look the card up again: breaking a set may have moved a house/hotel into the bank
+            card, zone = self.find_card(card_id)
+            if zone is player.bank:
+                player.bank.remove(card)
+                recipient.bank.append(card)
+            else:
+                color = zone.color
+                player.remove_property(card, color)
+                if isinstance(card, PropertyCard):
+                    recipient.add_property(card, color)
+                else:
+                    recipient.bank.append(card)  # Houses and hotels are paid into the bank
+            transferred_cards.append(card.to_dict())
+        events.append({
+            'type': 'rent_paid',
+            'recipient_id': str(recipient.id),
+            'player_id': str(player.id),
+            'selected_cards': transferred_cards
+        })
+        self._advance_pending(events)
+
+    def _just_say_no(self, player, move, events):
+        card = self._card_from_hand(player, move.card_id, name="Just Say No")
+        player.hand.remove(card)
+        self.discard_card(card)
+        self.pending_action.blocked = not self.pending_action.blocked
+
+    def _accept_action(self, player, move, events):
+        pending = self.pending_action
+        if pending.blocked:
+            # The initiator accepts the Just Say No: nothing happens to this target
+            self._advance_pending(events)
+        elif pending.kind == PendingAction.STEAL:
+            self._resolve_steal(pending, events)
+            self._advance_pending(events)
+        else:
+            raise InvalidMove("A payment must be answered with a payment or a Just Say No")
+
+    def _resolve_steal(self, pending, events):
+        move = pending.move
+        player = self.get_player(pending.initiator_id)
+        target = self.get_player(pending.target_id)
+        if isinstance(move, moves.PlaySlyDeal):
+            stolen_property, zone = self.find_card(move.target_card_id)
+            color = zone.color
+            target.remove_property(stolen_property, color)
+            player.add_property(stolen_property, color)
+            events.append({
+                'type': 'property_stolen',
+                'player_id': str(player.id),
+                'target_id': str(target.id),
+                'player_name': player.name,
+                'target_name': target.name,
+                'property': stolen_property.to_dict()
+            })
+        elif isinstance(move, moves.PlayForcedDeal):
+            target_property, target_zone = self.find_card(move.target_card_id)
+            user_property, user_zone = self.find_card(move.offered_card_id)
+            target_color, user_color = target_zone.color, user_zone.color
+            target.remove_property(target_property, target_color)
+            player.remove_property(user_property, user_color)
+            player.add_property(target_property, target_color)
+            target.add_property(user_property, user_color)
+            events.append({
+                'type': 'property_swap',
+                'property1': target_property.to_dict(),
+                'property2': user_property.to_dict(),
+                'player1_id': player.id,
+                'player2_id': target.id,
+                'player1_name': player.name,
+                'player2_name': target.name
+            })
+        elif isinstance(move, moves.PlayDealBreaker):
+            color = move.color
+            set_cards = target.properties[color]
+            if move.card_ids is not None:
+                cards_to_transfer = [card for card in set_cards if card.id in move.card_ids]
+            elif common_functions.count_property_cards(target, color) == num_properties_needed_for_full_set[color]:
+                cards_to_transfer = list(set_cards)
+            else:
+                # One complete set plus its house and hotel
+                property_cards = [card for card in set_cards if isinstance(card, PropertyCard)]
+                cards_to_transfer = property_cards[:num_properties_needed_for_full_set[color]]
+                for building in ("House", "Hotel"):
+                    building_card = next((card for card in set_cards if isinstance(card, ActionCard) and card.name == building), None)
+                    if building_card:
+                        cards_to_transfer.append(building_card)
+            for card in cards_to_transfer:
+                set_cards.remove(card)
+                player.add_property(card, color)
+            target.settle_buildings(color)
+            events.append({
+                'type': 'deal_breaker_overlay',
+                'stealerId': player.id,
+                'targetId': target.id,
+                'color': color,
+                'property_set': [card.to_dict() for card in cards_to_transfer]
+            })
+
+    _move_handlers = {
+        moves.BankCard: _bank_card,
+        moves.PlayProperty: _play_property,
+        moves.PlaceBuilding: _place_building,
+        moves.PlayPassGo: _pass_go,
+        moves.PlayRent: _rent,
+        moves.PlayDebtCollector: _debt_collector,
+        moves.PlayBirthday: _its_your_birthday,
+        moves.PlaySlyDeal: _sly_deal,
+        moves.PlayForcedDeal: _forced_deal,
+        moves.PlayDealBreaker: _deal_breaker,
+        moves.EndTurn: _end_turn,
+        moves.PayRent: _pay_rent,
+        moves.JustSayNo: _just_say_no,
+        moves.AcceptAction: _accept_action,
+    }
         
     # def print_colored(self, player_number, text):
     #     if player_number == 0:
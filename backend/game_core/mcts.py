@@ -0,0 +1,189 @@
+"""
+Monte Carlo Tree Search bot.
+
+The bot only knows what its seat can see: its own hand, every bank and property set, the discard pile and
+how many cards each opponent holds. Each iteration deals the cards it cannot see (the deck and the
+opponents' hands) at random into a cloned game, walks one shared search tree over that deal (moves that
+are not possible in the sampled deal are skipped, so the tree keys on moves rather than states), plays a
+short random rollout and scores the result for every seat. Iterations run until the time budget (or
+iteration cap) is spent, and the most visited move at the root is played.
+
+    bot = MCTSPolicy(time_limit=0.5)
+    move = bot.choose_move(game, player, rng)
+
+Measure how many iterations a second the search runs on this machine with:
+
+    python -m backend.game_core.mcts
+"""
+import math
+import time
+
+from backend.game_core.deck import Deck, WILD_CARD_IDS
+from backend.game_core.moves import EndTurn
+from backend.game_core.properties import num_properties_needed_for_full_set
+from backend.game_core.simulation import Policy, RandomPolicy
+
+DEFAULT_TIME_LIMIT = 1.0  # Seconds of search per move
+DEFAULT_ROLLOUT_MOVES = 16  # Rollouts stop after this many moves and the position is scored instead
+EXPLORATION = 0.7
+
+class Node:
+    """One move in the search tree, scored from the point of view of the player who made it."""
+    __slots__ = ('move', 'parent', 'player_id', 'children', 'visits', 'availability', 'total')
+
+    def __init__(self, move=None, parent=None, player_id=None):
+        self.move = move
+        self.parent = parent
+        self.player_id = player_id
+        self.children = {}  # move -> Node
+        self.visits = 0
+        self.availability = 0  # Iterations in which this move was possible, for the exploration term
+        self.total = 0.0
+
+    def ucb(self):
+        return self.total / self.visits + EXPLORATION * math.sqrt(math.log(self.availability) / self.visits)
+
+def determinize(game, player, rng):
+    """
+    Clone `game` as `player` sees it, with the deck and the opponents' hands dealt at random from the cards
+    `player` cannot see. Opponents keep their hand sizes and the deck keeps its size.
+    """
+    game = game.clone()
+    deck = game.deck
+    opponents = [other for other in game.players if other.id != player.id]
+    hand_sizes = [len(opponent.hand) for opponent in opponents]
+    held = {}  # Cards taken from the opponents' hands; deck cards stay ids until dealt
+    for opponent in opponents:
+        held.update((card.id, card) for card in opponent.hand)
+        opponent.hand = []  # Lift the old hands from the card index before the cards are dealt again
+    card_ids = deck.card_ids + list(held)
+    rng.shuffle(card_ids)
+    card_for = lambda card_id: held.get(card_id) or deck.card_for(card_id)
+    dealt = sum(hand_sizes)
+    deck_ids = card_ids[dealt:]
+    game.deck = Deck(deck_ids, {card_id: card_for(card_id) for card_id in deck_ids if card_id in WILD_CARD_IDS})
+    game.deck.attach(game.card_index)
+    start = 0
+    for opponent, hand_size in zip(opponents, hand_sizes):
+        opponent.hand = [card_for(card_id) for card_id in card_ids[start:start + hand_size]]
+        start += hand_size
+    return game
+
+def evaluate(game):
+    """
+    Score every seat in [0, 1]: 1 for the winner (0 for everyone else), otherwise progress towards three
+    complete sets, with a little weight on the bank.
+    """
+    if game.winner:
+        return {player.id: 1.0 if player is game.winner else 0.0 for player in game.players}
+    scores = {}
+    for player in game.players:
+        progress = sorted((min(cards.num_property_cards / num_properties_needed_for_full_set[color], 1.0)
+                           for color, cards in player.properties.items()), reverse=True)
+        bank = sum(card.value for card in player.bank)
+        scores[player.id] = 0.85 * sum(progress[:3]) / 3 + 0.1 * min(bank, 20) / 20
+    return scores
+
+class RolloutPolicy(RandomPolicy):
+    """
+    The default rollout player: random, but cheaper per move than RandomPolicy. On its turn it picks a card
+    from the hand (or ending the turn) at random and plays one of that card's moves, so only that card's moves
+    are generated; a card with no moves ends the turn.
+    """
+    name = 'rollout'
+
+    def choose_turn_move(self, game, player, rng):
+        hand = player.hand
+        index = rng.randrange(len(hand) + 1)
+        if index < len(hand):
+            card_moves = list(game.card_moves(player, hand[index]))
+            if card_moves:
+                return rng.choice(card_moves)
+        return EndTurn(player.id)
+
+class MCTSPolicy(Policy):
+    """
+    Determinized MCTS player. Searches for `time_limit` seconds per decision, or for `iterations` iterations
+    when given (reproducible with a seeded rng). Rollouts use `rollout_policy` for up to `rollout_moves` moves.
+    """
+    name = 'mcts'
+
+    def __init__(self, time_limit=DEFAULT_TIME_LIMIT, iterations=None, rollout_moves=DEFAULT_ROLLOUT_MOVES, rollout_policy=None):
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.rollout_moves = rollout_moves
+        self.rollout_policy = rollout_policy or RolloutPolicy()
+        self.last_iterations = 0  # Iterations run for the last decision
+
+    def choose_move(self, game, player, rng):
+        legal = list(game.legal_moves(player))
+        if len(legal) == 1:
+            self.last_iterations = 0
+            return legal[0]
+        root = self.search(game, player, rng)
+        return max(legal, key=lambda move: root.children[move].visits if move in root.children else -1)
+
+    def search(self, game, player, rng):
+        root = Node()
+        deadline = time.perf_counter() + self.time_limit
+        iterations = 0
+        while (iterations < self.iterations) if self.iterations is not None else (time.perf_counter() < deadline):
+            self.iterate(root, determinize(game, player, rng), rng)
+            iterations += 1
+        self.last_iterations = iterations
+        return root
+
+    def iterate(self, root, game, rng):
+        """One selection / expansion / rollout / backpropagation pass over a determinized game."""
+        node = root
+        while not game.winner:
+            actor = game.acting_player
+            moves = list(game.legal_moves(actor))
+            untried = [move for move in moves if move not in node.children]
+            if untried:
+                move = rng.choice(untried)
+                child = node.children[move] = Node(move, node, actor.id)
+                child.availability = 1
+                node = child
+                game.apply_legal_move(move)
+                break
+            children = [node.children[move] for move in moves]
+            for child in children:
+                child.availability += 1
+            node = max(children, key=Node.ucb)
+            game.apply_legal_move(node.move)
+        scores = self.rollout(game, rng)
+        while node is not root:
+            node.visits += 1
+            node.total += scores[node.player_id]
+            node = node.parent
+        root.visits += 1
+
+    def rollout(self, game, rng):
+        for _ in range(self.rollout_moves):
+            if game.winner:
+                break
+            actor = game.acting_player
+            game.apply_legal_move(self.rollout_policy.choose_move(game, actor, rng))
+        return evaluate(game)
+
+def benchmark(seconds=0.5, runs=5):
+    """Print the search's iterations per second on a three player game in mid-play."""
+    import random
+    from backend.game_core.game import Game
+    from backend.game_core.simulation import GreedyPolicy
+
+    game = Game([{'id': f'p{i}', 'name': f'Player {i}'} for i in range(3)], seed=2, verbose=False)
+    policy = GreedyPolicy()
+    for _ in range(30):
+        game.apply_move(policy.choose_move(game, game.acting_player, game.rng))
+    player = game.acting_player
+    rates = []
+    for seed in range(runs):
+        bot = MCTSPolicy(time_limit=seconds)
+        bot.search(game, player, random.Random(seed))
+        rates.append(bot.last_iterations / seconds)
+    print(f"{max(rates):.0f} iterations/s at best, {min(rates):.0f} at worst, over {runs} searches of {seconds}s")
+
+if __name__ == "__main__":
+    benchmark()
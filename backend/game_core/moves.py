@@ -0,0 +1,240 @@
+"""
+Typed, non-interactive commands for the game engine.
+
+A Move describes one decision by one player. Moves are applied with Game.apply_move(),
+which validates them against the current state and returns a MoveResult instead of
+prompting for input, so the same engine can be driven by the websocket consumer,
+tests, simulations and bots.
+"""
+
+class Move:
+    """Base class for every engine command."""
+    name = None
+    is_response = False  # Responses answer a pending action instead of using up a turn action
+
+    def __init__(self, player_id):
+        self.player_id = player_id
+
+    def to_dict(self):
+        return {'move': self.name, **vars(self)}
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __hash__(self):
+        # Moves of one type share their field names, so equal moves hash alike from the values alone
+        return hash((type(self), *[tuple(v) if v.__class__ is list else v for v in vars(self).values()]))
+
+########## TURN ACTIONS ##########
+
+class BankCard(Move):
+    """Put any non-property card from the hand into the bank."""
+    name = 'bank_card'
+
+    def __init__(self, player_id, card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+
+class PlayProperty(Move):
+    """Play a property card from the hand; wild cards need a color from their own colors."""
+    name = 'play_property'
+
+    def __init__(self, player_id, card_id, color=None):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.color = color
+
+class PlaceBuilding(Move):
+    """Place a House or Hotel from the hand onto a complete property set."""
+    name = 'place_building'
+
+    def __init__(self, player_id, card_id, color):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.color = color
+
+class PlayPassGo(Move):
+    name = 'pass_go'
+
+    def __init__(self, player_id, card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+
+class PlayRent(Move):
+    """
+    Charge rent with a Rent or Multicolor Rent card, optionally doubled by a Double The Rent card.
+    The amount is always computed from the player's `color` set; an `amount` given as well must match
+    it. Multicolor rent charges `target_id` only; regular rent charges everyone.
+    """
+    name = 'rent'
+
+    def __init__(self, player_id, card_id, color=None, target_id=None, double_the_rent_id=None, amount=None):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.color = color
+        self.target_id = target_id
+        self.double_the_rent_id = double_the_rent_id
+        self.amount = amount
+
+class PlayDebtCollector(Move):
+    name = 'debt_collector'
+
+    def __init__(self, player_id, card_id, target_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.target_id = target_id
+
+class PlayBirthday(Move):
+    name = 'its_your_birthday'
+
+    def __init__(self, player_id, card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+
+class PlaySlyDeal(Move):
+    """Steal one property that is not part of a complete set."""
+    name = 'sly_deal'
+
+    def __init__(self, player_id, card_id, target_card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.target_card_id = target_card_id
+
+class PlayForcedDeal(Move):
+    """Swap one of the player's properties with an opponent's property that is not part of a complete set."""
+    name = 'forced_deal'
+
+    def __init__(self, player_id, card_id, target_card_id, offered_card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.target_card_id = target_card_id
+        self.offered_card_id = offered_card_id
+
+class PlayDealBreaker(Move):
+    """
+    Steal a complete set. `card_ids` picks the cards to take when the set has extras; when omitted
+    the whole set is taken if it is exactly complete, otherwise one complete set plus its buildings.
+    """
+    name = 'deal_breaker'
+
+    def __init__(self, player_id, card_id, color, target_id=None, card_ids=None):
+        super().__init__(player_id)
+        self.card_id = card_id
+        self.color = color
+        self.target_id = target_id
+        self.card_ids = list(card_ids) if card_ids is not None else None
+
+class EndTurn(Move):
+    name = 'end_turn'
+
+########## RESPONSES TO A PENDING ACTION ##########
+
+class PayRent(Move):
+    """Pay the pending amount with cards from the bank and/or properties."""
+    name = 'pay_rent'
+    is_response = True
+
+    def __init__(self, player_id, card_ids):
+        super().__init__(player_id)
+        self.card_ids = list(card_ids)
+
+class JustSayNo(Move):
+    """Block the pending action against the player, or counter a Just Say No played against them."""
+    name = 'just_say_no'
+    is_response = True
+
+    def __init__(self, player_id, card_id):
+        super().__init__(player_id)
+        self.card_id = card_id
+
+class AcceptAction(Move):
+    """Let the pending action (or the Just Say No against it) stand."""
+    name = 'accept_action'
+    is_response = True
+
+MOVE_TYPES = {cls.name: cls for cls in Move.__subclasses__()}
+
+def move_from_dict(data):
+    """Rebuild a Move from Move.to_dict()."""
+    fields = dict(data)
+    move_type = MOVE_TYPES[fields.pop('move')]
+    move = move_type.__new__(move_type)
+    move.__dict__.update(fields)
+    return move
+
+########## RESULTS ##########
+
+class MoveResult:
+    """
+    Outcome of Game.apply_move(). `events` holds plain dicts describing what happened, shaped like
+    the websocket broadcasts so the consumer can forward them as-is.
+    """
+
+    def __init__(self, success, events=None, error=None):
+        self.success = success
+        self.events = events if events is not None else []
+        self.error = error
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        if self.success:
+            return f"MoveResult(success=True, events={[event['type'] for event in self.events]})"
+        return f"MoveResult(success=False, error={self.error!r})"
+
+class PendingAction:
+    """
+    An action card waiting on responses. Targets answer one at a time in `target_ids` order; after a
+    Just Say No the initiator becomes the responder until they accept the block or counter it.
+    """
+    PAYMENT = 'payment'
+    STEAL = 'steal'
+
+    def __init__(self, kind, initiator_id, card, target_ids, amount=0, rent_type=None, move=None):
+        self.kind = kind
+        self.initiator_id = initiator_id
+        self.card = card
+        self.target_ids = list(target_ids)
+        self.total_targets = len(self.target_ids)
+        self.amount = amount
+        self.rent_type = rent_type
+        self.move = move
+        self.blocked = False
+
+    def clone(self):
+        pending = PendingAction.__new__(PendingAction)
+        pending.__dict__.update(self.__dict__)
+        pending.target_ids = list(self.target_ids)
+        return pending
+
+    def to_dict(self):
+        """Plain-data form for storage; the card is stored by id (see from_dict)."""
+        return {
+            **self.__dict__,
+            'card': self.card.id,
+            'target_ids': list(self.target_ids),
+            'move': self.move.to_dict() if self.move else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data, card):
+        """Rebuild from to_dict(); `card` is the card object for data['card']."""
+        pending = cls.__new__(cls)
+        pending.__dict__.update(data)
+        pending.card = card
+        pending.target_ids = list(data['target_ids'])
+        pending.move = move_from_dict(data['move']) if data['move'] else None
+        return pending
+
+    @property
+    def target_id(self):
+        return self.target_ids[0] if self.target_ids else None
+
+    @property
+    def responder_id(self):
+        return self.initiator_id if self.blocked else self.target_id
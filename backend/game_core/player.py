@@ -11,22 +11,101 @@ from backend.game_core.actions.debt_collector import DebtCollector
 from backend.game_core.actions.its_your_birthday import ItsYourBirthday
 from backend.game_core.properties import num_properties_needed_for_full_set
 from backend.game_core.actions import common_functions
+from backend.game_core.property_sets import PropertySets
+from backend.game_core.card_index import CardZone
 import backend.game_core.properties
 
 class Player:
     def __init__(self, id, name):
         self.id = id
         self.name = name
+        self.card_index = None  # The game's CardIndex, set by attach()
         self.hand = []
         self.bank = []
         self.properties = {}
 
-    def to_dict(self):
+    # Hand, bank and properties are always kept as zones so the per-color counts and the game's
+    # card index stay in step with the cards, whatever list or dict is assigned to them.
+    # A zone shared with a cloned game is copied the first time it is used (see clone)
+
+    @property
+    def hand(self):
+        hand = self._hand
+        if hand.frozen:
+            hand = self._hand = hand.thaw(self.card_index)
+        return hand
+
+    @hand.setter
+    def hand(self, cards):
+        self._hand = self._replace_zone(getattr(self, '_hand', None), CardZone('hand', self.id, cards))
+
+    @property
+    def bank(self):
+        bank = self._bank
+        if bank.frozen:
+            bank = self._bank = bank.thaw(self.card_index)
+        return bank
+
+    @bank.setter
+    def bank(self, cards):
+        self._bank = self._replace_zone(getattr(self, '_bank', None), CardZone('bank', self.id, cards))
+
+    @property
+    def properties(self):
+        properties = self._properties
+        if properties.frozen:
+            properties = self._properties = properties.thaw(self.card_index)
+        return properties
+
+    @properties.setter
+    def properties(self, properties):
+        self._properties = self._replace_zone(getattr(self, '_properties', None), PropertySets(properties, self.id))
+
+    def _replace_zone(self, old_zone, new_zone):
+        if old_zone is not None:
+            if old_zone.frozen:
+                old_zone = old_zone.thaw(self.card_index)  # Let go of this game's copy, not the shared zone
+            old_zone.detach()
+        if self.card_index is not None:
+            new_zone.attach(self.card_index)
+        return new_zone
+
+    def clone(self, card_index=None):
+        """
+        Copy of the player for a cloned game (see Game.clone). The two players share their zones, frozen,
+        until each copies the ones it uses, so cloning costs nothing per card.
+        """
+        player = Player.__new__(Player)
+        player.__dict__ = self.__dict__.copy()
+        player.card_index = card_index
+        self._hand.freeze()
+        self._bank.freeze()
+        self._properties.freeze()
+        if card_index is not None:
+            card_index.holders[self.id] = player
+        return player
+
+    def own_zone(self, zone):
+        """This player's own copy of `zone`, one of their zones shared with a cloned game."""
+        zones = getattr(self, zone.zone)
+        return zones if zone.color is None else zones[zone.color]
+
+    def attach(self, card_index):
+        """Register the player's cards with the game's CardIndex and keep it updated from now on."""
+        self.card_index = card_index
+        card_index.holders[self.id] = self
+        self.hand.attach(card_index)
+        self.bank.attach(card_index)
+        self.properties.attach(card_index)
+
+    def to_dict(self, show_hand=True):
+        """The player as everyone may see it; with show_hand=False the hand is only a card count."""
+        hand = {"hand": [card.to_dict() for card in self.hand]} if show_hand else {"hand_count": len(self.hand)}
         return {
             "id": self.id,
             "name": self.name,
-            "hand": [card.to_dict() for card in self.hand],
-            "properties": {color: [card.to_dict() for card in cards] for color, cards in self.properties.items()},
+            **hand,
+            "properties": {color: [card.to_dict() for card in cards] for color, cards in self.properties.items() if cards},
             "bank": [card.to_dict() for card in self.bank]
         }
 
@@ -43,6 +122,41 @@ class Player:
         if not isinstance(card, PropertyCard):  # All except property cards can be banked
             self.bank.append(card)
 
+    def add_property(self, card, color):
+        self.properties.setdefault(color, []).append(card)
+
+    def remove_property(self, card, color=None):
+        """
+        Remove a card (property, house or hotel) from the player's property sets and return the color it was in.
+        Houses and hotels left on a set that is no longer complete are moved to the bank.
+        """
+        if color is None:
+            color = next((c for c, cards in self.properties.items() if card in cards), None)
+            if color is None:
+                return None
+        self.properties[color].remove(card)
+        self.settle_buildings(color)
+        return color
+
+    def settle_buildings(self, color):
+        """Move houses/hotels that are not backed by a complete set (or a hotel without its house) to the bank."""
+        cards = self.properties.get(color)
+        if cards is None:
+            return
+        if cards.houses > cards.num_complete_sets or cards.hotels > min(cards.houses, cards.num_complete_sets):
+            houses = [card for card in cards if isinstance(card, ActionCard) and card.name == "House"]
+            hotels = [card for card in cards if isinstance(card, ActionCard) and card.name == "Hotel"]
+            while len(houses) > cards.num_complete_sets:
+                house = houses.pop()
+                cards.remove(house)
+                self.bank.append(house)
+            while len(hotels) > len(houses):
+                hotel = hotels.pop()
+                cards.remove(hotel)
+                self.bank.append(hotel)
+        if not cards:  # Clean up empty color lists
+            del self.properties[color]
+
     def play_property(self, card):
         if isinstance(card, PropertyCard):
             color = card.current_color
@@ -396,19 +510,4 @@ class Player:
 
     def has_won(self):
         # Win condition: 3 full property sets
-        num_complete_sets = 0
-        
-        def count_property_cards(self, color):
-            return sum(1 for card in self.properties.get(color, []) if isinstance(card, PropertyCard))
-        
-        num_properties_needed_for_full_set = {
-            "brown": 2, "mint": 2, "light blue": 3, "pink": 3, "orange": 3,
-            "red": 3, "yellow": 3, "green": 3, "blue": 2, "black": 4
-        }
-        
-        for color in self.properties.keys():
-            num_property_cards_in_color = count_property_cards(self, color)
-            num_complete_sets_in_color = num_property_cards_in_color // num_properties_needed_for_full_set[color]
-            num_complete_sets += num_complete_sets_in_color
-        
-        return num_complete_sets >= 3
+        return self.properties.num_complete_sets >= 3
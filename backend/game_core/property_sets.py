@@ -0,0 +1,190 @@
+from backend.game_core.card import PropertyCard, ActionCard
+from backend.game_core.properties import num_properties_needed_for_full_set, rent_values
+from backend.game_core.card_index import CardZone
+
+def _card_kind(card):
+    if isinstance(card, PropertyCard):
+        return 'wilds' if card.is_wild else 'fixed'
+    if isinstance(card, ActionCard):
+        if card.name == "House":
+            return 'houses'
+        if card.name == "Hotel":
+            return 'hotels'
+    return None
+
+class PropertySet(CardZone):
+    """
+    The cards a player has in one color, with running counts of fixed properties, wilds, houses and hotels.
+    Every list mutation updates the counts, so set questions (completeness, rent) never rescan the cards.
+    """
+
+    def __init__(self, color, cards=()):
+        self.owner = None
+        self.fixed = self.wilds = self.houses = self.hotels = 0
+        super().__init__('properties', None, cards, color)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the counts are recomputed rather than restored before the cards are
+        return (PropertySet, (self.color, list(self)))
+
+    @property
+    def num_property_cards(self):
+        return self.fixed + self.wilds
+
+    @property
+    def num_complete_sets(self):
+        return self.num_property_cards // num_properties_needed_for_full_set[self.color]
+
+    @property
+    def rent(self):
+        """Rent owed for this set, including any House (+3M) and Hotel (+4M)."""
+        if not self.num_property_cards:
+            return 0
+        rent_amount = rent_values[self.color][min(self.num_property_cards, num_properties_needed_for_full_set[self.color]) - 1]
+        if self.houses:
+            rent_amount += 3
+        if self.hotels:
+            rent_amount += 4
+        return rent_amount
+
+    def _count(self, cards, step):
+        num_complete_sets = self.num_complete_sets
+        for card in cards:
+            kind = _card_kind(card)
+            if kind:
+                setattr(self, kind, getattr(self, kind) + step)
+        if self.owner is not None:
+            self.owner.num_complete_sets += self.num_complete_sets - num_complete_sets
+
+    def _added(self, cards):
+        super()._added(cards)
+        self._count(cards, 1)
+
+    def _removed(self, cards):
+        super()._removed(cards)
+        self._count(cards, -1)
+
+class PropertySets(dict):
+    """
+    A player's properties: color -> PropertySet, plus the number of complete sets across all colors.
+    Plain lists assigned to a color are wrapped, so existing `properties[color] = []` code keeps working.
+    """
+
+    frozen = False  # See freeze
+
+    def __init__(self, properties=(), owner_id=None, card_index=None):
+        super().__init__()
+        self.num_complete_sets = 0
+        self.owner_id = owner_id
+        self.card_index = card_index
+        self.update(properties)
+
+    def __reduce__(self):
+        return (PropertySets, ({color: list(cards) for color, cards in self.items()}, self.owner_id))
+
+    def freeze(self):
+        """Share the sets between the game and a clone, like CardZone.freeze."""
+        self.frozen = True
+        for cards in self.values():
+            cards.frozen = True
+
+    def thaw(self, card_index=None):
+        """A changeable copy of frozen sets for the game owning `card_index` (see CardZone.thaw)."""
+        properties = PropertySets.__new__(PropertySets)
+        properties.__dict__ = state = self.__dict__.copy()
+        state['frozen'] = False
+        state['card_index'] = card_index
+        zones = card_index.zones if card_index is not None else None
+        for color, cards in self.items():
+            if cards.wilds:
+                cards = cards.thaw(card_index)
+            else:
+                # CardZone.thaw inlined for sets without wild cards, as there is nothing to swap
+                thawed = PropertySet.__new__(PropertySet)
+                thawed.__dict__ = state = cards.__dict__.copy()
+                state['frozen'] = False
+                state['card_index'] = card_index
+                list.extend(thawed, cards)
+                if zones is not None:
+                    zones[state['key']] = thawed
+                cards = thawed
+            cards.owner = properties
+            dict.__setitem__(properties, color, cards)
+        return properties
+
+    def attach(self, card_index):
+        self.card_index = card_index
+        for cards in self.values():
+            cards.attach(card_index)
+
+    def detach(self):
+        for cards in self.values():
+            cards.detach()
+        self.card_index = None
+
+    def _attach(self, color, cards):
+        if not (isinstance(cards, PropertySet) and cards.owner is None and cards.color == color):
+            cards = PropertySet(color, cards)
+        cards.owner = self
+        cards.owner_id = self.owner_id
+        self.num_complete_sets += cards.num_complete_sets
+        if self.card_index is not None:
+            cards.attach(self.card_index)
+        return cards
+
+    def _detach(self, cards):
+        self.num_complete_sets -= cards.num_complete_sets
+        cards.owner = None
+        cards.detach()
+        return cards
+
+    def __setitem__(self, color, cards):
+        if self.frozen:
+            self._raise_frozen()
+        if color in self:
+            if self[color] is cards:
+                return
+            self._detach(self[color])
+        super().__setitem__(color, self._attach(color, cards))
+
+    def __delitem__(self, color):
+        if self.frozen:
+            self._raise_frozen()
+        self._detach(self[color])
+        super().__delitem__(color)
+
+    def pop(self, color, *default):
+        if color not in self:
+            return super().pop(color, *default)
+        cards = self[color]
+        del self[color]
+        return cards
+
+    def popitem(self):
+        if self.frozen:
+            self._raise_frozen()
+        color, cards = super().popitem()
+        return color, self._detach(cards)
+
+    def clear(self):
+        if self.frozen:
+            self._raise_frozen()
+        for cards in self.values():
+            self._detach(cards)
+        super().clear()
+
+    def setdefault(self, color, default=None):
+        if color not in self:
+            self[color] = default if default is not None else []
+        return self[color]
+
+    def update(self, *args, **kwargs):
+        for color, cards in dict(*args, **kwargs).items():
+            self[color] = cards
+
+    def _raise_frozen(self):
+        raise RuntimeError("These property sets are shared with a cloned game; fetch them again from their player")
+
+    def num_property_cards(self, color):
+        cards = self.get(color)
+        return cards.num_property_cards if cards is not None else 0
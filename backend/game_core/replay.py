@@ -0,0 +1,120 @@
+"""
+Event-sourced games.
+
+A game is fully determined by its seating, its deck seed and the moves applied to it, so those are all
+that needs keeping to rebuild it: start it with new_game(), record the moves (Game.move_log) as events
+with move_to_event(), and replay() the events to get the same game back, e.g. after a crash, to settle
+a dispute, or for analysis.
+
+    game = new_game(players, seed)
+    game.move_log = []
+    ...  # apply moves
+    events = [move_to_event(move) for move in game.move_log]
+    assert replay(players, seed, events).to_dict() == game.to_dict()
+
+Long games are checkpointed with snapshot_game(), so only the events after the latest snapshot need
+replaying: replay(players, seed, later_events, snapshot). Time the recovery of many rooms with:
+
+    python -m backend.game_core.replay --rooms 1000
+"""
+import argparse
+import random
+import time
+import zlib
+
+from backend.game_core.bitboard import BitboardState
+from backend.game_core.deck import create_deck
+from backend.game_core.game import Game
+from backend.game_core.moves import MOVE_TYPES
+
+def new_game(players, seed, verbose=True):
+    """
+    A game seating `players` (dicts with 'id' and 'name') in that order, its deck shuffled from `seed`, with
+    the first player's two cards drawn.
+    """
+    game = Game(players, seed=seed, verbose=verbose)
+    game.current_player.draw_cards(game.deck, 2)
+    return game
+
+def move_to_event(move):
+    """A move as a JSON-ready event: its name under 'move' and its fields, leaving out unset ones."""
+    return {key: value for key, value in move.to_dict().items() if value is not None}
+
+def move_from_event(event):
+    fields = dict(event)
+    return MOVE_TYPES[fields.pop('move')](**fields)
+
+def snapshot_game(game):
+    """
+    The game as compressed bytes (a few hundred), for restoring with replay(). The RNG state is left out:
+    the engine only uses it to shuffle the deck, so it follows from the seed.
+    """
+    return zlib.compress(BitboardState.from_game(game).to_bytes(rng=False))
+
+def replay(players, seed, events, snapshot=None, verbose=False):
+    """
+    Rebuild a game by applying `events` in order to new_game(players, seed), or to the game in `snapshot`
+    (see snapshot_game) when given.
+    """
+    if snapshot is None:
+        game = new_game(players, seed, verbose)
+    else:
+        game = BitboardState.from_bytes(zlib.decompress(snapshot)).to_game()
+        game.rng = random.Random(seed)
+        create_deck(game.rng)
+    for number, event in enumerate(events):
+        result = game.apply_move(move_from_event(event))
+        if not result:
+            raise RuntimeError(f"Event {number} ({event}) could not be replayed: {result.error}")
+    return game
+
+########## BENCHMARK ##########
+
+def recorded_rooms(num_rooms, seed=0):
+    """
+    Logs of `num_rooms` three-player games stopped at random points, each with a snapshot taken at the end of
+    its latest turn, as (players, seed, events since the snapshot, snapshot, the game itself).
+    """
+    from backend.game_core.simulation import GreedyPolicy, RandomPolicy
+
+    players = [{'id': f'p{seat}', 'name': f'Player {seat}'} for seat in range(3)]
+    policies = [GreedyPolicy(), RandomPolicy(), GreedyPolicy()]
+    rng = random.Random(seed)
+    rooms = []
+    for room in range(num_rooms):
+        game_seed = seed + room
+        game = new_game(players, game_seed, verbose=False)
+        game.move_log = []
+        snapshot, snapshot_length = None, 0
+        for _ in range(rng.randrange(200)):
+            if game.winner:
+                break
+            player = game.acting_player
+            turn_index = game.turn_index
+            game.apply_move(policies[game.players.index(player)].choose_move(game, player, rng))
+            if game.turn_index != turn_index:
+                snapshot, snapshot_length = snapshot_game(game), len(game.move_log)
+        events = [move_to_event(move) for move in game.move_log[snapshot_length:]]
+        rooms.append((players, game_seed, events, snapshot, game))
+    return rooms
+
+def main():
+    parser = argparse.ArgumentParser(description="Time rebuilding live rooms from their snapshots and event logs.")
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rooms = recorded_rooms(args.rooms, args.seed)
+    started = time.perf_counter()
+    games = [replay(players, seed, events, snapshot) for players, seed, events, snapshot, _ in rooms]
+    elapsed = time.perf_counter() - started
+    assert all(replayed.to_dict() == game.to_dict() for replayed, (*_, game) in zip(games, rooms))
+    events = [len(room[2]) for room in rooms]
+    snapshots = [len(room[3]) for room in rooms if room[3]]
+    print(f"Rebuilt {len(rooms)} rooms in {elapsed * 1000:.0f} ms ({elapsed / len(rooms) * 1000:.2f} ms per room)")
+    print(f"Events replayed per room: mean {sum(events) / len(events):.1f}, max {max(events)}")
+    if snapshots:
+        print(f"Snapshot size: mean {sum(snapshots) / len(snapshots):.0f} bytes, max {max(snapshots)}")
+
+if __name__ == "__main__":
+    main()
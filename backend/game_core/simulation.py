@@ -0,0 +1,257 @@
+"""
+Bulk self-play simulator.
+
+Plays complete games between scripted policies through the headless move API and reports win rates,
+game length and action mix. Games are spread over a process pool; game `i` of a run with base seed `s`
+is seeded with `s + i` regardless of which worker plays it, so any game can be replayed from its seed
+and policy lineup alone:
+
+    python -m backend.game_core.simulation --games 1000000 --policies greedy random --workers 32 --seed 1
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.game_core.game import Game
+from backend.game_core.card import PropertyCard, MoneyCard
+from backend.game_core.moves import BankCard, PlayProperty, PlayRent, PayRent, JustSayNo, AcceptAction, PendingAction
+from backend.game_core.properties import num_properties_needed_for_full_set
+from backend.game_core.actions import common_functions
+
+DEFAULT_MAX_TURNS = 300  # Games still running after this many turns are scored as draws
+
+########## PAYMENTS ##########
+
+def choose_payment(player, amount):
+    """
+    Pick cards worth at least `amount`: bank first (largest notes first), then buildings and properties from
+    incomplete sets, then anything else. Pays everything payable when the total falls short.
+    """
+    selected = []
+    total = 0
+    bank = sorted(player.bank, key=lambda card: card.value, reverse=True)
+    sets = []
+    for color, cards in player.properties.items():
+        is_complete = common_functions.count_property_cards(player, color) >= num_properties_needed_for_full_set[color]
+        for card in cards:
+            if card.value is not None:
+                sets.append((is_complete, isinstance(card, PropertyCard), card.value, card))
+    sets.sort(key=lambda entry: entry[:3])
+    for card in bank + [entry[3] for entry in sets]:
+        if total >= amount:
+            break
+        selected.append(card.id)
+        total += card.value
+    return PayRent(player.id, selected)
+
+########## POLICIES ##########
+
+class Policy:
+    """A scripted player. Policies must only return legal moves."""
+    name = None
+
+    def choose_move(self, game, player, rng):
+        pending = game.pending_action
+        if pending:
+            return self.respond(game, player, pending, rng)
+        return self.choose_turn_move(game, player, rng)
+
+    def respond(self, game, player, pending, rng):
+        just_say_no_card = next((c for c in player.hand if c.name == "Just Say No"), None)
+        if just_say_no_card and self.wants_just_say_no(game, player, pending, rng):
+            return JustSayNo(player.id, just_say_no_card.id)
+        if pending.kind == PendingAction.PAYMENT and not pending.blocked:
+            return choose_payment(player, pending.amount)
+        return AcceptAction(player.id)
+
+    def wants_just_say_no(self, game, player, pending, rng):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def choose_turn_move(self, game, player, rng):
+        raise NotImplementedError("Subclasses should implement this method.")
+
+class RandomPolicy(Policy):
+    """Uniformly random over all available moves."""
+    name = 'random'
+
+    def wants_just_say_no(self, game, player, pending, rng):
+        return rng.random() < 0.5
+
+    def choose_turn_move(self, game, player, rng):
+        return rng.choice(list(game.legal_moves(player)))
+
+class GreedyPolicy(Policy):
+    """Builds sets first, then steals and charges the biggest rent, then banks; always uses Just Say No."""
+    name = 'greedy'
+
+    priorities = {
+        'deal_breaker': 0, 'play_property': 1, 'sly_deal': 2, 'rent': 3, 'place_building': 4,
+        'forced_deal': 5, 'debt_collector': 6, 'its_your_birthday': 7, 'pass_go': 8, 'bank_card': 9, 'end_turn': 10,
+    }
+
+    def wants_just_say_no(self, game, player, pending, rng):
+        return True
+
+    def choose_turn_move(self, game, player, rng):
+        return min(game.legal_moves(player), key=lambda move: self.score(game, player, move))
+
+    def score(self, game, player, move):
+        priority = self.priorities[move.name]
+        if isinstance(move, PlayProperty):
+            # Prefer the color closest to completion
+            have = common_functions.count_property_cards(player, move.color)
+            return (priority, num_properties_needed_for_full_set[move.color] - have - 1)
+        if isinstance(move, PlayRent):
+            rent = common_functions.calculate_rent(player, move.color) * (2 if move.double_the_rent_id else 1)
+            return (priority, -rent)
+        if isinstance(move, BankCard):
+            card = game.find_card(move.card_id)[0]
+            # Bank money before action cards, and only bank action cards once the hand is large
+            if not isinstance(card, MoneyCard):
+                return (priority + (0 if len(player.hand) > 7 else 2), -card.value)
+            return (priority, -card.value)
+        return (priority, 0)
+
+POLICIES = {policy.name: policy for policy in (RandomPolicy, GreedyPolicy)}
+
+########## RUNNING GAMES ##########
+
+def play_game(seed, policy_names, max_turns=DEFAULT_MAX_TURNS):
+    """
+    Play one game with one seat per entry of `policy_names` (seat 0 moves first).
+    Returns a dict with the winning seat (None for a draw), number of turns and the moves played.
+    """
+    game = Game([{'id': f'p{seat}', 'name': name} for seat, name in enumerate(policy_names)], seed=seed, verbose=False)
+    policies = {player.id: POLICIES[name]() for player, name in zip(game.players, policy_names)}
+    game.current_player.draw_cards(game.deck, 2)
+    turns = 1
+    action_mix = Counter()
+    while not game.winner and turns <= max_turns:
+        player = game.acting_player
+        move = policies[player.id].choose_move(game, player, game.rng)
+        turn_index = game.turn_index
+        result = game.apply_move(move)
+        if not result:
+            raise RuntimeError(f"Policy {policy_names[game.players.index(player)]} made an illegal move {move!r} (seed {seed}): {result.error}")
+        action_mix[move.name] += 1
+        if game.turn_index != turn_index:
+            turns += 1
+    winner = game.players.index(game.winner) if game.winner else None
+    return {'seed': seed, 'winner': winner, 'turns': turns, 'action_mix': action_mix}
+
+class SimulationReport:
+    """Aggregated results; reports from separate chunks are combined with merge()."""
+
+    def __init__(self, policy_names):
+        self.policy_names = list(policy_names)
+        self.games = 0
+        self.draws = 0
+        self.wins = Counter()  # Policy name -> wins
+        self.seat_wins = Counter()  # Seat -> wins
+        self.total_turns = 0
+        self.min_turns = None
+        self.max_turns = 0
+        self.action_mix = Counter()
+
+    def add_game(self, result, seating):
+        self.games += 1
+        if result['winner'] is None:
+            self.draws += 1
+        else:
+            self.wins[seating[result['winner']]] += 1
+            self.seat_wins[result['winner']] += 1
+        turns = result['turns']
+        self.total_turns += turns
+        self.min_turns = turns if self.min_turns is None else min(self.min_turns, turns)
+        self.max_turns = max(self.max_turns, turns)
+        self.action_mix.update(result['action_mix'])
+
+    def merge(self, other):
+        self.games += other.games
+        self.draws += other.draws
+        self.wins.update(other.wins)
+        self.seat_wins.update(other.seat_wins)
+        self.total_turns += other.total_turns
+        if other.min_turns is not None:
+            self.min_turns = other.min_turns if self.min_turns is None else min(self.min_turns, other.min_turns)
+        self.max_turns = max(self.max_turns, other.max_turns)
+        self.action_mix.update(other.action_mix)
+        return self
+
+    def to_dict(self):
+        total_moves = sum(self.action_mix.values()) or 1
+        # Policies sharing a name share their wins, so rates are per seat playing that policy
+        seats_per_policy = Counter(self.policy_names)
+        return {
+            'games': self.games,
+            'draws': self.draws,
+            'win_rates': {name: self.wins[name] / (self.games * seats_per_policy[name]) if self.games else 0.0 for name in seats_per_policy},
+            'seat_win_rates': {seat: self.seat_wins[seat] / self.games if self.games else 0.0 for seat in range(len(self.policy_names))},
+            'mean_turns': self.total_turns / self.games if self.games else 0.0,
+            'min_turns': self.min_turns,
+            'max_turns': self.max_turns,
+            'action_mix': {name: count / total_moves for name, count in self.action_mix.most_common()},
+        }
+
+def seating_for(game_index, policy_names):
+    """Rotate the lineup every game so no policy always gets the first move."""
+    shift = game_index % len(policy_names)
+    return policy_names[shift:] + policy_names[:shift]
+
+def play_games(start, stop, seed, policy_names, max_turns=DEFAULT_MAX_TURNS):
+    """Play games [start, stop) of a run; this is the unit of work handed to each worker process."""
+    report = SimulationReport(policy_names)
+    for game_index in range(start, stop):
+        seating = seating_for(game_index, list(policy_names))
+        report.add_game(play_game(seed + game_index, seating, max_turns), seating)
+    return report
+
+def run_simulation(num_games, policy_names, seed=0, workers=None, chunk_size=1000, max_turns=DEFAULT_MAX_TURNS):
+    """
+    Play `num_games` games and return a merged SimulationReport. With workers=1 everything runs in-process;
+    otherwise chunks of `chunk_size` games are fanned out to a process pool (default: one worker per core).
+    """
+    policy_names = list(policy_names)
+    unknown = [name for name in policy_names if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies {unknown}; choose from {sorted(POLICIES)}")
+    chunks = [(start, min(start + chunk_size, num_games)) for start in range(0, num_games, chunk_size)]
+    report = SimulationReport(policy_names)
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) <= 1:
+        for start, stop in chunks:
+            report.merge(play_games(start, stop, seed, policy_names, max_turns))
+        return report
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_games, start, stop, seed, policy_names, max_turns) for start, stop in chunks]
+        for future in futures:
+            report.merge(future.result())
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Monopoly Deal self-play simulations.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policies', nargs='+', default=['greedy', 'random'], help=f"One policy per seat: {sorted(POLICIES)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = run_simulation(args.games, args.policies, args.seed, args.workers, args.chunk_size, args.max_turns)
+    elapsed = time.perf_counter() - started
+    summary = report.to_dict()
+    print(f"{summary['games']} games in {elapsed:.1f}s ({summary['games'] / elapsed:.0f} games/s)")
+    print(f"Draws: {summary['draws']}")
+    for name, rate in summary['win_rates'].items():
+        print(f"  {name}: {rate:.1%} win rate per seat")
+    print(f"Turns: mean {summary['mean_turns']:.1f}, min {summary['min_turns']}, max {summary['max_turns']}")
+    print("Action mix:")
+    for name, share in summary['action_mix'].items():
+        print(f"  {name}: {share:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import pytest
+from backend.game_core.bitboard import BitboardState, zone_code, HAND, PROPERTIES, DISCARD, dumps_game, loads_game
+from backend.game_core.card import MoneyCard
+from backend.game_core.game import Game
+from backend.game_core import simulation
+from backend.game_core.actions import common_functions
+
+def self_play(seed, num_moves):
+    """A two player game advanced `num_moves` moves by greedy policies."""
+    game = Game([{'id': 'p0', 'name': 'Player 0'}, {'id': 'p1', 'name': 'Player 1'}], seed=seed, verbose=False)
+    policy = simulation.GreedyPolicy()
+    for _ in range(num_moves):
+        if game.winner:
+            break
+        player = game.acting_player
+        assert game.apply_move(policy.choose_move(game, player, game.rng))
+    return game
+
+def assert_games_match(game, other):
+    assert other.to_dict() == game.to_dict()
+    assert other.deck.card_ids == game.deck.card_ids
+    assert other.rng.getstate() == game.rng.getstate()
+    assert other.state_version == game.state_version
+    assert [getattr(card, 'current_color', None) for card in other.deck] == [getattr(card, 'current_color', None) for card in game.deck]
+    assert list(other.players[0].properties) == list(game.players[0].properties)
+
+# Test 1: Converting to a BitboardState and back loses nothing
+@pytest.mark.parametrize("num_moves", [0, 10, 40, 80])
+def test_round_trip(num_moves):
+    for seed in range(5):
+        game = self_play(seed, num_moves)
+        assert_games_match(game, BitboardState.from_game(game).to_game())
+
+# Test 2: Table lookups agree with the object model
+def test_queries_match_object_model():
+    for seed in range(5):
+        game = self_play(seed, 60)
+        state = BitboardState.from_game(game)
+        for seat, player in enumerate(game.players):
+            assert state.has_won(seat) == player.has_won()
+            assert state.bank_value(seat) == sum(card.value for card in player.bank)
+            for color in player.properties:
+                assert state.num_property_cards(seat, color) == common_functions.count_property_cards(player, color)
+                assert state.rent(seat, color) == common_functions.calculate_rent(player, color)
+
+# Test 3: Clones are independent and hash by value
+def test_clone_and_hash():
+    state = BitboardState.from_game(self_play(1, 20))
+    clone = state.clone()
+
+    assert clone == state and hash(clone) == hash(state)
+    clone.draw(0, 2)
+    assert clone != state
+    assert len(clone.cards_in(zone_code(0, HAND))) == len(state.cards_in(zone_code(0, HAND))) + 2
+
+# Test 4: Moving cards mirrors the list operations of the object model
+def test_move_card_matches_object_model():
+    game = self_play(2, 0)
+    state = BitboardState.from_game(game)
+    player = game.players[0]
+    card = player.hand[1]
+
+    player.hand.remove(card)
+    game.discard_card(card)
+    state.move_card(card.id, DISCARD)
+    assert_games_match(game, state.to_game())
+
+    player.draw_cards(game.deck, 1)
+    state.draw(0, 1)
+    assert_games_match(game, state.to_game())
+
+    moved = player.hand[0]
+    player.hand.remove(moved)
+    player.add_property(moved, "blue")
+    state.move_card(moved.id, zone_code(0, PROPERTIES, "blue"))
+    assert_games_match(game, state.to_game())
+    assert state.property_colors[0] == (8,)
+
+# Test 5: Only catalog cards can be stored
+def test_non_catalog_cards_rejected():
+    game = self_play(3, 0)
+    game.players[0].bank.append(MoneyCard(5, card_id=500))
+
+    with pytest.raises(ValueError):
+        BitboardState.from_game(game)
+
+# Test 6: Games stored as bytes come back unchanged, pending actions included
+def test_bytes_round_trip():
+    seen_pending = False
+    for seed in range(10):
+        for num_moves in (0, 15, 45, 90):
+            game = self_play(seed, num_moves)
+            data = dumps_game(game)
+            restored = loads_game(data)
+
+            assert len(data) < 3500
+            assert_games_match(game, restored)
+            assert BitboardState.from_bytes(data) == BitboardState.from_game(game)
+            if game.pending_action:
+                seen_pending = True
+                assert vars(restored.pending_action) | {'card': None} == vars(game.pending_action) | {'card': None}
+                assert restored.pending_action.card.id == game.pending_action.card.id
+    assert seen_pending
+
+# Test 7: Leaving out the RNG state keeps the rest of the game
+def test_bytes_without_rng():
+    game = self_play(4, 45)
+    data = BitboardState.from_game(game).to_bytes(rng=False)
+    state = BitboardState.from_bytes(data)
+
+    assert len(data) < 1000
+    assert state.rng_state is None
+    restored = state.to_game()
+    assert restored.to_dict() == game.to_dict()
+    assert restored.deck.card_ids == game.deck.card_ids
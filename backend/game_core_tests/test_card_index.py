@@ -0,0 +1,69 @@
+import copy
+import pickle
+import pytest
+from backend.game_core.card import MoneyCard, PropertyCard
+from backend.game_core.game import Game
+from backend.game_core import moves, simulation
+
+@pytest.fixture
+def game_setup():
+    """Fixture to set up a two player game."""
+    return Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], seed=1, verbose=False)
+
+def assert_index_matches(game):
+    zones = [game.discard_pile] + [zone for player in game.players for zone in (player.hand, player.bank, *player.properties.values())]
+    expected = {card.id: zone for zone in zones for card in zone}
+    expected.update(dict.fromkeys(game.deck.card_ids, game.deck))
+    assert {card_id: game.find_card(card_id)[1] for card_id in game.card_index.locations} == expected
+
+# Test 1: Every dealt card is indexed where it sits
+def test_dealt_cards_are_indexed(game_setup):
+    game = game_setup
+    card = game.players[1].hand[2]
+
+    assert len(game.card_index) == 108
+    assert game.locate_card(card.id) == ('hand', 'p2', None, 2)
+    assert game.find_card(card.id) == (card, game.players[1].hand)
+    assert game.locate_card(game.deck.card_ids[-1])[0] == 'deck'
+    assert game.locate_card(999) is None
+    assert_index_matches(game)
+
+# Test 2: Moves and direct assignments keep the index current
+def test_index_follows_moves(game_setup):
+    game = game_setup
+    player = game.players[0]
+    player.hand = [MoneyCard(5, card_id=200), PropertyCard("Boardwalk", "blue", 4, card_id=201)]
+    old_hand_card = game.players[1].hand[0]
+    game.players[1].hand = []
+
+    assert game.apply_move(moves.BankCard('p1', 200))
+    assert game.apply_move(moves.PlayProperty('p1', 201))
+
+    assert game.locate_card(200) == ('bank', 'p1', None, 0)
+    assert game.locate_card(201) == ('properties', 'p1', 'blue', 0)
+    assert old_hand_card.id not in game.card_index
+    assert_index_matches(game)
+
+# Test 3: Stale card ids are rejected
+def test_stale_card_id_rejected(game_setup):
+    game = game_setup
+    card = game.players[0].hand[0]
+    game.discard_card(game.players[0].hand.pop(0))
+
+    assert not game.apply_move(moves.BankCard('p1', card.id))
+    assert game.locate_card(card.id)[0] == 'discard'
+
+# Test 4: The index stays consistent through whole games, copies and pickles
+def test_index_consistent_after_self_play():
+    for seed in range(5):
+        game = Game([{'id': 'p0', 'name': 'Player 0'}, {'id': 'p1', 'name': 'Player 1'}], seed=seed, verbose=False)
+        policies = {player.id: simulation.GreedyPolicy() for player in game.players}
+        for _ in range(60):
+            if game.winner:
+                break
+            player = game.acting_player
+            assert game.apply_move(policies[player.id].choose_move(game, player, game.rng))
+        assert_index_matches(game)
+        for copied in (copy.deepcopy(game), pickle.loads(pickle.dumps(game))):
+            assert_index_matches(copied)
+            assert copied.get_player('p0') is copied.players[0]
@@ -0,0 +1,56 @@
+import random
+import copy
+from backend.game_core.card import PropertyCard
+from backend.game_core.deck import create_deck, CARD_CATALOG, CARD_IDS, WILD_CARD_IDS
+
+# Test 1: A deck is a permutation of the catalog
+def test_deck_is_permutation_of_catalog():
+    deck = create_deck(random.Random(1))
+
+    assert len(deck) == len(CARD_CATALOG) == 108
+    assert sorted(deck.card_ids) == sorted(CARD_IDS)
+    assert len(WILD_CARD_IDS) == 11
+
+# Test 2: Seeded decks are identical
+def test_seeded_decks_match():
+    assert create_deck(random.Random(5)).card_ids == create_deck(random.Random(5)).card_ids
+
+# Test 3: Non-wild cards are shared, wild cards are private to each game
+def test_wild_cards_are_per_game():
+    first = create_deck()
+    second = create_deck()
+    first_cards = {card.id: card for card in first}
+    second_cards = {card.id: card for card in second}
+
+    for card_id in CARD_IDS:
+        if card_id in WILD_CARD_IDS:
+            assert first_cards[card_id] is not second_cards[card_id]
+        else:
+            assert first_cards[card_id] is second_cards[card_id] is CARD_CATALOG[card_id]
+
+    wild_id = next(card_id for card_id in WILD_CARD_IDS if len(CARD_CATALOG[card_id].colors) == 2)
+    first_cards[wild_id].assign_color(first_cards[wild_id].colors[1])
+    assert second_cards[wild_id].current_color == CARD_CATALOG[wild_id].current_color == CARD_CATALOG[wild_id].colors[0]
+    assert first.card_for(wild_id) is first_cards[wild_id]
+
+# Test 4: Drawing takes cards from the top of the shuffled ids
+def test_draw_from_deck():
+    deck = create_deck()
+    top_id = deck.card_ids[-1]
+    card = deck.pop()
+
+    assert card.id == top_id
+    assert len(deck) == 107
+    assert isinstance(CARD_CATALOG[top_id], type(card))
+
+# Test 5: Cards are slotted and read their static data from the shared tables
+def test_cards_are_compact():
+    assert all(not hasattr(card, '__dict__') for card in CARD_CATALOG.values())
+
+    wild = PropertyCard("Wild Property", ['red', 'yellow'], 3, True, card_id=500)
+    copied = copy.copy(wild)
+    copied.assign_color('yellow')
+
+    assert wild.current_color == 'red'
+    assert copied.to_dict()['currentColor'] == 'yellow'
+    assert copied.rent is PropertyCard.propertyMap['red']['rent']
@@ -0,0 +1,334 @@
+import pytest
+from backend.game_core.card import ActionCard, PropertyCard, RentCard, MoneyCard
+from backend.game_core.game import Game, view_for
+from backend.game_core import moves
+from backend.game_core_tests.test_property_sets import red_set
+
+# Fixtures for game and player setup
+@pytest.fixture
+def game_setup():
+    """Fixture to set up a three player game with empty hands so every test controls the cards in play."""
+    game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}, {'id': 'p3', 'name': 'Player 3'}])
+    for player in game.players:
+        player.hand = []
+    return game
+
+# Test 1: Banking a money card uses up an action
+def test_bank_money_card(game_setup):
+    game = game_setup
+    player = game.players[0]
+    money = MoneyCard(5, card_id=200)
+    player.hand.append(money)
+
+    result = game.apply_move(moves.BankCard('p1', 200))
+
+    assert result.success is True
+    assert money in player.bank and money not in player.hand
+    assert game.actions_remaining == 2
+
+# Test 2: Invalid moves are rejected without touching the state
+def test_invalid_moves_are_rejected(game_setup):
+    game = game_setup
+    property_card = PropertyCard("Boardwalk", "blue", 4, card_id=201)
+    game.players[0].hand.append(property_card)
+    game.players[1].hand.append(MoneyCard(1, card_id=202))
+
+    assert not game.apply_move(moves.BankCard('p1', 201))  # Properties cannot be banked
+    assert not game.apply_move(moves.BankCard('p2', 202))  # Not Player 2's turn
+    assert not game.apply_move(moves.BankCard('p1', 999))  # Card not in hand
+    assert property_card in game.players[0].hand
+    assert game.actions_remaining == 3
+
+# Test 3: Wild cards can only be played as one of their colors
+def test_play_wild_property(game_setup):
+    game = game_setup
+    player = game.players[0]
+    wild = PropertyCard("Wild Property", ['red', 'yellow'], 3, True, card_id=203)
+    player.hand.append(wild)
+
+    assert not game.apply_move(moves.PlayProperty('p1', 203, 'blue'))
+    assert game.apply_move(moves.PlayProperty('p1', 203, 'yellow'))
+    assert player.properties == {'yellow': [wild]}
+    assert wild.current_color == 'yellow'
+
+# Test 4: The third action passes the turn and the next player draws
+def test_turn_passes_after_three_actions(game_setup):
+    game = game_setup
+    game.players[0].hand = [MoneyCard(1, card_id=210 + i) for i in range(3)]
+    deck_size = len(game.deck)
+
+    for i in range(3):
+        assert game.apply_move(moves.BankCard('p1', 210 + i))
+
+    assert game.current_player is game.players[1]
+    assert game.actions_remaining == 3
+    assert len(game.players[1].hand) == 5  # Empty hand draws 5
+    assert len(game.deck) == deck_size - 5
+
+# Test 5: Ending the turn early
+def test_end_turn(game_setup):
+    game = game_setup
+    game.players[1].hand = [MoneyCard(1, card_id=215)]
+
+    assert game.apply_move(moves.EndTurn('p1'))
+    assert game.current_player is game.players[1]
+    assert len(game.players[1].hand) == 3
+
+# Test 6: Rent charges every opponent in turn and payments move cards to the recipient
+def test_rent_collects_from_all_players(game_setup):
+    game = game_setup
+    player_1, player_2, player_3 = game.players
+    player_1.properties = {"red": red_set(220)[:2]}
+    rent_card = RentCard(['red', 'yellow'], card_id=225)
+    player_1.hand.append(rent_card)
+    player_2.bank = [MoneyCard(1, card_id=226), MoneyCard(5, card_id=227)]
+    player_3.bank = [MoneyCard(2, card_id=228)]
+
+    result = game.apply_move(moves.PlayRent('p1', 225, color='red'))
+
+    assert result.success is True
+    assert result.events[0]['type'] == 'rent_pre_request'
+    assert result.events[0]['amount'] == 3
+    assert result.events[0]['target_player_id'] == 'p2'
+    assert rent_card in game.discard_pile
+    assert not game.apply_move(moves.PayRent('p3', [228]))  # Player 2 pays first
+    assert not game.apply_move(moves.PayRent('p2', [226]))  # 1M does not cover 3M
+
+    result = game.apply_move(moves.PayRent('p2', [227]))
+    assert [event['type'] for event in result.events] == ['rent_paid', 'rent_pre_request']
+    assert game.pending_action.target_id == 'p3'
+
+    # Player 3 cannot cover the rent and pays everything they have
+    assert game.apply_move(moves.PayRent('p3', [228]))
+    assert game.pending_action is None
+    assert sorted(card.value for card in player_1.bank) == [2, 5]
+
+# Test 7: Paying with a property that breaks a set sends its house to the payer's bank
+def test_payment_breaking_a_set_banks_the_house(game_setup):
+    game = game_setup
+    player_1, player_2, _ = game.players
+    house = ActionCard("House", card_id=235)
+    player_2.properties = {"red": red_set(230) + [house]}
+    player_1.hand.append(ActionCard("Debt Collector", card_id=236))
+
+    assert game.apply_move(moves.PlayDebtCollector('p1', 236, 'p2'))
+    assert game.apply_move(moves.PayRent('p2', [230, 231]))
+
+    assert house in player_2.bank
+    assert [card.id for card in player_1.properties["red"]] == [230, 231]
+    assert len(player_2.properties["red"]) == 1
+
+# Test 8: Just Say No skips the blocked player and moves on to the next one
+def test_just_say_no_blocks_payment(game_setup):
+    game = game_setup
+    player_1, player_2, player_3 = game.players
+    player_1.hand.append(ActionCard("It's Your Birthday", card_id=240))
+    player_2.hand.append(ActionCard("Just Say No", card_id=241))
+
+    assert game.apply_move(moves.PlayBirthday('p1', 240))
+    assert game.apply_move(moves.JustSayNo('p2', 241))
+    assert game.pending_action.responder_id == 'p1'
+    result = game.apply_move(moves.AcceptAction('p1'))
+
+    assert result.events[0]['target_player_id'] == 'p3'
+    assert game.pending_action.target_id == 'p3'
+
+# Test 9: Turn actions wait until the pending action is resolved
+def test_pending_action_blocks_turn_moves(game_setup):
+    game = game_setup
+    player_1 = game.players[0]
+    player_1.hand = [ActionCard("Debt Collector", card_id=245), MoneyCard(1, card_id=246)]
+
+    assert game.apply_move(moves.PlayDebtCollector('p1', 245, 'p3'))
+    assert not game.apply_move(moves.BankCard('p1', 246))
+    assert game.apply_move(moves.PayRent('p3', []))  # Nothing to pay with
+    assert game.apply_move(moves.BankCard('p1', 246))
+
+# Test 10: Sly Deal steals from an incomplete set once the target accepts
+def test_sly_deal(game_setup):
+    game = game_setup
+    player_1, player_2, _ = game.players
+    boardwalk = PropertyCard("Boardwalk", "blue", 4, card_id=250)
+    player_2.properties = {"blue": [boardwalk], "red": red_set(251)}
+    player_1.hand.append(ActionCard("Sly Deal", card_id=255))
+
+    assert not game.apply_move(moves.PlaySlyDeal('p1', 255, 251))  # Complete sets are protected
+    assert game.apply_move(moves.PlaySlyDeal('p1', 255, 250))
+    result = game.apply_move(moves.AcceptAction('p2'))
+
+    assert result.events[0]['type'] == 'property_stolen'
+    assert player_1.properties == {"blue": [boardwalk]}
+    assert "blue" not in player_2.properties
+
+# Test 11: A countered Just Say No lets the steal go through
+def test_sly_deal_with_countered_just_say_no(game_setup):
+    game = game_setup
+    player_1, player_2, _ = game.players
+    boardwalk = PropertyCard("Boardwalk", "blue", 4, card_id=260)
+    player_2.properties = {"blue": [boardwalk]}
+    player_2.hand.append(ActionCard("Just Say No", card_id=261))
+    player_1.hand = [ActionCard("Sly Deal", card_id=262), ActionCard("Just Say No", card_id=263)]
+
+    assert game.apply_move(moves.PlaySlyDeal('p1', 262, 260))
+    assert game.apply_move(moves.JustSayNo('p2', 261))
+    assert game.apply_move(moves.JustSayNo('p1', 263))
+    assert game.apply_move(moves.AcceptAction('p2'))
+
+    assert player_1.properties == {"blue": [boardwalk]}
+    assert game.pending_action is None
+
+# Test 12: Forced Deal swaps properties
+def test_forced_deal(game_setup):
+    game = game_setup
+    player_1, player_2, _ = game.players
+    boardwalk = PropertyCard("Boardwalk", "blue", 4, card_id=270)
+    baltic = PropertyCard("Baltic Avenue", "brown", 1, card_id=271)
+    player_1.properties = {"brown": [baltic]}
+    player_2.properties = {"blue": [boardwalk]}
+    player_1.hand.append(ActionCard("Forced Deal", card_id=272))
+
+    assert game.apply_move(moves.PlayForcedDeal('p1', 272, 270, 271))
+    result = game.apply_move(moves.AcceptAction('p2'))
+
+    assert result.events[0]['type'] == 'property_swap'
+    assert player_1.properties == {"blue": [boardwalk]}
+    assert player_2.properties == {"brown": [baltic]}
+
+# Test 13: Deal Breaker takes a complete set with its house
+def test_deal_breaker(game_setup):
+    game = game_setup
+    player_1, player_2, _ = game.players
+    house = ActionCard("House", card_id=283)
+    player_2.properties = {"red": red_set(280) + [house]}
+    player_1.hand.append(ActionCard("Deal Breaker", card_id=284))
+
+    assert game.apply_move(moves.PlayDealBreaker('p1', 284, "red", target_id='p2'))
+    assert game.apply_move(moves.AcceptAction('p2'))
+
+    assert len(player_1.properties["red"]) == 4
+    assert "red" not in player_2.properties
+
+# Test 14: Houses only go on complete sets
+def test_place_house(game_setup):
+    game = game_setup
+    player = game.players[0]
+    player.properties = {"red": red_set(290), "blue": [PropertyCard("Boardwalk", "blue", 4, card_id=293)]}
+    house = ActionCard("House", card_id=294)
+    player.hand.append(house)
+
+    assert not game.apply_move(moves.PlaceBuilding('p1', 294, "blue"))
+    assert game.apply_move(moves.PlaceBuilding('p1', 294, "red"))
+    assert house in player.properties["red"]
+
+# Test 15: Completing a third set wins the game and ends it
+def test_winner_detected(game_setup):
+    game = game_setup
+    player = game.players[0]
+    player.properties = {
+        "red": red_set(300),
+        "brown": [PropertyCard("Mediterranean Avenue", "brown", 1, card_id=303), PropertyCard("Baltic Avenue", "brown", 1, card_id=304)],
+        "blue": [PropertyCard("Boardwalk", "blue", 4, card_id=305)]
+    }
+    player.hand = [PropertyCard("Park Place", "blue", 4, card_id=306), MoneyCard(1, card_id=307)]
+
+    assert game.apply_move(moves.PlayProperty('p1', 306))
+    assert game.winner is player
+    assert not game.apply_move(moves.BankCard('p1', 307))
+
+# Test 16: A player's view shows their own hand and only the size of everyone else's
+def test_player_view_hides_other_hands(game_setup):
+    game = game_setup
+    game.players[0].hand = [MoneyCard(1, card_id=200), MoneyCard(2, card_id=201)]
+    game.players[1].hand = [MoneyCard(3, card_id=202)]
+
+    view = game.to_dict(viewer_id='p1')
+
+    players = {player['id']: player for player in view['players']}
+    assert [card['id'] for card in players['p1']['hand']] == [200, 201]
+    assert 'hand' not in players['p2'] and players['p2']['hand_count'] == 1
+    assert 'hand' not in players['p3'] and players['p3']['hand_count'] == 0
+    assert view_for(game.to_dict(), 'p1') == view
+
+def apply_ops(state, ops):
+    """Apply Game.changes() ops to a to_dict() the way a client would."""
+    players = {player['id']: player for player in state['players']}
+    def cards_in(path):
+        if path[0] == 'discard':
+            return state['discard_pile'] if state['discard_pile'] is not None else []
+        if path[0] == 'properties':
+            return players[path[1]]['properties'].setdefault(path[2], [])
+        return players[path[1]][path[0]]
+    def store(path, cards):
+        if path[0] == 'discard':
+            state['discard_pile'] = cards or None
+        elif path[0] == 'properties' and not cards:
+            del players[path[1]]['properties'][path[2]]
+    for op in ops:
+        if 'from' in op and op['from'] != ['deck']:
+            cards = [card for card in cards_in(op['from']) if card['id'] != op['id']]
+            if op['from'][0] != 'discard':
+                cards_in(op['from'])[:] = cards
+            store(op['from'], cards)
+        if 'to' in op and op['to'] != ['deck']:
+            cards = cards_in(op['to'])
+            cards.insert(op['index'], op['card'])
+            store(op['to'], cards)
+
+# Test 17: changes() reports only what a move touched, card by card
+def test_changes_since_tracking(game_setup):
+    game = game_setup
+    game.players[0].hand = [MoneyCard(5, card_id=200), MoneyCard(1, card_id=201)]
+    game.track_changes()
+
+    assert game.changes() == {}
+    assert game.apply_move(moves.BankCard('p1', 200))
+
+    assert game.changes() == {
+        'actions_remaining': 2,
+        'ops': [{'id': 200, 'from': ['hand', 'p1'], 'to': ['bank', 'p1'], 'index': 0, 'card': game.players[0].bank[0].to_dict()}],
+    }
+
+# Test 18: Applying the ops of changes() to the previous state gives the current state, move after move
+def test_changes_rebuild_state():
+    from backend.game_core import simulation
+    game = Game([{'id': 'p0', 'name': 'Player 0'}, {'id': 'p1', 'name': 'Player 1'}], seed=3, verbose=False)
+    policy = simulation.GreedyPolicy()
+    state = game.to_dict()
+    game.track_changes()
+    for _ in range(150):
+        if game.winner:
+            break
+        player = game.acting_player
+        assert game.apply_move(policy.choose_move(game, player, game.rng))
+        game.restore(game.snapshot())  # Rolling back must not lose what changed before the snapshot
+        changes = game.changes()
+        game.track_changes()
+        apply_ops(state, changes.pop('ops', []))
+        state.update(changes)
+        assert state == game.to_dict()
+
+# Test 19: Other players' views say where a card went but not which card left the deck
+def test_view_hides_drawn_cards(game_setup):
+    game = game_setup
+    game.track_changes()
+    game.players[1].draw_cards(game.deck, 1)
+    drawn = game.players[1].hand[0]
+
+    changes = game.changes()
+
+    assert changes['ops'] == [{'id': drawn.id, 'from': ['deck'], 'to': ['hand', 'p2'], 'index': 0, 'card': drawn.to_dict()}]
+    assert view_for(changes, 'p2') == changes
+    assert view_for(changes, 'p1')['ops'] == [{'from': ['deck'], 'to': ['hand', 'p2']}]
+
+# Test 20: Rent is worked out from the player's set; a color is required and a wrong amount is rejected
+def test_rent_amount_is_validated(game_setup):
+    game = game_setup
+    player_1 = game.players[0]
+    player_1.properties = {"red": red_set(220)[:2]}
+    player_1.hand.append(RentCard(['red', 'yellow'], card_id=225))
+
+    assert not game.apply_move(moves.PlayRent('p1', 225))  # No color
+    assert not game.apply_move(moves.PlayRent('p1', 225, color='yellow'))  # No yellow properties
+    assert not game.apply_move(moves.PlayRent('p1', 225, color='red', amount=10))
+    assert game.apply_move(moves.PlayRent('p1', 225, color='red', amount=3))
+    assert game.pending_action.amount == 3
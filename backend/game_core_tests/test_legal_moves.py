@@ -0,0 +1,86 @@
+import pytest
+from backend.game_core.card import ActionCard, MoneyCard, PropertyCard
+from backend.game_core.game import Game
+from backend.game_core.properties import num_properties_needed_for_full_set
+from backend.game_core import moves, simulation
+
+COLORS = list(num_properties_needed_for_full_set)
+
+def positions(seed, num_moves, num_players=3):
+    """Yield (game, player to move) at every step of a self-play game between the scripted policies."""
+    game = Game([{'id': f'p{i}', 'name': f'Player {i}'} for i in range(num_players)], seed=seed, verbose=False)
+    policies = [simulation.GreedyPolicy(), simulation.RandomPolicy()]
+    for step in range(num_moves):
+        if game.winner:
+            return
+        player = game.acting_player
+        yield game, player
+        assert game.apply_move(policies[step % 2].choose_move(game, player, game.rng))
+
+def brute_force_turn_moves(game, player):
+    """Every turn move built from the cards on the table, whether legal or not."""
+    opponent_ids = [p.id for p in game.players if p is not player]
+    hand_ids = [card.id for card in player.hand]
+    table_ids = [card.id for p in game.players for cards in p.properties.values() for card in cards]
+    for card_id in hand_ids:
+        yield moves.BankCard(player.id, card_id)
+        yield moves.PlayPassGo(player.id, card_id)
+        yield moves.PlayBirthday(player.id, card_id)
+        for color in COLORS:
+            yield moves.PlayProperty(player.id, card_id, color)
+            yield moves.PlaceBuilding(player.id, card_id, color)
+            for target_id in opponent_ids:
+                yield moves.PlayDealBreaker(player.id, card_id, color, target_id=target_id)
+            card = game.find_card(card_id)[0]
+            for target_id in (opponent_ids if getattr(card, 'is_wild', False) else [None]):
+                for double_the_rent_id in [None] + hand_ids:
+                    yield moves.PlayRent(player.id, card_id, color, target_id, double_the_rent_id)
+        for target_id in opponent_ids:
+            yield moves.PlayDebtCollector(player.id, card_id, target_id)
+        for target_card_id in table_ids:
+            yield moves.PlaySlyDeal(player.id, card_id, target_card_id)
+            for offered_card_id in table_ids:
+                yield moves.PlayForcedDeal(player.id, card_id, target_card_id, offered_card_id)
+    yield moves.EndTurn(player.id)
+
+# Test 1: Every generated move is accepted by the engine
+def test_generated_moves_are_legal():
+    for seed in range(6):
+        for game, player in positions(seed, 80):
+            legal = list(game.legal_moves(player))
+            assert legal
+            for move in legal[:60]:
+                assert game.clone().apply_move(move), move
+
+# Test 2: The generator finds every legal turn move
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_generator_is_complete(seed):
+    for step, (game, player) in enumerate(positions(seed, 60)):
+        if game.pending_action or step % 3:
+            continue
+        accepted = {move for move in brute_force_turn_moves(game, player) if game.clone().apply_move(move)}
+        assert accepted == set(game.legal_moves(player))
+
+# Test 3: Only the player expected to move gets moves
+def test_no_moves_for_other_players():
+    game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], seed=0, verbose=False)
+
+    assert list(game.legal_moves(game.players[1])) == []
+    assert list(game.legal_moves(game.players[0]))[-1] == moves.EndTurn('p1')
+
+# Test 4: Payments are every minimal set of cards covering the amount, plus Just Say No
+def test_payment_responses():
+    game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], seed=0, verbose=False)
+    player_1, player_2 = game.players
+    player_1.hand = [ActionCard("Debt Collector", card_id=200)]
+    player_2.hand = [ActionCard("Just Say No", card_id=201)]
+    player_2.bank = [MoneyCard(1, card_id=202), MoneyCard(2, card_id=203), MoneyCard(3, card_id=204), MoneyCard(4, card_id=205)]
+    player_2.properties = {"blue": [PropertyCard("Boardwalk", "blue", 4, card_id=206)]}
+    assert game.apply_move(moves.PlayDebtCollector('p1', 200, 'p2'))
+
+    responses = list(game.legal_moves(player_2))
+
+    assert responses[0] == moves.JustSayNo('p2', 201)
+    payments = {tuple(move.card_ids) for move in responses[1:]}
+    assert payments == {(202, 205), (202, 206), (203, 204), (203, 205), (203, 206), (204, 205), (204, 206), (205, 206)}
+    assert all(game.clone().apply_move(move) for move in responses)
@@ -0,0 +1,94 @@
+import random
+import pytest
+from backend.game_core.game import Game
+from backend.game_core.card import PropertyCard
+from backend.game_core import moves, simulation
+from backend.game_core.mcts import MCTSPolicy, determinize
+from backend.game_core_tests.test_card_index import assert_index_matches
+
+@pytest.fixture
+def game_setup():
+    """Fixture to set up a three player game partway through."""
+    game = Game([{'id': f'p{i}', 'name': f'Player {i}'} for i in range(3)], seed=2, verbose=False)
+    policy = simulation.GreedyPolicy()
+    for _ in range(30):
+        assert game.apply_move(policy.choose_move(game, game.acting_player, game.rng))
+    return game
+
+def card_ids(cards):
+    return sorted(card.id for card in cards)
+
+# Test 1: A determinized game keeps everything the player can see and reshuffles what they cannot
+def test_determinize_keeps_visible_cards(game_setup):
+    game = game_setup
+    player = game.current_player
+    before = game.to_dict()
+    sample = determinize(game, player, random.Random(0))
+
+    assert game.to_dict() == before
+    assert_index_matches(sample)
+    assert len(sample.card_index) == len(game.card_index)
+    assert card_ids(sample.get_player(player.id).hand) == card_ids(player.hand)
+    for original, sampled in zip(game.players, sample.players):
+        assert len(sampled.hand) == len(original.hand)
+        assert card_ids(sampled.bank) == card_ids(original.bank)
+        assert {color: card_ids(cards) for color, cards in sampled.properties.items()} == {color: card_ids(cards) for color, cards in original.properties.items()}
+    assert len(sample.deck) == len(game.deck)
+    unseen = lambda g: sorted(g.deck.card_ids + [card.id for p in g.players if p.id != player.id for card in p.hand])
+    assert unseen(sample) == unseen(game)
+    assert sample.deck.card_ids != game.deck.card_ids
+
+# Test 2: The bot returns a legal move, and the same one for the same seed
+def test_bot_moves_are_legal_and_reproducible(game_setup):
+    game = game_setup
+    player = game.acting_player
+    bot = MCTSPolicy(iterations=150)
+
+    move = bot.choose_move(game, player, random.Random(5))
+
+    assert move in set(game.legal_moves(player))
+    assert bot.last_iterations == 150
+    assert bot.choose_move(game, player, random.Random(5)) == move
+
+# Test 3: The bot takes a winning move
+def test_bot_completes_third_set():
+    game = Game([{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}], seed=0, verbose=False)
+    player = game.players[0]
+    player.properties = {
+        "blue": [PropertyCard("Boardwalk", "blue", 4, card_id=300), PropertyCard("Park Place", "blue", 4, card_id=301)],
+        "mint": [PropertyCard("Water Works", "mint", 2, card_id=302), PropertyCard("Electric Company", "mint", 2, card_id=303)],
+        "brown": [PropertyCard("Baltic Avenue", "brown", 1, card_id=304)],
+    }
+    player.hand = [PropertyCard("Mediterranean Avenue", "brown", 1, card_id=305)] + list(player.hand)
+
+    move = MCTSPolicy(iterations=200).choose_move(game, player, random.Random(0))
+
+    assert move == moves.PlayProperty('p1', 305, 'brown')
+
+# Test 4: Bots play a full game against a scripted policy
+def test_bot_plays_full_game():
+    game = Game([{'id': 'p0', 'name': 'Bot'}, {'id': 'p1', 'name': 'Greedy'}], seed=7, verbose=False)
+    game.current_player.draw_cards(game.deck, 2)
+    policies = {'p0': MCTSPolicy(iterations=20, rollout_moves=8), 'p1': simulation.GreedyPolicy()}
+    rng = random.Random(7)
+    for _ in range(1000):
+        if game.winner:
+            break
+        player = game.acting_player
+        assert game.apply_move(policies[player.id].choose_move(game, player, rng))
+    assert game.winner
+
+# Test 5: A move from legal_moves applied without checks leaves the game as apply_move would
+def test_apply_legal_move_matches_apply_move(game_setup):
+    game = game_setup
+    rng = random.Random(0)
+    for _ in range(60):
+        if game.winner:
+            break
+        player = game.acting_player
+        move = rng.choice(list(game.legal_moves(player)))
+        checked = game.clone()
+        assert checked.apply_move(move)
+        game.apply_legal_move(move)
+        assert game.to_dict() == checked.to_dict()
+        assert_index_matches(game)
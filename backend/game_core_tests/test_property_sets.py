@@ -0,0 +1,85 @@
+import copy
+import pickle
+from backend.game_core.card import ActionCard, PropertyCard
+from backend.game_core.player import Player
+from backend.game_core.property_sets import PropertySets
+from backend.game_core.actions import common_functions
+
+def red_set(first_id):
+    return [PropertyCard(name, "red", 3, card_id=first_id + i) for i, name in enumerate(["Illinois Avenue", "Indiana Avenue", "Kentucky Avenue"])]
+
+# Test 1: Assigning plain lists keeps the per-color counts
+def test_assigned_properties_are_indexed():
+    player = Player('p1', "Player 1")
+    wild = PropertyCard("Wild Property", ['red', 'yellow'], 3, True, card_id=10)
+    player.properties = {"red": red_set(1)[:2] + [wild, ActionCard("House", card_id=11)]}
+
+    assert isinstance(player.properties, PropertySets)
+    assert common_functions.count_fixed_property_cards(player, "red") == 2
+    assert common_functions.count_wild_property_cards(player, "red") == 1
+    assert common_functions.count_house_cards(player, "red") == 1
+    assert common_functions.calculate_rent(player, "red") == 9
+    assert player.properties.num_complete_sets == 1
+
+# Test 2: Direct list and dict mutations update the counts
+def test_mutations_update_counts():
+    player = Player('p1', "Player 1")
+    cards = red_set(1)
+    player.properties["red"] = []
+    player.properties["red"].extend(cards[:2])
+    assert player.properties.num_complete_sets == 0
+
+    player.properties["red"].append(cards[2])
+    player.properties.setdefault("blue", []).append(PropertyCard("Boardwalk", "blue", 4, card_id=5))
+    assert player.properties.num_complete_sets == 1
+    assert common_functions.calculate_rent(player, "blue") == 3
+
+    player.properties["red"].pop()
+    assert player.properties.num_complete_sets == 0
+    player.properties["red"][0] = cards[2]
+    assert common_functions.count_property_cards(player, "red") == 2
+
+    del player.properties["red"]
+    assert common_functions.count_property_cards(player, "red") == 0
+    assert common_functions.calculate_rent(player, "red") == 0
+
+# Test 3: Three complete sets win without rescanning
+def test_has_won_uses_index():
+    player = Player('p1', "Player 1")
+    player.properties = {
+        "red": red_set(1),
+        "brown": [PropertyCard("Mediterranean Avenue", "brown", 1, card_id=4), PropertyCard("Baltic Avenue", "brown", 1, card_id=5)],
+        "blue": [PropertyCard("Boardwalk", "blue", 4, card_id=6)]
+    }
+    assert not player.has_won()
+
+    player.add_property(PropertyCard("Park Place", "blue", 4, card_id=7), "blue")
+    assert player.has_won()
+
+    player.remove_property(player.properties["brown"][0])
+    assert not player.has_won()
+
+# Test 4: Buildings fall off a broken set and the counts follow
+def test_remove_property_settles_buildings():
+    player = Player('p1', "Player 1")
+    house, hotel = ActionCard("House", card_id=4), ActionCard("Hotel", card_id=5)
+    player.properties = {"red": red_set(1) + [house, hotel]}
+
+    player.remove_property(player.properties["red"][0])
+
+    assert player.bank == [house, hotel]
+    assert common_functions.count_house_cards(player, "red") == 0
+    assert common_functions.count_hotel_cards(player, "red") == 0
+    assert common_functions.calculate_rent(player, "red") == 3
+
+# Test 5: Copies and pickles rebuild the index
+def test_copy_and_pickle():
+    player = Player('p1', "Player 1")
+    player.properties = {"red": red_set(1)}
+
+    for properties in (copy.deepcopy(player.properties), pickle.loads(pickle.dumps(player.properties))):
+        assert properties.num_complete_sets == 1
+        assert properties["red"].fixed == 3
+        properties["red"].pop()
+        assert properties.num_complete_sets == 0
+    assert player.properties.num_complete_sets == 1
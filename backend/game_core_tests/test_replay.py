@@ -0,0 +1,81 @@
+import json
+import random
+import pytest
+from backend.game_core import simulation
+from backend.game_core.moves import EndTurn
+from backend.game_core.replay import new_game, move_to_event, move_from_event, replay, snapshot_game
+
+PLAYERS = [{'id': 'p0', 'name': 'Player 0'}, {'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}]
+
+def recorded_game(seed, num_moves):
+    """A game played by greedy and random policies with its moves recorded."""
+    game = new_game(PLAYERS, seed, verbose=False)
+    game.move_log = []
+    policies = [simulation.GreedyPolicy(), simulation.RandomPolicy(), simulation.GreedyPolicy()]
+    rng = random.Random(seed)
+    for _ in range(num_moves):
+        if game.winner:
+            break
+        player = game.acting_player
+        assert game.apply_move(policies[game.players.index(player)].choose_move(game, player, rng))
+    return game
+
+# Test 1: Replaying the logged events (through JSON) rebuilds the game exactly
+@pytest.mark.parametrize("num_moves", [0, 25, 300])
+def test_replay_rebuilds_game(num_moves):
+    for seed in range(10):
+        game = recorded_game(seed, num_moves)
+        events = json.loads(json.dumps([move_to_event(move) for move in game.move_log]))
+        replayed = replay(PLAYERS, seed, events)
+        assert replayed.to_dict() == game.to_dict()
+        assert replayed.deck.card_ids == game.deck.card_ids
+        assert (replayed.pending_action and replayed.pending_action.to_dict()) == (game.pending_action and game.pending_action.to_dict())
+        assert [getattr(card, 'current_color', None) for card in replayed.deck] == [getattr(card, 'current_color', None) for card in game.deck]
+
+# Test 2: Events leave out unset fields and come back as equal moves
+def test_event_round_trip():
+    game = recorded_game(3, 300)
+    for move in game.move_log:
+        event = move_to_event(move)
+        assert None not in event.values()
+        assert move_from_event(event) == move
+
+# Test 3: Only successful moves are logged; clones don't log and restore() drops the moves it undoes
+def test_move_log():
+    game = new_game(PLAYERS, 1, verbose=False)
+    game.move_log = []
+    player = game.current_player
+    assert not game.apply_move(EndTurn(game.players[1].id))
+    assert game.move_log == []
+    snapshot = game.snapshot()
+    move = next(move for move in game.legal_moves(player) if not isinstance(move, EndTurn))
+    assert game.apply_move(move)
+    clone = game.clone()
+    assert clone.move_log is None
+    assert clone.apply_move(EndTurn(player.id))
+    assert game.move_log == [move]
+    game.restore(snapshot)
+    assert game.move_log == []
+
+# Test 4: An event that does not apply to the replayed game is reported
+def test_replay_rejects_bad_event():
+    with pytest.raises(RuntimeError):
+        replay(PLAYERS, 0, [{'move': 'end_turn', 'player_id': 'p1'}])
+
+# Test 5: Replaying the events after a snapshot rebuilds the game, including its later draws
+def test_replay_from_snapshot():
+    for seed in range(10):
+        game = recorded_game(seed, 40)
+        snapshot, covered = snapshot_game(game), len(game.move_log)
+        policy = simulation.GreedyPolicy()
+        rng = random.Random(seed)
+        for _ in range(60):
+            if game.winner:
+                break
+            player = game.acting_player
+            assert game.apply_move(policy.choose_move(game, player, rng))
+        events = [move_to_event(move) for move in game.move_log[covered:]]
+        replayed = replay(PLAYERS, seed, events, snapshot)
+        assert replayed.to_dict() == game.to_dict()
+        assert replayed.deck.card_ids == game.deck.card_ids
+        assert replayed.rng.getstate() == game.rng.getstate()
@@ -0,0 +1,41 @@
+import pytest
+from backend.game_core import simulation
+from backend.game_core.game import Game
+
+# Test 1: A game is fully determined by its seed and lineup
+def test_play_game_is_reproducible():
+    first = simulation.play_game(42, ['greedy', 'random'])
+    second = simulation.play_game(42, ['greedy', 'random'])
+
+    assert first == second
+    assert first['turns'] >= 1
+    assert sum(first['action_mix'].values()) > 0
+
+# Test 2: Seeded games deal the same cards
+def test_seeded_game_deals_same_cards():
+    players = [{'id': 'p1', 'name': 'Player 1'}, {'id': 'p2', 'name': 'Player 2'}]
+    first = Game(players, seed=7, verbose=False)
+    second = Game(players, seed=7, verbose=False)
+
+    assert [card.id for card in first.players[0].hand] == [card.id for card in second.players[0].hand]
+    assert [card.id for card in first.deck] == [card.id for card in second.deck]
+
+# Test 3: Policies only ever produce legal moves
+@pytest.mark.parametrize("lineup", [['random', 'random', 'random'], ['greedy', 'greedy'], ['greedy', 'random', 'greedy', 'random']])
+def test_policies_play_legal_games(lineup):
+    for seed in range(10):
+        simulation.play_game(seed, lineup, max_turns=100)  # Raises on an illegal move
+
+# Test 4: Results do not depend on how games are split across workers
+def test_report_independent_of_worker_count():
+    in_process = simulation.run_simulation(20, ['greedy', 'random'], seed=3, workers=1, chunk_size=7).to_dict()
+    pooled = simulation.run_simulation(20, ['greedy', 'random'], seed=3, workers=2, chunk_size=7).to_dict()
+
+    assert in_process == pooled
+    assert in_process['games'] == 20
+    assert sum(in_process['seat_win_rates'].values()) * 20 + in_process['draws'] == pytest.approx(20)
+
+# Test 5: Unknown policies are rejected up front
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        simulation.run_simulation(1, ['greedy', 'nobody'])
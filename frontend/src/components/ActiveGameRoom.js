@@ -14,8 +14,9 @@ import {
 } from '@heroicons/react/24/outline';
 import Particles from './Particles';
 import { useAuth } from '../contexts/AuthContext';
-import { useWebSocket } from '../contexts/WebSocketContext';
+import { useWebSocket, LEAVE_CLOSE_CODE } from '../contexts/WebSocketContext';
 import { useGameState, createEmptyGameState } from '../contexts/GameStateContext';
+import { parseSocketMessages } from '../utils/gameUtils';
 import ErrorNotification from './notifications/ErrorNotification';
 
 const Button = ({ children, variant = 'default', size = 'md', className = '', onClick, ...props }) => {
@@ -85,22 +86,23 @@ const ActiveGameRoom = () => {
   const handleMessage = (event) => {
     try {
       // console.log(`WebSocket message in room ${roomId}:`, event.data);
-      const data = JSON.parse(event.data);
-      if (data.type && data.type === "rejection") {
-        navigate('/');
-      } else if (data.type && data.type === "broadcast_game_started") {
-        navigate(`/game/${roomId}`);
-      }
-      if (data.players) {
-        setPlayers(data.players);
-      }
+      parseSocketMessages(event).forEach((data) => {
+        if (data.type && data.type === "rejection") {
+          navigate('/');
+        } else if (data.type && data.type === "broadcast_game_started") {
+          navigate(`/game/${roomId}`);
+        }
+        if (data.players) {
+          setPlayers(data.players);
+        }
+      });
     } catch (error) {
       console.error("Error parsing WebSocket message:", error);
     }
   };
 
   const handleLeaveRoom = () => {
-    if (socket) socket.close();
+    if (socket) socket.close(LEAVE_CLOSE_CODE);
     navigate('/');
   };
 
@@ -114,6 +116,14 @@ const ActiveGameRoom = () => {
     }
   };
 
+  const handleAddBot = () => {
+    if (socket) {
+      socket.send(JSON.stringify({
+        action: 'add_bot'
+      }));
+    }
+  };
+
   const handleStartGame = () => {
     if (socket) {
       socket.send(JSON.stringify({
@@ -392,6 +402,16 @@ const ActiveGameRoom = () => {
               {isReady ? 'Not Ready' : 'Ready'}
             </Button>
 
+            <Button
+              onClick={handleAddBot}
+              disabled={players.length >= maxPlayers}
+              variant="outline"
+              size="lg"
+              className="rounded-full h-14 px-10 border-2 border-gray-900"
+            >
+              Add Bot
+            </Button>
+
             <Button
               onClick={handleStartGame}
               disabled={isGameStartDisabled}
@@ -22,7 +22,7 @@ import { handleHousePlacement } from './actions/HousePlacement';
 import { handleHotelPlacement } from './actions/HotelPlacement';
 import { handleRentColorSelection } from '../utils/rentActionHandler';
 import { handleCardDropBank, handleCardDropProperty, handleCardDropAction } from './actions/DropZoneHandlers';
-import { rentActionAnimationNames, setRequirements, splitProperties, findJustSayNoInHand } from '../utils/gameUtils';
+import { rentActionAnimationNames, setRequirements, splitProperties, parseSocketMessages } from '../utils/gameUtils';
 import PlayerInfo from './game/PlayerInfo';
 import PlayerInfoHorizontal from './game/PlayerInfoHorizontal';
 
@@ -334,6 +334,7 @@ const MainGame = () => {
   const [showActionAnimation, setShowActionAnimation] = useState({ visible: false, action: null, onComplete: null });
   const [cardNotifications, setCardNotifications] = useState([]);
   const cardNotificationTimeoutRef = useRef(null);
+  const cardNotificationCountRef = useRef(0);  // Notification ids; one frame can carry several played cards
   const rentCollectionTimeoutRef = useRef(null);
   const isUserTurnRef = useRef(false);
   const [rentAmount, setRentAmount] = useState(0);
@@ -493,7 +494,7 @@ const MainGame = () => {
     
     // Add new card notification
     const newNotification = {
-      id: Date.now(),
+      id: ++cardNotificationCountRef.current,
       card: data.card,
       visible: true,
       actionType: data.action_type
@@ -507,7 +508,7 @@ const MainGame = () => {
     const isFullState = data.is_full_state;
     
     // Update the game state with either full state or partial updates
-    setGameState(prevState => setGameStateFromBackend(state, isFullState, prevState));
+    setGameState(prevState => setGameStateFromBackend(state, isFullState, prevState, data.version));
     
     // For partial updates, we need to use the updated state which we don't have access to yet
     // So we'll update the user player and opponents in a useEffect that depends on gameState
@@ -532,7 +533,7 @@ const MainGame = () => {
         setWinnerOverlayData({ isVisible: true, winner: state.winner });
       } else if (state.deck_count === 0) {
         // Check if all players' hands are empty
-        const allHandsEmpty = state.players.every(player => player.hand.length === 0);
+        const allHandsEmpty = state.players.every(player => (player.hand_count ?? player.hand.length) === 0);
         if (allHandsEmpty) {
           gameEndedRef.current = true;
           setTieOverlayData({ isVisible: true });
@@ -551,56 +552,56 @@ const MainGame = () => {
 
   const handleWebSocketMessage = (event) => {
     try {
-      const data = JSON.parse(event.data);
-
-      switch (data.type) {
-        case 'just_say_no_response':
-          setPendingJustSayNoResponseData(data);
-          break;
+      parseSocketMessages(event).forEach((data) => {
+        switch (data.type) {
+          case 'just_say_no_response':
+            setPendingJustSayNoResponseData(data);
+            break;
 
-        case 'just_say_no_choice':
-          setPendingJustSayNoChoiceData(data);
-          break;
+          case 'just_say_no_choice':
+            setPendingJustSayNoChoiceData(data);
+            break;
 
-        case 'card_played':
-          handleCardPlayed(data);
-          break;
+          case 'card_played':
+            handleCardPlayed(data);
+            break;
 
-        case 'rent_pre_request':
-          setPendingRentPreRequestData(data);
-          break;
+          case 'rent_pre_request':
+            setPendingRentPreRequestData(data);
+            break;
 
-        case 'rent_request':
-          setPendingRentRequestData(data);
-          break;
+          case 'rent_request':
+            setPendingRentRequestData(data);
+            break;
 
-        case 'rent_paid':
-          setPendingRentPaidData(data);
-          break;
+          case 'rent_paid':
+            setPendingRentPaidData(data);
+            break;
 
-        case 'property_stolen':
-          setPendingPropertyStealData(data);
-          break;
+          case 'property_stolen':
+            setPendingPropertyStealData(data);
+            break;
 
-        case 'property_swap':
-          setPendingPropertySwapData(data);
-          break;
+          case 'property_swap':
+            setPendingPropertySwapData(data);
+            break;
 
-        case 'deal_breaker_overlay':
-          setPendingDealBreakerData(data);
-          break;
+          case 'deal_breaker_overlay':
+            setPendingDealBreakerData(data);
+            break;
 
-        case 'game_update':
-          // Reset the processing action state for completed actions
-          setIsProcessingAction(false);
-          console.log("Received gameUpdate, set isProcessingAction to false");
-          handleGameUpdate(data);
-          break;
+          case 'game_update':
+            // Reset the processing action state for completed actions
+            setIsProcessingAction(false);
+            console.log("Received gameUpdate, set isProcessingAction to false");
+            handleGameUpdate(data);
+            break;
 
-        case 'player_disconnected':
-          handlePlayerDisconnected(data);
-          break;
-      }
+          case 'player_disconnected':
+            handlePlayerDisconnected(data);
+            break;
+        }
+      });
     } catch (error) {
       console.error("Error parsing WebSocket message:", error);
     }
@@ -937,7 +938,7 @@ const MainGame = () => {
   useEffect(() => {
     if (!pendingRentPreRequestData) return;
     const data = pendingRentPreRequestData;
-    const justSayNoCard = findJustSayNoInHand(gameState, data.target_player_id);
+    // The server offers the target their Just Say No, if they hold one, before asking for the payment
     const rentRequestData = {
       action: 'rent_request',
       rentAmount: data.amount,
@@ -949,18 +950,7 @@ const MainGame = () => {
       // numPlayersOwing: data.num_players_owing,
       card: data.card
     }
-    if (justSayNoCard) {
-      socket.send(JSON.stringify({
-        action: "just_say_no_choice",
-        playerId: data.target_player_id,
-        opponentId: data.recipient_id,
-        card: justSayNoCard,
-        againstCard: data.card,
-        data: JSON.stringify(rentRequestData)
-      }))
-    } else {
-      socket.send(JSON.stringify(rentRequestData));
-    }
+    socket.send(JSON.stringify(rentRequestData));
     setPendingRentPreRequestData(null);
   }, [pendingRentPreRequestData, gameState])
   useEffect(() => {
@@ -1049,37 +1039,23 @@ const MainGame = () => {
 
   // Handle sly deal property selection
   const handleSlyDealPropertySelectWrapper = (modalData, selectedProperty) => {
-    const opponent = gameState.players.find(p => p.id === selectedProperty.ownerId);
     const card = modalData.card;
-    const justSayNoCard = findJustSayNoInHand(gameState, opponent.id);
+    // The server gives the target the choice to Just Say No first if they hold one
     const slyDealActionData = JSON.stringify({
       action: 'sly_deal',
       player: user.unique_id,
       card: card,
       target_property: selectedProperty
     });
-    if (justSayNoCard) {
-      socket.send(JSON.stringify({
-        action: "just_say_no_choice",
-        playerId: opponent.id,
-        opponentId: userPlayer.id,
-        card: justSayNoCard,
-        againstCard: card,
-        data: slyDealActionData
-      }))
-    }
-    else {
-      socket.send(slyDealActionData);
-    }
+    socket.send(slyDealActionData);
     setSlyDealModalData(prev => ({ ...prev, isVisible: false }));
     setPendingSlyDealCard(null);
   };
 
   // Handle forced deal property selection
   const handleForcedDealSelectWrapper = (modalData, opponentProperty, userProperty) => {
-    const opponent = gameState.players.find(p => p.id === opponentProperty.ownerId);
     const card = modalData.card;
-    const justSayNoCard = findJustSayNoInHand(gameState, opponent.id);
+    // The server gives the target the choice to Just Say No first if they hold one
     const forcedDealActionData = JSON.stringify({
       action: 'forced_deal',
       player: user.unique_id,
@@ -1087,27 +1063,15 @@ const MainGame = () => {
       target_property: opponentProperty,
       user_property: userProperty
     });
-    if (justSayNoCard) {
-      socket.send(JSON.stringify({
-        action: "just_say_no_choice",
-        playerId: opponent.id,
-        opponentId: userPlayer.id,
-        card: justSayNoCard,
-        againstCard: card,
-        data: forcedDealActionData
-      }));
-    } else {
-      socket.send(forcedDealActionData);
-    }
+    socket.send(forcedDealActionData);
     setForcedDealModalData(prev => ({ ...prev, isVisible: false }));
     setPendingForcedDealCard(null);
   };
 
   // Handle deal breaker set selection
   const handleDealBreakerSetSelectWrapper = (modalData, selectedSet) => {
-    const opponent = gameState.players.find(p => p.id === selectedSet.ownerId);
     const card = modalData.card;
-    const justSayNoCard = findJustSayNoInHand(gameState, opponent.id);
+    // The server gives the target the choice to Just Say No first if they hold one
     const dealBreakerActionData = JSON.stringify({
       action: 'deal_breaker',
       player: user.unique_id,
@@ -1115,19 +1079,7 @@ const MainGame = () => {
       target_set: selectedSet.cards,
       target_color: selectedSet.color
     });
-    if (justSayNoCard) {
-      socket.send(JSON.stringify({
-        action: "just_say_no_choice",
-        playerId: opponent.id,
-        opponentId: userPlayer.id,
-        card: justSayNoCard,
-        againstCard: card,
-        data: dealBreakerActionData
-      }));
-    }
-    else {
-      socket.send(dealBreakerActionData);
-    }
+    socket.send(dealBreakerActionData);
     setDealBreakerModalData(prev => ({ ...prev, isVisible: false }));
     setPendingDealBreakerCard(null);
   };
@@ -1146,6 +1098,7 @@ const MainGame = () => {
           'player': userPlayer.id,
           'card': pendingRentCard,
           'double_the_rent_card': doubleTheRentCard,
+          'rentColor': modalData.color,
           'rentAmount': doubleRentAmount
         };
         setShowActionAnimation({ visible: true, action: rentActionAnimationNames['double_the_rent'] });
@@ -1159,6 +1112,7 @@ const MainGame = () => {
           'action': 'rent',
           'player': user.unique_id,
           'card': pendingRentCard,
+          'rentColor': modalData.color,
           'rentAmount': rentAmount
         };
         setShowActionAnimation({ visible: true, action: rentActionAnimationNames['rent'] });
@@ -1180,6 +1134,7 @@ const MainGame = () => {
           'player': userPlayer.id,
           'card': pendingRentCard,
           'double_the_rent_card': doubleTheRentCard,
+          'rentColor': modalData.color,
           'rentAmount': doubleRentAmount
         };
         setOpponentSelectionModalData({
@@ -1216,7 +1171,7 @@ const MainGame = () => {
               'action': 'multicolor rent',
               'player': userPlayer.id,
               'card': modalData.card,
-              // 'rentColor': modalData.color,
+              'rentColor': modalData.color,
               'rentAmount': modalData.rentAmount,
               'targetPlayer': selectedOpponentId
             };
@@ -1430,7 +1385,7 @@ const MainGame = () => {
         'action': 'rent',
         'player': userPlayer.id,
         'card': card,
-        // 'rentColor': color,
+        'rentColor': color,
         'rentAmount': rentAmount,
         // 'targetPlayers': targetPlayers.map(p => p.id)
       });
@@ -1476,7 +1431,7 @@ const MainGame = () => {
             'action': 'multicolor rent',
             'player': userPlayer.id,
             'card': card,
-            // 'rentColor': color,
+            'rentColor': color,
             'rentAmount': rentAmount,
             'targetPlayer': selectedOpponentId
           };
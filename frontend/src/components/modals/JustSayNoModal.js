@@ -21,7 +21,7 @@ const JustSayNoModal = ({ isOpen, onClose, modalData, onResponse }) => {
         card: modalData.card,
         againstCard: modalData.againstCard,
         againstRentCard: modalData.againstRentCard,
-        data: JSON.stringify(modalData.data)
+        data: modalData.data
       }));
     }
     onClose();
@@ -1,6 +1,7 @@
 import React, { createContext, useContext, useState, useEffect, useCallback, useRef } from 'react';
 import { useWebSocket } from './WebSocketContext';
 import { useWebSocketMessageQueue } from './WebSocketMessageQueue';
+import { parseSocketMessages } from '../utils/gameUtils';
 
 // Game state helper functions
 export const createEmptyGameState = () => ({
@@ -9,7 +10,8 @@ export const createEmptyGameState = () => ({
   discard_pile: null,
   current_turn: null,  // player ID
   winner: null,
-  actions_remaining: 3
+  actions_remaining: 3,
+  version: 0  // State version of the last update applied
 });
 
 export const createPlayerState = (id, name) => ({
@@ -38,6 +40,46 @@ export const updatePlayerState = (gameState, playerId, updates) => {
   };
 };
 
+// Card ops name zones by path: ['deck'], ['discard'], ['hand', playerId], ['bank', playerId] or ['properties', playerId, color].
+// Cards going to or leaving a hidden hand (one we only know the size of) just change its hand_count.
+const getZone = (state, [zone, playerId, color]) => {
+  if (zone === 'discard') {
+    return { cards: state.discard_pile || [], store: cards => { state.discard_pile = cards.length ? cards : null; } };
+  }
+  const player = state.players.find(p => p.id === playerId);
+  if (zone === 'hand' && player.hand_count !== undefined) {
+    return { hidden: player };
+  }
+  if (zone === 'properties') {
+    return {
+      cards: player.properties[color] || [],
+      store: cards => {
+        if (cards.length) player.properties[color] = cards;
+        else delete player.properties[color];
+      }
+    };
+  }
+  return { cards: player[zone], store: cards => { player[zone] = cards; } };
+};
+
+// Apply one card op from the server: the card leaves `from` (if given) and is put in `to` at `index` (if given)
+export const applyCardOp = (state, op) => {
+  if (op.from && op.from[0] !== 'deck') {
+    const zone = getZone(state, op.from);
+    if (zone.hidden) zone.hidden.hand_count -= 1;
+    else zone.store(zone.cards.filter(card => card.id !== op.id));
+  }
+  if (op.to && op.to[0] !== 'deck') {
+    const zone = getZone(state, op.to);
+    if (zone.hidden) zone.hidden.hand_count += 1;
+    else {
+      const cards = [...zone.cards];
+      cards.splice(op.index, 0, op.card);
+      zone.store(cards);
+    }
+  }
+};
+
 // Apply partial state updates to the current game state
 export const applyStateUpdates = (currentState, updates) => {
   // Create a deep copy of the current state to avoid mutation
@@ -64,6 +106,9 @@ export const applyStateUpdates = (currentState, updates) => {
           newState.players.push(playerUpdate);
         }
       });
+    } else if (key === 'ops') {
+      // Card moves, applied in order
+      updates.ops.forEach(op => applyCardOp(newState, op));
     } else {
       // For all other fields, simply replace the value
       newState[key] = updates[key];
@@ -73,13 +118,29 @@ export const applyStateUpdates = (currentState, updates) => {
   return newState;
 };
 
-export const setGameStateFromBackend = (newState, isFullState, currentState) => {
+// Opponents' hands arrive as a card count only; stand in face-down placeholder cards so hand sizes render as before
+export const expandHiddenHands = (state) => ({
+  ...state,
+  players: state.players.map(player => 
+    player.hand_count === undefined
+      ? player
+      : { ...player, hand: Array.from({ length: player.hand_count }, (_, i) => ({ id: `hidden-${player.id}-${i}`, hidden: true })) }
+  )
+});
+
+// Partial updates carry consecutive versions: each applies on top of the one before. One already applied
+// (every update reaches more than one listener) is skipped; after a gap, nothing more applies until a resync.
+export const setGameStateFromBackend = (newState, isFullState, currentState, version) => {
   if (isFullState) {
     // If it's a full state update, replace the entire state
-    return { ...newState };
+    return expandHiddenHands({ ...newState, version });
+  } else if (version <= currentState.version) {
+    return currentState;
+  } else if (currentState.needsResync || version !== currentState.version + 1) {
+    return { ...currentState, needsResync: true };
   } else {
     // If it's a partial update, apply the changes to the current state
-    return applyStateUpdates(currentState, newState);
+    return { ...expandHiddenHands(applyStateUpdates(currentState, newState)), version };
   }
 };
 
@@ -100,16 +161,22 @@ export const GameStateProvider = ({ children }) => {
   const handleGameUpdate = useCallback((data) => {
     const state = data.state;
     const isFullState = data.is_full_state;
-    setGameState(prevState => setGameStateFromBackend(state, isFullState, prevState));
+    setGameState(prevState => setGameStateFromBackend(state, isFullState, prevState, data.version));
   }, []);
 
+  // Ask for the whole game again after missing an update
+  useEffect(() => {
+    if (gameState.needsResync && socket) {
+      socket.send(JSON.stringify({ action: 'resync' }));
+    }
+  }, [gameState.needsResync, socket]);
+
   // Process WebSocket messages
   const handleWebSocketMessage = useCallback((event) => {
     try {
-      const data = JSON.parse(event.data);
-      if (data.type === 'game_update') {
-        handleGameUpdate(data);
-      }
+      parseSocketMessages(event)
+        .filter((data) => data.type === 'game_update')
+        .forEach((data) => handleGameUpdate(data));
     } catch (error) {
       console.error("Error parsing WebSocket message in GameStateContext:", error);
     }
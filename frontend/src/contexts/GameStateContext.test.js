@@ -0,0 +1,56 @@
+import { render, act } from '@testing-library/react';
+import { GameStateProvider, setGameStateFromBackend } from './GameStateContext';
+
+const mockSocket = { listeners: [], send: jest.fn() };
+mockSocket.addEventListener = (type, listener) => mockSocket.listeners.push(listener);
+mockSocket.removeEventListener = (type, listener) => {
+  mockSocket.listeners = mockSocket.listeners.filter(l => l !== listener);
+};
+
+jest.mock('./WebSocketContext', () => ({ useWebSocket: () => ({ socket: mockSocket }) }));
+jest.mock('./WebSocketMessageQueue', () => ({
+  useWebSocketMessageQueue: () => ({ enqueueMessage: (event, handler) => handler(event) })
+}));
+
+const fullState = {
+  deck_count: 10,
+  players: [{ id: 'p1', name: 'Player 1', hand: [{ id: 1 }], properties: {}, bank: [] }],
+  discard_pile: null,
+  current_turn: 'p1',
+  actions_remaining: 3
+};
+const bankCard = { ops: [{ id: 1, from: ['hand', 'p1'], to: ['bank', 'p1'], index: 0, card: { id: 1 } }], actions_remaining: 2 };
+
+test('applies consecutive updates and skips ones already applied', () => {
+  let state = setGameStateFromBackend(fullState, true, null, 1);
+  state = setGameStateFromBackend(bankCard, false, state, 2);
+  expect(state.version).toBe(2);
+  expect(state.players[0].hand).toEqual([]);
+  expect(state.players[0].bank).toEqual([{ id: 1 }]);
+  expect(setGameStateFromBackend(bankCard, false, state, 2)).toBe(state);
+});
+
+test('a version gap stops updates until a full state arrives', () => {
+  let state = setGameStateFromBackend(fullState, true, null, 1);
+  state = setGameStateFromBackend({ actions_remaining: 1 }, false, state, 3);
+  expect(state.needsResync).toBe(true);
+  expect(state.actions_remaining).toBe(3);
+  state = setGameStateFromBackend({ actions_remaining: 0 }, false, state, 4);
+  expect(state.actions_remaining).toBe(3);
+  state = setGameStateFromBackend(fullState, true, state, 4);
+  expect(state.needsResync).toBeUndefined();
+  expect(state.version).toBe(4);
+});
+
+test('asks the server for a resync after missing an update', () => {
+  render(<GameStateProvider><div /></GameStateProvider>);
+  const receive = (message) => act(() => {
+    mockSocket.listeners.forEach(listener => listener({ data: JSON.stringify(message) }));
+  });
+
+  receive({ type: 'game_update', state: fullState, is_full_state: true, version: 1 });
+  receive({ type: 'game_update', state: bankCard, is_full_state: false, version: 2 });
+  expect(mockSocket.send).not.toHaveBeenCalled();
+  receive({ type: 'game_update', state: { actions_remaining: 1 }, is_full_state: false, version: 4 });
+  expect(mockSocket.send).toHaveBeenCalledWith(JSON.stringify({ action: 'resync' }));
+});
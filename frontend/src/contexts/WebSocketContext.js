@@ -1,6 +1,7 @@
 // WebSocketContext.js
 import React, { createContext, useContext, useRef, useEffect, useState } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
+import { BINARY_SUBPROTOCOL, useBinarySocket, loadCardCatalog } from '../utils/socketProtocol';
 
 const WS_BASE_URL = process.env.REACT_APP_API_BASE_URL ? process.env.REACT_APP_API_BASE_URL.replace('http', 'ws').replace('/api', '') : 'ws://localhost:8000';
 
@@ -9,6 +10,10 @@ const WebSocketContext = createContext(null);
 // Static connection management (outside of component lifecycle)
 const connectionLocks = {};
 
+// Close code for leaving a room on purpose; the server keeps the seat of a started game on any other close
+export const LEAVE_CLOSE_CODE = 1000;
+const RECONNECT_DELAYS = [500, 1000, 2000, 5000];
+
 function isRoomRoute(pathname) {
     return pathname.startsWith('/room/');
 }
@@ -26,7 +31,7 @@ function getRoomIdFromPath(pathname) {
     return parts[parts.length - 1];
 }
 
-const connectWebSocket = (roomId, playerId) => {
+const connectWebSocket = (roomId, playerId, onDrop) => {
     // Check if connection already exists or is in progress
     if (connectionLocks[playerId]?.[roomId]) {
         console.log(`Connection for room ${roomId} is already in progress.`);
@@ -38,10 +43,12 @@ const connectWebSocket = (roomId, playerId) => {
         connectionLocks[playerId] = {};
     }
 
-    // Create new connection promise
-    const lock = new Promise((resolve, reject) => {
-        const ws = new WebSocket(`${WS_BASE_URL}/ws/game/${roomId}/`);
-
+    // Create new connection promise (binary frames refer to cards in the catalog, so load it first)
+    const lock = (useBinarySocket ? loadCardCatalog() : Promise.resolve()).then(() => new Promise((resolve, reject) => {
+        const ws = useBinarySocket
+            ? new WebSocket(`${WS_BASE_URL}/ws/game/${roomId}/`, [BINARY_SUBPROTOCOL])
+            : new WebSocket(`${WS_BASE_URL}/ws/game/${roomId}/`);
+        ws.binaryType = 'arraybuffer';
 
         ws.onopen = () => {
             console.log(`WebSocket connected for room ${roomId}`);
@@ -54,17 +61,24 @@ const connectWebSocket = (roomId, playerId) => {
 
         // Message handling to be defined in components themselves (ws.onmessage)
 
-        ws.onclose = () => {
+        ws.onclose = (event) => {
             console.log(`WebSocket disconnected for room ${roomId}`);
-            delete connectionLocks[playerId][roomId];
+            if (connectionLocks[playerId][roomId] === lock) {
+                delete connectionLocks[playerId][roomId];
+            }
+            if (event.code !== LEAVE_CLOSE_CODE && onDrop) {
+                onDrop();
+            }
         };
 
         ws.onerror = (error) => {
             console.error(`WebSocket error in room ${roomId}:`, error);
             reject(error);
-            delete connectionLocks[playerId][roomId];
+            if (connectionLocks[playerId][roomId] === lock) {
+                delete connectionLocks[playerId][roomId];
+            }
         };
-    });
+    }));
 
     // Store the connection lock
     connectionLocks[playerId][roomId] = lock;
@@ -77,13 +91,42 @@ export function WebSocketProvider({ children, playerId }) {
     const location = useLocation();
     const navigate = useNavigate();
     const currentRoomId = getRoomIdFromPath(location.pathname);
+    const roomRef = useRef(null); // Room whose socket should be kept open, read by a dropped socket's reconnect
+
+    // Open a socket to a room, reconnecting (and so re-sending establish_connection) whenever the
+    // connection drops, e.g. on a network blip or a server restart, until the room is left
+    const openSocket = (roomId, attempt = 0) => {
+        const onDrop = () => {
+            if (roomRef.current !== roomId) return;
+            const delay = RECONNECT_DELAYS[Math.min(attempt, RECONNECT_DELAYS.length - 1)];
+            console.log(`Reconnecting to room ${roomId} in ${delay}ms`);
+            setTimeout(() => {
+                if (roomRef.current === roomId) openSocket(roomId, attempt + 1);
+            }, delay);
+        };
+        return connectWebSocket(roomId, playerId, onDrop)
+            .then(newWs => {
+                if (roomRef.current !== roomId) {
+                    newWs.close(LEAVE_CLOSE_CODE);
+                    return;
+                }
+                attempt = 0; // A socket that opened starts its own reconnects from the shortest delay
+                setWs(newWs);
+                console.log("WebSocket established:", newWs);
+            })
+            .catch(error => {
+                // A socket that failed to open is closed too, and retried from its onclose
+                console.error('Failed to establish WebSocket connection:', error);
+            });
+    };
 
     useEffect(() => {
         if (!isValidWebSocketRoute(location.pathname)) {
             // Not on a room or game route, close socket
+            roomRef.current = null;
             if (ws) {
                 console.log('Disconnecting WebSocket - not on a valid route');
-                ws.close();
+                ws.close(LEAVE_CLOSE_CODE);
                 setWs(null);
                 if (connectionLocks[playerId]?.[currentRoomId]) {
                     delete connectionLocks[playerId][currentRoomId];
@@ -100,22 +143,15 @@ export function WebSocketProvider({ children, playerId }) {
 
         if (isRoomRoute(location.pathname) && !ws) {
             setIsLoading(true); // Set loading before connecting
-            connectWebSocket(currentRoomId, playerId)
-                .then(newWs => {
-                    setWs(newWs);
-                    console.log("WebSocket established:", newWs);
-                    setIsLoading(false);
-                })
-                .catch(error => {
-                    console.error('Failed to establish WebSocket connection:', error);
-                    setIsLoading(false);
-                });
+            roomRef.current = currentRoomId;
+            openSocket(currentRoomId).finally(() => setIsLoading(false));
         }
 
         return () => {
             if (ws && getRoomIdFromPath(location.pathname) !== currentRoomId) {
                 console.log('Disconnecting WebSocket - room changed');
-                ws.close();
+                roomRef.current = null;
+                ws.close(LEAVE_CLOSE_CODE);
                 setWs(null);
                 if (connectionLocks[playerId]?.[currentRoomId]) {
                     delete connectionLocks[playerId][currentRoomId];
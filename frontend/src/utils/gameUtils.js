@@ -1,3 +1,5 @@
+import { decodeFrame } from './socketProtocol';
+
 // Constants
 
 // Rent action display names
@@ -110,6 +112,14 @@ export const splitProperties = (properties) => {
   return { mainSets, overflowSets };
 };
 
+/**
+ * Parses a WebSocket frame into the messages it carries (the server sends all messages of one action as a batch)
+ */
+export const parseSocketMessages = (event) => {
+  const data = decodeFrame(event.data);
+  return data.type === 'batch' ? data.messages : [data];
+};
+
 /**
  * Gets a specific player by their ID
  */
@@ -124,6 +134,3 @@ export const getOpponentPlayers = (gameState, userId) => {
   return gameState.players.filter(player => player.id !== userId);
 };
 
-export const findJustSayNoInHand = (gameState, playerId) => {
-  return getPlayerById(gameState, playerId).hand.find(card => card.type === 'action' && card.name.toLowerCase() === 'just say no') || null;
-}
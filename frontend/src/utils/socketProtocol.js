@@ -0,0 +1,114 @@
+const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000/api';
+
+// Binary websocket protocol: the server sends MessagePack frames with cards as references into the card
+// catalog instead of JSON text. Opt in with REACT_APP_BINARY_SOCKET=true; messages sent to the server stay JSON.
+export const BINARY_SUBPROTOCOL = 'mdeal.msgpack.v1';
+export const useBinarySocket = process.env.REACT_APP_BINARY_SOCKET === 'true';
+
+// MessagePack extension types standing in for cards (see backend/game/codec.py)
+const CARD_EXT = 1;
+const WILD_CARD_EXT = 2;
+
+let cardCatalog = null;
+
+/**
+ * Fetches every card by id, once; binary frames refer to cards by their id
+ */
+export const loadCardCatalog = async () => {
+  if (!cardCatalog) {
+    const response = await fetch(`${API_BASE_URL}/cards/`);
+    cardCatalog = await response.json();
+  }
+  return cardCatalog;
+};
+
+const textDecoder = new TextDecoder();
+
+const decodeCard = (type, bytes) => {
+  const card = { ...cardCatalog[(bytes[0] << 8) | bytes[1]] };
+  if (type === WILD_CARD_EXT) {
+    card.currentColor = textDecoder.decode(bytes.subarray(2));
+  }
+  return card;
+};
+
+/**
+ * Decodes one MessagePack value (the subset the server's msgpack.packb writes, plus the card extensions)
+ */
+const decodeMessagePack = (buffer) => {
+  const bytes = new Uint8Array(buffer);
+  const view = new DataView(buffer);
+  let offset = 0;
+
+  const take = (length) => {
+    offset += length;
+    return offset - length;
+  };
+  const str = (length) => textDecoder.decode(bytes.subarray(take(length), offset));
+  const array = (length) => Array.from({ length }, () => value());
+  const map = (length) => {
+    const result = {};
+    for (let i = 0; i < length; i++) {
+      const key = value();
+      result[key] = value();
+    }
+    return result;
+  };
+  const ext = (length) => {
+    const type = view.getInt8(take(1));
+    const data = bytes.subarray(take(length), offset);
+    if (type !== CARD_EXT && type !== WILD_CARD_EXT) {
+      throw new Error(`Unknown MessagePack extension type ${type}`);
+    }
+    return decodeCard(type, data);
+  };
+
+  const value = () => {
+    const byte = bytes[take(1)];
+    if (byte <= 0x7f) return byte;
+    if (byte <= 0x8f) return map(byte & 0x0f);
+    if (byte <= 0x9f) return array(byte & 0x0f);
+    if (byte <= 0xbf) return str(byte & 0x1f);
+    if (byte >= 0xe0) return byte - 0x100;
+    switch (byte) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xca: return view.getFloat32(take(4));
+      case 0xcb: return view.getFloat64(take(8));
+      case 0xcc: return view.getUint8(take(1));
+      case 0xcd: return view.getUint16(take(2));
+      case 0xce: return view.getUint32(take(4));
+      case 0xcf: return Number(view.getBigUint64(take(8)));
+      case 0xd0: return view.getInt8(take(1));
+      case 0xd1: return view.getInt16(take(2));
+      case 0xd2: return view.getInt32(take(4));
+      case 0xd3: return Number(view.getBigInt64(take(8)));
+      case 0xd4: return ext(1);
+      case 0xd5: return ext(2);
+      case 0xd6: return ext(4);
+      case 0xd7: return ext(8);
+      case 0xd8: return ext(16);
+      case 0xc7: return ext(view.getUint8(take(1)));
+      case 0xc8: return ext(view.getUint16(take(2)));
+      case 0xc9: return ext(view.getUint32(take(4)));
+      case 0xd9: return str(view.getUint8(take(1)));
+      case 0xda: return str(view.getUint16(take(2)));
+      case 0xdb: return str(view.getUint32(take(4)));
+      case 0xdc: return array(view.getUint16(take(2)));
+      case 0xdd: return array(view.getUint32(take(4)));
+      case 0xde: return map(view.getUint16(take(2)));
+      case 0xdf: return map(view.getUint32(take(4)));
+      default: throw new Error(`Unsupported MessagePack byte 0x${byte.toString(16)}`);
+    }
+  };
+
+  return value();
+};
+
+/**
+ * Decodes a WebSocket frame: MessagePack for binary frames, JSON for text frames
+ */
+export const decodeFrame = (data) => (
+  data instanceof ArrayBuffer ? decodeMessagePack(data) : JSON.parse(data)
+);
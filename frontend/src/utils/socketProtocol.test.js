@@ -0,0 +1,42 @@
+import { decodeFrame, loadCardCatalog } from './socketProtocol';
+
+const catalog = {
+  1: { type: 'money', id: 1, value: 1 },
+  30: { type: 'property', id: 30, name: 'Wild Property', color: ['blue', 'green'], currentColor: 'blue', value: 4 }
+};
+
+// msgpack.packb({'type': 'card_played', 'cards': [ExtType(1, card 1), ExtType(2, card 30 + b'green')], 'version': 300})
+const cardsFrame = [
+  131, 164, 116, 121, 112, 101, 171, 99, 97, 114, 100, 95, 112, 108, 97, 121, 101, 100, 165, 99, 97, 114, 100, 115,
+  146, 213, 1, 0, 1, 199, 7, 2, 0, 30, 103, 114, 101, 101, 110, 167, 118, 101, 114, 115, 105, 111, 110, 205, 1, 44
+];
+// msgpack.packb({'type': 'card_played', 'card': ExtType(9, b'\x00\x01')})
+const unknownExtFrame = [
+  130, 164, 116, 121, 112, 101, 171, 99, 97, 114, 100, 95, 112, 108, 97, 121, 101, 100, 164, 99, 97, 114, 100,
+  213, 9, 0, 1
+];
+
+const buffer = (bytes) => new Uint8Array(bytes).buffer;
+
+beforeAll(async () => {
+  global.fetch = jest.fn(() => Promise.resolve({ json: () => Promise.resolve(catalog) }));
+  await loadCardCatalog();
+});
+
+test('binary frames bring their cards back from the catalog', () => {
+  expect(decodeFrame(buffer(cardsFrame))).toEqual({
+    type: 'card_played',
+    cards: [catalog[1], { ...catalog[30], currentColor: 'green' }],
+    version: 300
+  });
+  // Each card is a copy, so assigning a wild card's color leaves the catalog alone
+  expect(catalog[30].currentColor).toBe('blue');
+});
+
+test('an unknown extension type is an error, not a card', () => {
+  expect(() => decodeFrame(buffer(unknownExtFrame))).toThrow('Unknown MessagePack extension type 9');
+});
+
+test('text frames are JSON', () => {
+  expect(decodeFrame('{"type": "rejection", "data": "Room is full."}')).toEqual({ type: 'rejection', data: 'Room is full.' });
+});